@@ -5,6 +5,7 @@ Este script utiliza SQLAlchemy para modificar la estructura de la tabla.
 
 from sqlalchemy import create_engine, text
 from app.core.config import settings
+from app.core.versions import TASK_CATALOG, bump_version_sync
 
 def add_periodicity_column():
     """Añade la columna 'periodicity' a la tabla 'task'."""
@@ -17,6 +18,8 @@ def add_periodicity_column():
     # Ejecutar el comando
     with engine.connect() as conn:
         conn.execute(sql)
+        # The catalog caches and ETags only notice counted writes
+        bump_version_sync(conn, TASK_CATALOG)
         conn.commit()
         print("Columna 'periodicity' añadida correctamente a la tabla 'task'.")
 
@@ -0,0 +1,195 @@
+"""baseline schema
+
+Schema as created by create_db_and_tables() (create_all) before
+migrations were introduced, including the tables and the user.auth_epoch
+column added to the models since the original release.
+
+create_all only ever created missing tables, so older databases may lack
+some of them, and the user.auth_epoch column. This revision adopts any such database: it creates only the
+tables and indexes that are missing and adds auth_epoch where needed, so
+``alembic upgrade head`` works on empty and existing databases alike.
+
+Revision ID: 0001_baseline
+Revises: 
+Create Date: 2026-10-18 03:40:31.639383
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001_baseline'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _create_table(name: str, *elements, **kwargs) -> None:
+    """``op.create_table`` unless the table already exists."""
+    bind = op.get_bind()
+    if sa.inspect(bind).has_table(name):
+        return
+    if bind.dialect.name == 'postgresql':
+        # Enum types are shared between tables and may exist already
+        # (e.g. taskstatus from taskassignment when only the archive is new)
+        for element in elements:
+            if isinstance(element, sa.Column) and isinstance(element.type, sa.Enum):
+                enum = postgresql.ENUM(*element.type.enums, name=element.type.name, create_type=False)
+                enum.create(bind, checkfirst=True)
+                element.type = enum
+    op.create_table(name, *elements, **kwargs)
+
+
+def upgrade() -> None:
+    _create_table('reward',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('description', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('cost', sa.Integer(), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    _create_table('task',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('description', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('credits', sa.Integer(), nullable=False),
+    sa.Column('task_type', sa.Enum('INDIVIDUAL', 'COLLECTIVE', name='tasktype'), nullable=False),
+    sa.Column('periodicity', sa.Enum('DAILY', 'WEEKLY', 'SPECIAL', name='taskperiodicity'), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    _create_table('taskassignment_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('scheduled_date', sa.Date(), nullable=False),
+    sa.Column('task_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.Enum('PENDING', 'COMPLETED', 'APPROVED', 'REJECTED', name='taskstatus'), nullable=False),
+    sa.Column('completed_at', sa.DateTime(), nullable=True),
+    sa.Column('approved_at', sa.DateTime(), nullable=True),
+    sa.Column('approved_by', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id', 'scheduled_date'),
+    postgresql_partition_by='RANGE (scheduled_date)'
+    )
+    op.create_index('ix_taskassignment_archive_user_id_scheduled_date', 'taskassignment_archive', ['user_id', 'scheduled_date'], unique=False, if_not_exists=True)
+    _create_table('user',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('username', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('password_hash', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('role', sa.Enum('ADMIN', 'USER', name='userrole'), nullable=False),
+    sa.Column('credits', sa.Integer(), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.Column('auth_epoch', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_user_username', 'user', ['username'], unique=True, if_not_exists=True)
+    if 'auth_epoch' not in {column['name'] for column in sa.inspect(op.get_bind()).get_columns('user')}:
+        # create_all never added it to an existing user table
+        op.add_column('user', sa.Column('auth_epoch', sa.Integer(), nullable=False, server_default='0'))
+    _create_table('background_job',
+    sa.Column('id', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('kind', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('status', sa.Enum('PENDING', 'RUNNING', 'COMPLETED', 'FAILED', name='jobstatus'), nullable=False),
+    sa.Column('params', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('total', sa.Integer(), nullable=True),
+    sa.Column('processed', sa.Integer(), nullable=False),
+    sa.Column('error', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('created_by', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['created_by'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    _create_table('credit_snapshot',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('balance', sa.Integer(), nullable=False),
+    sa.Column('last_ledger_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_credit_snapshot_user_id_created_at', 'credit_snapshot', ['user_id', 'created_at'], unique=False, if_not_exists=True)
+    _create_table('daily_assignment_rollup',
+    sa.Column('scheduled_date', sa.Date(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('task_id', sa.Integer(), nullable=False),
+    sa.Column('pending', sa.Integer(), nullable=False),
+    sa.Column('completed', sa.Integer(), nullable=False),
+    sa.Column('approved', sa.Integer(), nullable=False),
+    sa.Column('rejected', sa.Integer(), nullable=False),
+    sa.Column('credits', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['task_id'], ['task.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('scheduled_date', 'user_id', 'task_id')
+    )
+    _create_table('rewardredemption',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('reward_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('redeemed_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['reward_id'], ['reward.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    _create_table('taskassignment',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('task_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.Enum('PENDING', 'COMPLETED', 'APPROVED', 'REJECTED', name='taskstatus'), nullable=False),
+    sa.Column('scheduled_date', sa.Date(), nullable=False),
+    sa.Column('completed_at', sa.DateTime(), nullable=True),
+    sa.Column('approved_at', sa.DateTime(), nullable=True),
+    sa.Column('approved_by', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['approved_by'], ['user.id'], ),
+    sa.ForeignKeyConstraint(['task_id'], ['task.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_taskassignment_scheduled_date', 'taskassignment', ['scheduled_date'], unique=False, if_not_exists=True)
+    _create_table('credit_ledger',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('amount', sa.Integer(), nullable=False),
+    sa.Column('reason', sa.Enum('TASK_APPROVAL', 'REWARD_REDEMPTION', 'ADMIN_ADJUSTMENT', 'OPENING_BALANCE', name='creditreason'), nullable=False),
+    sa.Column('assignment_id', sa.Integer(), nullable=True),
+    sa.Column('redemption_id', sa.Integer(), nullable=True),
+    sa.Column('created_by', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['created_by'], ['user.id'], ),
+    sa.ForeignKeyConstraint(['redemption_id'], ['rewardredemption.id'], ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_credit_ledger_assignment_id', 'credit_ledger', ['assignment_id'], unique=False, if_not_exists=True)
+    op.create_index('ix_credit_ledger_user_id_created_at', 'credit_ledger', ['user_id', 'created_at'], unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_credit_ledger_user_id_created_at', table_name='credit_ledger')
+    op.drop_index('ix_credit_ledger_assignment_id', table_name='credit_ledger')
+    op.drop_table('credit_ledger')
+    op.drop_index('ix_taskassignment_scheduled_date', table_name='taskassignment')
+    op.drop_table('taskassignment')
+    op.drop_table('rewardredemption')
+    op.drop_table('daily_assignment_rollup')
+    op.drop_index('ix_credit_snapshot_user_id_created_at', table_name='credit_snapshot')
+    op.drop_table('credit_snapshot')
+    op.drop_table('background_job')
+    op.drop_index('ix_user_username', table_name='user')
+    op.drop_table('user')
+    op.drop_index('ix_taskassignment_archive_user_id_scheduled_date', table_name='taskassignment_archive')
+    op.drop_table('taskassignment_archive')
+    op.drop_table('task')
+    op.drop_table('reward')
@@ -0,0 +1,45 @@
+"""composite indexes for the hot access paths
+
+- taskassignment (user_id, scheduled_date): a user's assignments for a
+  day or date range (assign checks, /assignments, stats).
+- taskassignment (status, scheduled_date): pending approvals and the
+  archive job's settled-rows scan.
+- taskassignment (task_id, scheduled_date, status): "is this collective
+  task already taken today" without touching the table.
+- rewardredemption (user_id, redeemed_at): a user's redemption history,
+  already in keyset order.
+
+Revision ID: 0002_access_path_indexes
+Revises: 0001_baseline
+Create Date: 2026-10-18 04:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002_access_path_indexes'
+down_revision: Union[str, None] = '0001_baseline'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ('ix_taskassignment_user_id_scheduled_date', 'taskassignment', ['user_id', 'scheduled_date']),
+    ('ix_taskassignment_status_scheduled_date', 'taskassignment', ['status', 'scheduled_date']),
+    ('ix_taskassignment_task_id_scheduled_date_status', 'taskassignment', ['task_id', 'scheduled_date', 'status']),
+    ('ix_rewardredemption_user_id_redeemed_at', 'rewardredemption', ['user_id', 'redeemed_at']),
+]
+
+
+def upgrade() -> None:
+    # Databases created by create_db_and_tables() after the models gained
+    # these indexes already have them
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
@@ -0,0 +1,88 @@
+"""once-per-day assignment rules as partial unique indexes
+
+Adds taskassignment.collective (a copy of the task type, which a partial
+index cannot read from the task table) and two unique indexes over open
+(pending/completed) assignments:
+
+- collective tasks: one per (task_id, scheduled_date)
+- individual tasks: one per (task_id, user_id, scheduled_date)
+
+The archive gets the column too so both tables keep the same shape.
+
+Revision ID: 0003_open_assignment_unique
+Revises: 0002_access_path_indexes
+Create Date: 2026-10-18 05:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003_open_assignment_unique'
+down_revision: Union[str, None] = '0002_access_path_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+OPEN = "status IN ('PENDING', 'COMPLETED')"
+
+BACKFILL = """
+UPDATE {table} SET collective = EXISTS (
+    SELECT 1 FROM task WHERE task.id = {table}.task_id AND task.task_type = 'COLLECTIVE'
+)
+"""
+
+# Open duplicates left behind by the old check-then-insert race; checked
+# before touching the schema so a failed upgrade leaves nothing half done
+DUPLICATES = f"""
+SELECT a.task_id, a.scheduled_date, NULL AS user_id
+FROM taskassignment a JOIN task t ON t.id = a.task_id
+WHERE a.{OPEN} AND t.task_type = 'COLLECTIVE'
+GROUP BY a.task_id, a.scheduled_date HAVING COUNT(*) > 1
+UNION ALL
+SELECT a.task_id, a.scheduled_date, a.user_id
+FROM taskassignment a JOIN task t ON t.id = a.task_id
+WHERE a.{OPEN} AND t.task_type != 'COLLECTIVE'
+GROUP BY a.task_id, a.user_id, a.scheduled_date HAVING COUNT(*) > 1
+"""
+
+
+def upgrade() -> None:
+    duplicates = op.get_bind().execute(sa.text(DUPLICATES)).all()
+    if duplicates:
+        raise RuntimeError(
+            f"{len(duplicates)} open task assignments are duplicated (task_id, scheduled_date, user_id): "
+            f"{duplicates[:20]}. Approve, reject or delete the extra ones and run the upgrade again."
+        )
+
+    # Tables created by create_db_and_tables() from newer models may already
+    # have the column and indexes
+    inspector = sa.inspect(op.get_bind())
+    for table in ('taskassignment', 'taskassignment_archive'):
+        if 'collective' in {column['name'] for column in inspector.get_columns(table)}:
+            continue
+        op.add_column(table, sa.Column('collective', sa.Boolean(), nullable=False, server_default=sa.false()))
+        op.execute(BACKFILL.format(table=table))
+
+    op.create_index(
+        'uq_taskassignment_open_collective', 'taskassignment', ['task_id', 'scheduled_date'], unique=True,
+        sqlite_where=sa.text(f"{OPEN} AND collective"),
+        postgresql_where=sa.text(f"{OPEN} AND collective"),
+        if_not_exists=True,
+    )
+    op.create_index(
+        'uq_taskassignment_open_individual', 'taskassignment', ['task_id', 'user_id', 'scheduled_date'], unique=True,
+        sqlite_where=sa.text(f"{OPEN} AND NOT collective"),
+        postgresql_where=sa.text(f"{OPEN} AND NOT collective"),
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('uq_taskassignment_open_individual', table_name='taskassignment')
+    op.drop_index('uq_taskassignment_open_collective', table_name='taskassignment')
+    for table in ('taskassignment_archive', 'taskassignment'):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column('collective')
@@ -0,0 +1,49 @@
+"""resource_version table for catalog ETags
+
+Revision ID: 0004_resource_version
+Revises: 0003_open_assignment_unique
+Create Date: 2026-10-18 06:00:00.000000
+
+"""
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004_resource_version'
+down_revision: Union[str, None] = '0003_open_assignment_unique'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# app.core.versions.TASK_CATALOG / REWARD_CATALOG
+CATALOGS = ('tasks', 'rewards')
+
+
+def upgrade() -> None:
+    # Startup create_db_and_tables() may have created the table already
+    if not sa.inspect(op.get_bind()).has_table('resource_version'):
+        op.create_table('resource_version',
+        sa.Column('name', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('name')
+        )
+
+    # Start every catalog at version 1; rows a running app already bumped stay
+    resource_version = sa.table(
+        'resource_version', sa.column('name', sa.String), sa.column('version', sa.Integer),
+        sa.column('updated_at', sa.DateTime),
+    )
+    existing = {row.name for row in op.get_bind().execute(sa.select(resource_version.c.name))}
+    missing = [{'name': name, 'version': 1, 'updated_at': datetime.utcnow()}
+               for name in CATALOGS if name not in existing]
+    if missing:
+        op.bulk_insert(resource_version, missing)
+
+
+def downgrade() -> None:
+    op.drop_table('resource_version')
@@ -0,0 +1,79 @@
+"""user deletion policy for credit history, opening balances
+
+Snapshots and rollup rows are derived data and are deleted with their
+user (ON DELETE CASCADE); ledger rows keep pointing at a deleted admin
+through created_by as NULL. The ledger itself is a record: users with
+ledger rows, assignments or redemptions are deactivated, not deleted
+(the API answers 409).
+
+Also records an OPENING_BALANCE ledger row for every user with credits and
+no ledger rows yet, so balance_at() is right on databases that had users
+before the ledger existed.
+
+Revision ID: 0005_user_delete_policy
+Revises: 0004_resource_version
+Create Date: 2026-10-18 07:00:00.000000
+
+"""
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005_user_delete_policy'
+down_revision: Union[str, None] = '0004_resource_version'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, column, ON DELETE action) of foreign keys to user.id
+FOREIGN_KEYS = (
+    ('credit_snapshot', 'user_id', 'CASCADE'),
+    ('daily_assignment_rollup', 'user_id', 'CASCADE'),
+    ('credit_ledger', 'created_by', 'SET NULL'),
+)
+# Names SQLite's unnamed constraints get in batch mode (PostgreSQL keeps its own)
+NAMING_CONVENTION = {'fk': 'fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s'}
+
+
+def _set_ondelete(table: str, column: str, ondelete) -> None:
+    """Recreate the foreign key ``table.column -> user.id`` with ``ondelete`` unless it has it."""
+    foreign_keys = sa.inspect(op.get_bind()).get_foreign_keys(table)
+    current = next((fk for fk in foreign_keys if fk['constrained_columns'] == [column]), None)
+    if current is not None and (current['options'].get('ondelete') or '').upper() == (ondelete or ''):
+        return
+    name = (current or {}).get('name') or NAMING_CONVENTION['fk'] % {
+        'table_name': table, 'column_0_name': column, 'referred_table_name': 'user'
+    }
+    # Plain ALTER TABLE on PostgreSQL; SQLite copies the table
+    with op.batch_alter_table(table, naming_convention=NAMING_CONVENTION) as batch_op:
+        if current is not None:
+            batch_op.drop_constraint(name, type_='foreignkey')
+        batch_op.create_foreign_key(name, 'user', [column], ['id'], ondelete=ondelete)
+
+
+def upgrade() -> None:
+    for table, column, ondelete in FOREIGN_KEYS:
+        _set_ondelete(table, column, ondelete)
+
+    user = sa.table('user', sa.column('id', sa.Integer), sa.column('credits', sa.Integer))
+    ledger = sa.table(
+        'credit_ledger', sa.column('id', sa.Integer), sa.column('user_id', sa.Integer),
+        sa.column('amount', sa.Integer), sa.column('reason', sa.String), sa.column('created_at', sa.DateTime),
+    )
+    has_ledger = sa.exists().where(ledger.c.user_id == user.c.id)
+    # Enums are stored by name; PostgreSQL needs the enum type spelled out
+    reason = "'OPENING_BALANCE'"
+    if op.get_bind().dialect.name == 'postgresql':
+        reason += '::creditreason'
+    opening = sa.select(user.c.id, user.c.credits, sa.literal_column(reason), sa.literal(datetime.utcnow())).where(
+        user.c.credits != 0, ~has_ledger
+    )
+    op.execute(ledger.insert().from_select(['user_id', 'amount', 'reason', 'created_at'], opening))
+
+
+def downgrade() -> None:
+    for table, column, _ in FOREIGN_KEYS:
+        _set_ondelete(table, column, None)
@@ -0,0 +1,74 @@
+"""assignment ids safe to archive
+
+Archived assignments keep their id in taskassignment_archive and the
+ledger keeps pointing at it, so:
+
+- the credit_ledger.assignment_id foreign key (created by create_all on
+  older databases) is dropped; it would null the link when a row moves;
+- on SQLite taskassignment becomes AUTOINCREMENT, with the sequence moved
+  past every archived id, so ids freed by archiving or resets are never
+  handed out again (PostgreSQL sequences never reuse them).
+
+Revision ID: 0006_archive_safe_ids
+Revises: 0005_user_delete_policy
+Create Date: 2026-10-18 08:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006_archive_safe_ids'
+down_revision: Union[str, None] = '0005_user_delete_policy'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+NAMING_CONVENTION = {'fk': 'fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s'}
+
+
+def _drop_ledger_assignment_fk() -> None:
+    foreign_keys = sa.inspect(op.get_bind()).get_foreign_keys('credit_ledger')
+    current = next((fk for fk in foreign_keys if fk['constrained_columns'] == ['assignment_id']), None)
+    if current is None:
+        return
+    name = current['name'] or 'fk_credit_ledger_assignment_id_taskassignment'
+    with op.batch_alter_table('credit_ledger', naming_convention=NAMING_CONVENTION) as batch_op:
+        batch_op.drop_constraint(name, type_='foreignkey')
+
+
+def _sqlite_autoincrement() -> None:
+    bind = op.get_bind()
+    sql = bind.execute(sa.text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'taskassignment'")).scalar()
+    if 'AUTOINCREMENT' not in sql.upper():
+        with op.batch_alter_table(
+            'taskassignment', recreate='always', table_kwargs={'sqlite_autoincrement': True}
+        ) as batch_op:
+            pass
+    # Copying the rows started the sequence at the hot table's highest id;
+    # archived (or reset) rows may have used higher ones
+    highest = bind.execute(sa.text(
+        "SELECT max(coalesce((SELECT max(id) FROM taskassignment), 0),"
+        " coalesce((SELECT max(id) FROM taskassignment_archive), 0))"
+    )).scalar()
+    if bind.execute(sa.text("SELECT count(*) FROM sqlite_sequence WHERE name = 'taskassignment'")).scalar():
+        bind.execute(sa.text(
+            "UPDATE sqlite_sequence SET seq = max(seq, :highest) WHERE name = 'taskassignment'"
+        ), {'highest': highest})
+    else:
+        bind.execute(sa.text(
+            "INSERT INTO sqlite_sequence (name, seq) VALUES ('taskassignment', :highest)"
+        ), {'highest': highest})
+
+
+def upgrade() -> None:
+    _drop_ledger_assignment_fk()
+    if op.get_bind().dialect.name == 'sqlite':
+        _sqlite_autoincrement()
+
+
+def downgrade() -> None:
+    # Reusing archived ids was the bug; nothing to restore
+    pass
@@ -1,94 +1,183 @@
 from datetime import timedelta
 from fastapi import APIRouter, Depends, HTTPException, status, Response, Request, Cookie
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlmodel import Session, select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing import Optional
 import os
+import secrets
+from ..core.config import settings
 from ..core.database import get_session
-from ..core.security import verify_password, get_password_hash, create_access_token, verify_token
-from ..models.user import User
-from ..schemas.auth import Token, UserLogin, UserCreate, UserResponse
+from ..core.security import verify_password_async, get_password_hash_async, create_access_token, verify_token
+from ..models.user import User, UserRole
+from ..core.auth_cache import cached_epoch, remember_epoch
+from ..schemas.auth import Token, UserLogin, UserCreate, UserResponse, AuthenticatedUser
 
 router = APIRouter(prefix="/api/user", tags=["user"])
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/user/login")
 
 
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def create_user_token(user: User) -> str:
+    """Issue an access token carrying the identity claims used by the fast path."""
+    return create_access_token(data={
+        "sub": user.username,
+        "uid": user.id,
+        "role": UserRole(user.role).value,
+        "epoch": user.auth_epoch,
+    })
+
+
+def set_auth_cookie(response: Response, access_token: str) -> None:
+    # Set secure HTTP-only cookie
+    # Use different settings for development vs production
+    is_production = os.getenv("ENVIRONMENT", "development") == "production"
+
+    response.set_cookie(
+        key="auth_token",
+        value=access_token,
+        httponly=True,
+        secure=is_production,  # Only secure in HTTPS (production)
+        samesite="none" if is_production else "lax",  # None for production, Lax for development
+        max_age=1800,  # 30 minutes (same as token expiry)
+        path="/"
+    )
+
+
 async def get_current_user(
     request: Request,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
     token: Optional[str] = Depends(oauth2_scheme),
     auth_token: Optional[str] = Cookie(None, alias="auth_token")
-):
+) -> AuthenticatedUser:
+    """Identity of the caller, served from the token claims.
+
+    The database is only consulted when this worker has no fresh copy of the
+    user's auth epoch; a token whose epoch differs from the current one has
+    been revoked.
+    """
     # Try to get token from cookie first, then from Authorization header
     access_token = auth_token or token
 
     if not access_token:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        raise _credentials_exception()
 
     payload = verify_token(access_token)
     username: str = payload.get("sub")
     if username is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        raise _credentials_exception()
+
+    user_id = payload.get("uid")
+    token_epoch = payload.get("epoch")
+    if user_id is None or token_epoch is None:
+        # Tokens issued before identity claims existed
+        statement = select(User).where(User.username == username)
+        user = (await session.exec(statement)).first()
+        if user is None:
+            raise _credentials_exception()
+        return AuthenticatedUser(id=user.id, username=user.username, role=user.role, expires_at=payload.get("exp"))
+
+    if await current_auth_epoch(session, user_id) != token_epoch:
+        raise _credentials_exception()
+
+    try:
+        role = UserRole(payload.get("role"))
+    except ValueError:
+        raise _credentials_exception()
+    return AuthenticatedUser(
+        id=user_id, username=username, role=role, auth_epoch=token_epoch, expires_at=payload.get("exp")
+    )
 
-    statement = select(User).where(User.username == username)
-    user = session.exec(statement).first()
+
+async def current_auth_epoch(session: AsyncSession, user_id: int) -> Optional[int]:
+    """Auth epoch tokens of ``user_id`` must carry, None if the user is gone or inactive.
+
+    Served from this worker's cache while it is fresh.
+    """
+    current_epoch = cached_epoch(user_id)
+    if current_epoch is None:
+        statement = select(User.auth_epoch, User.is_active).where(User.id == user_id)
+        row = (await session.exec(statement)).first()
+        if row is None or not row.is_active:
+            return None
+        current_epoch = row.auth_epoch
+        remember_epoch(user_id, current_epoch)
+    return current_epoch
+
+
+async def get_current_db_user(
+    identity: AuthenticatedUser = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session)
+) -> User:
+    """Full ``User`` row of the caller, for endpoints that need more than the identity."""
+    user = await session.get(User, identity.id)
     if user is None:
+        raise _credentials_exception()
+    return user
+
+
+async def require_monitoring_access(
+    request: Request,
+    session: AsyncSession = Depends(get_session),
+    token: Optional[str] = Depends(oauth2_scheme),
+    auth_token: Optional[str] = Cookie(None, alias="auth_token")
+) -> None:
+    """Let the metrics scraper (``settings.metrics_token``) or an administrator through."""
+    if settings.metrics_token and token and secrets.compare_digest(token, settings.metrics_token):
+        return
+    current_user = await get_current_user(request, session, token, auth_token)
+    if current_user.role != UserRole.ADMIN:
         raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only administrators can view metrics"
         )
-    return user
+
+
+def revoke_user_tokens(user: User) -> None:
+    """Invalidate every token issued to ``user``.
+
+    Takes effect once committed; call ``forget_epoch(user.id)`` after the
+    commit so this worker stops trusting its cached epoch right away.
+    """
+    user.auth_epoch = (user.auth_epoch or 0) + 1
 
 
 @router.post("/login", response_model=Token)
 async def login(
     response: Response,
     form_data: OAuth2PasswordRequestForm = Depends(),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ):
     statement = select(User).where(User.username == form_data.username)
-    user = session.exec(statement).first()
+    user = (await session.exec(statement)).first()
 
-    if not user or not verify_password(form_data.password, user.password_hash):
+    if not user or not await verify_password_async(form_data.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    access_token = create_access_token(data={"sub": user.username})
-
-    # Set secure HTTP-only cookie
-    # Use different settings for development vs production
-    is_production = os.getenv("ENVIRONMENT", "development") == "production"
-
-    response.set_cookie(
-        key="auth_token",
-        value=access_token,
-        httponly=True,
-        secure=is_production,  # Only secure in HTTPS (production)
-        samesite="none" if is_production else "lax",  # None for production, Lax for development
-        max_age=1800,  # 30 minutes (same as token expiry)
-        path="/"
-    )
+    access_token = create_user_token(user)
+    set_auth_cookie(response, access_token)
+    if user.is_active:
+        remember_epoch(user.id, user.auth_epoch)
 
     return {"access_token": access_token, "token_type": "bearer"}
 
 
 @router.post("/register", response_model=UserResponse)
-async def register(user_data: UserCreate, session: Session = Depends(get_session)):
+async def register(user_data: UserCreate, session: AsyncSession = Depends(get_session)):
     # Check if user already exists
     statement = select(User).where(User.username == user_data.username)
-    existing_user = session.exec(statement).first()
+    existing_user = (await session.exec(statement)).first()
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -96,21 +185,21 @@ async def register(user_data: UserCreate, session: Session = Depends(get_session
         )
 
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash_async(user_data.password)
     user = User(
         username=user_data.username,
         password_hash=hashed_password,
         role=user_data.role
     )
     session.add(user)
-    session.commit()
-    session.refresh(user)
+    await session.commit()
+    await session.refresh(user)
 
     return user
 
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user_info(current_user: User = Depends(get_current_user)):
+async def get_current_user_info(current_user: User = Depends(get_current_db_user)):
     return current_user
 
 
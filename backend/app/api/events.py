@@ -0,0 +1,81 @@
+import asyncio
+import time
+from typing import AsyncIterator
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from sqlmodel.ext.asyncio.session import AsyncSession
+from ..core.config import settings
+from ..core.database import async_session_maker, get_session
+from ..core.events import broker
+from ..models.user import UserRole
+from ..schemas.auth import AuthenticatedUser
+from .auth import current_auth_epoch, get_current_user
+
+router = APIRouter(prefix="/api/events", tags=["events"])
+
+
+async def _token_still_valid(user: AuthenticatedUser) -> bool:
+    """Whether the token the stream was opened with would still be accepted."""
+    if user.expires_at is not None and time.time() >= user.expires_at:
+        return False
+    if user.auth_epoch is None:
+        return True
+    # Short session of its own: the stream holds no connection between checks
+    async with async_session_maker() as session:
+        return await current_auth_epoch(session, user.id) == user.auth_epoch
+
+
+async def _stream(user: AuthenticatedUser) -> AsyncIterator[str]:
+    subscriber = broker.subscribe(user.id, user.role == UserRole.ADMIN)
+    loop = asyncio.get_running_loop()
+    try:
+        # Sent right away so proxies pass the headers on before the first event
+        yield "retry: 3000\n: connected\n\n"
+        next_check = loop.time()
+        while True:
+            # Every heartbeat, and at expiry, the token is checked again, so
+            # revoked (password change, deactivation) and expired ones stop
+            # receiving events; the client reconnects with a fresh one
+            next_check += settings.events_heartbeat_seconds
+            if user.expires_at is not None:
+                next_check = min(next_check, loop.time() + user.expires_at - time.time())
+            timeout = next_check - loop.time()
+            while timeout > 0:
+                try:
+                    event = await asyncio.wait_for(subscriber.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if event is None:
+                    # Fell behind: closing makes the client reconnect and refetch
+                    return
+                yield event.frame()
+                timeout = next_check - loop.time()
+            if not await _token_still_valid(user):
+                return
+            yield ": keepalive\n\n"
+    finally:
+        broker.unsubscribe(subscriber)
+
+
+@router.get("")
+async def stream_events(
+    session: AsyncSession = Depends(get_session),
+    current_user: AuthenticatedUser = Depends(get_current_user)
+):
+    """Server-Sent Events with the changes the current user may see.
+
+    Administrators receive every assignment, redemption and credit event;
+    other users only the ones about themselves. Events are sent after their
+    transaction commits, as ``event: <type>`` plus a JSON ``data`` line, with
+    a keepalive comment every EVENTS_HEARTBEAT_SECONDS. The stream closes
+    when the token expires or is revoked. Nothing is replayed on reconnect:
+    clients refetch what they show when the stream (re)opens.
+    """
+    # Dependency cleanup only runs once the stream ends: return the
+    # connection used for authentication to the pool now
+    await session.close()
+    return StreamingResponse(
+        _stream(current_user),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,12 +1,21 @@
 from typing import List
 from datetime import datetime
 from pydantic import BaseModel
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from ..core.catalog import reward_catalog
 from ..core.database import get_session
-from ..models.user import User, UserRole
+from ..core.events import credits_event, publish_events, redemption_event
+from ..core.pagination import PageParams, paginate, finish_page
+from ..core.query_budget import query_budget
+from ..core.serialization import json_response
+from ..core.ledger import adjust_credits, record_credit_change
+from ..core.versions import REWARD_CATALOG, bump_version, conditional_get, forget_version
+from ..models.user import UserRole
 from ..models.reward import Reward, RewardRedemption
-from ..schemas.auth import UserResponse
+from ..models.credit import CreditReason
+from ..schemas.auth import AuthenticatedUser
 from .auth import get_current_user
 
 router = APIRouter(prefix="/api/rewards", tags=["rewards"])
@@ -49,19 +58,23 @@ class RewardRedemptionResponse(BaseModel):
 
 
 @router.get("/", response_model=List[RewardResponse])
+@query_budget(3)
 async def get_rewards(
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    response: Response,
+    session: AsyncSession = Depends(get_session),
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    etag: str = Depends(conditional_get(REWARD_CATALOG))
 ):
-    statement = select(Reward).where(Reward.is_active == True)
-    rewards = session.exec(statement).all()
-    return rewards
+    return json_response(List[RewardResponse], await reward_catalog.active(session), response)
 
 
 @router.get("/admin/all", response_model=List[RewardResponse])
+@query_budget(2)
 async def get_all_rewards_admin(
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    response: Response,
+    page: PageParams = Depends(),
+    session: AsyncSession = Depends(get_session),
+    current_user: AuthenticatedUser = Depends(get_current_user)
 ):
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(
@@ -70,16 +83,16 @@ async def get_all_rewards_admin(
         )
 
     # Return all rewards (active and inactive) for admin management
-    statement = select(Reward)
-    rewards = session.exec(statement).all()
-    return rewards
+    statement = paginate(select(Reward), Reward.created_at, Reward.id, page)
+    rewards = finish_page((await session.exec(statement)).all(), "created_at", page, response)
+    return json_response(List[RewardResponse], rewards, response)
 
 
 @router.post("/", response_model=RewardResponse)
 async def create_reward(
     reward_data: RewardCreate,
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    session: AsyncSession = Depends(get_session),
+    current_user: AuthenticatedUser = Depends(get_current_user)
 ):
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(
@@ -89,8 +102,10 @@ async def create_reward(
     
     reward = Reward(**reward_data.dict())
     session.add(reward)
-    session.commit()
-    session.refresh(reward)
+    await bump_version(session, REWARD_CATALOG)
+    await session.commit()
+    forget_version(REWARD_CATALOG)
+    await session.refresh(reward)
     return reward
 
 
@@ -98,8 +113,8 @@ async def create_reward(
 async def update_reward(
     reward_id: int,
     reward_data: RewardCreate,
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    session: AsyncSession = Depends(get_session),
+    current_user: AuthenticatedUser = Depends(get_current_user)
 ):
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(
@@ -107,7 +122,7 @@ async def update_reward(
             detail="Only administrators can update rewards"
         )
 
-    reward = session.get(Reward, reward_id)
+    reward = await session.get(Reward, reward_id)
     if not reward:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -119,8 +134,10 @@ async def update_reward(
         setattr(reward, field, value)
 
     session.add(reward)
-    session.commit()
-    session.refresh(reward)
+    await bump_version(session, REWARD_CATALOG)
+    await session.commit()
+    forget_version(REWARD_CATALOG)
+    await session.refresh(reward)
     return reward
 
 
@@ -128,8 +145,8 @@ async def update_reward(
 async def patch_reward(
     reward_id: int,
     reward_data: RewardUpdate,
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    session: AsyncSession = Depends(get_session),
+    current_user: AuthenticatedUser = Depends(get_current_user)
 ):
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(
@@ -137,7 +154,7 @@ async def patch_reward(
             detail="Only administrators can update rewards"
         )
 
-    reward = session.get(Reward, reward_id)
+    reward = await session.get(Reward, reward_id)
     if not reward:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -150,16 +167,18 @@ async def patch_reward(
         setattr(reward, field, value)
 
     session.add(reward)
-    session.commit()
-    session.refresh(reward)
+    await bump_version(session, REWARD_CATALOG)
+    await session.commit()
+    forget_version(REWARD_CATALOG)
+    await session.refresh(reward)
     return reward
 
 
 @router.delete("/{reward_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_reward(
     reward_id: int,
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    session: AsyncSession = Depends(get_session),
+    current_user: AuthenticatedUser = Depends(get_current_user)
 ):
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(
@@ -167,7 +186,7 @@ async def delete_reward(
             detail="Only administrators can delete rewards"
         )
     
-    reward = session.get(Reward, reward_id)
+    reward = await session.get(Reward, reward_id)
     if not reward:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -177,82 +196,69 @@ async def delete_reward(
     # Instead of hard delete, set as inactive
     reward.is_active = False
     session.add(reward)
-    session.commit()
+    await bump_version(session, REWARD_CATALOG)
+    await session.commit()
+    forget_version(REWARD_CATALOG)
 
 
 @router.post("/redeem/{reward_id}", response_model=RewardRedemptionResponse)
 async def redeem_reward(
     reward_id: int,
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    session: AsyncSession = Depends(get_session),
+    current_user: AuthenticatedUser = Depends(get_current_user)
 ):
     # Check if reward exists
-    reward = session.get(Reward, reward_id)
-    if not reward or not reward.is_active:
+    reward = await reward_catalog.get_active(session, reward_id)
+    if not reward:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Reward not found"
         )
     
-    # Check if user has enough credits
-    if current_user.credits < reward.cost:
+    # Deduct credits only if the balance covers the cost, in one statement
+    balance = await adjust_credits(session, current_user.id, -reward.cost, require_funds=True)
+    if balance is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Insufficient credits"
         )
     
-    # Deduct credits and create redemption
-    current_user.credits -= reward.cost
     redemption = RewardRedemption(reward_id=reward_id, user_id=current_user.id)
-    
-    session.add(current_user)
     session.add(redemption)
-    session.commit()
-    session.refresh(redemption)
+    await session.flush()
+    record_credit_change(
+        session, current_user.id, -reward.cost, CreditReason.REWARD_REDEMPTION,
+        redemption_id=redemption.id, created_by=current_user.id
+    )
+    await publish_events(session, [
+        redemption_event(redemption),
+        credits_event(current_user.id, balance, -reward.cost, CreditReason.REWARD_REDEMPTION),
+    ])
+    await session.commit()
+    await session.refresh(redemption)
     
     # Crear objeto de respuesta con la información de recompensa incluida
-    return RewardRedemptionResponse(
-        id=redemption.id,
-        reward_id=redemption.reward_id,
-        user_id=redemption.user_id,
-        redeemed_at=redemption.redeemed_at,
-        reward=RewardResponse(
-            id=reward.id,
-            name=reward.name,
-            description=reward.description,
-            cost=reward.cost,
-            is_active=reward.is_active,
-            created_at=reward.created_at
-        )
-    )
+    return json_response(RewardRedemptionResponse, {**redemption.model_dump(), "reward": reward})
 
 
 @router.get("/redemptions", response_model=List[RewardRedemptionResponse])
+@query_budget(3)
 async def get_user_redemptions(
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    response: Response,
+    page: PageParams = Depends(),
+    session: AsyncSession = Depends(get_session),
+    current_user: AuthenticatedUser = Depends(get_current_user)
 ):
     statement = select(RewardRedemption).where(RewardRedemption.user_id == current_user.id)
-    redemptions = session.exec(statement).all()
+    statement = paginate(statement, RewardRedemption.redeemed_at, RewardRedemption.id, page)
+    redemptions = finish_page((await session.exec(statement)).all(), "redeemed_at", page, response)
     
+    # Recompensas desde el catálogo en memoria, sin consulta por página
+    rewards = await reward_catalog.rows(session) if redemptions else {}
+
     # Crear objetos de respuesta con la información de recompensa incluida
-    result = []
-    for redemption in redemptions:
-        reward = session.get(Reward, redemption.reward_id)
-        response = RewardRedemptionResponse(
-            id=redemption.id,
-            reward_id=redemption.reward_id,
-            user_id=redemption.user_id,
-            redeemed_at=redemption.redeemed_at,
-            reward=RewardResponse(
-                id=reward.id,
-                name=reward.name,
-                description=reward.description,
-                cost=reward.cost,
-                is_active=reward.is_active,
-                created_at=reward.created_at
-            ) if reward else None
-        )
-        result.append(response)
-    
-    return result
+    rows = [
+        {**redemption.model_dump(), "reward": rewards.get(redemption.reward_id)}
+        for redemption in redemptions
+    ]
+    return json_response(List[RewardRedemptionResponse], rows, response)
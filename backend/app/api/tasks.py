@@ -1,28 +1,146 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
-from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlmodel import select, func
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import literal, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import selectinload
+from datetime import date, datetime, timedelta
+from ..core.archive import assignment_history
+from ..core.catalog import task_catalog
 from ..core.database import get_session
+from ..core.events import EventType, assignment_event, credits_event, publish_events
+from ..core.pagination import PageParams, paginate, finish_page
+from ..core.query_budget import query_budget
+from ..core.rollup import record_transition, record_transitions
+from ..core.serialization import json_response
+from ..core.ledger import adjust_credits, record_credit_change
+from ..core.jobs import start_job
+from ..core.reset import RESET_INLINE_LIMIT, ResetScope, count_assignments, reset_assignments
+from ..core.versions import TASK_CATALOG, bump_version, conditional_get, forget_version
 from ..models.user import User, UserRole
-from ..models.task import Task, TaskAssignment, TaskStatus
-from ..schemas.task import TaskCreate, TaskResponse, TaskAssignmentResponse, TaskAssignmentUpdate, TaskUpdate
+from ..models.task import Task, TaskAssignment, TaskStatus, TaskType
+from ..models.rollup import DailyAssignmentRollup
+from ..models.credit import CreditReason
+from ..schemas.task import (
+    TaskCreate, TaskResponse, TaskAssignmentResponse, TaskAssignmentUpdate, TaskUpdate,
+    BulkAssignRequest, BulkAssignItemResult, BulkAssignResponse, BulkReviewRequest, BulkReviewResponse,
+    ResetRequest, ResetResponse
+)
+from ..schemas.auth import AuthenticatedUser
 from .auth import get_current_user
 
 router = APIRouter(prefix="/api/tasks", tags=["tasks"])
 
+# Upper bounds for one POST /assign call (tasks x days rows)
+MAX_BULK_ASSIGN_TASKS = 50
+MAX_BULK_ASSIGN_DAYS = 31
+
+
+async def _transition_assignment(
+    session: AsyncSession,
+    assignment: TaskAssignment,
+    from_status: TaskStatus,
+    **values
+) -> bool:
+    """Conditionally move an assignment out of ``from_status``.
+
+    The status check lives in the UPDATE itself, so of two concurrent
+    approve/reject calls only one matches the row.
+    """
+    result = await session.exec(
+        update(TaskAssignment)
+        .where(TaskAssignment.id == assignment.id, TaskAssignment.status == from_status)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
+
+
+def _insert_assignments(session: AsyncSession):
+    """INSERT for TaskAssignment supporting ON CONFLICT on both backends."""
+    if session.get_bind().dialect.name == "postgresql":
+        return postgresql.insert(TaskAssignment)
+    return sqlite.insert(TaskAssignment)
+
+
+def _assignment_response(
+    assignment: TaskAssignment,
+    include_task: bool = True,
+    include_user: bool = False
+) -> TaskAssignmentResponse:
+    """Build the response from an assignment whose requested relationships were eager-loaded."""
+    assignment_dict = assignment.model_dump()
+    if include_task:
+        assignment_dict['task'] = assignment.task.model_dump() if assignment.task else None
+    if include_user:
+        assignment_dict['user'] = {
+            'id': assignment.user.id,
+            'username': assignment.user.username
+        } if assignment.user else None
+    return TaskAssignmentResponse(**assignment_dict)
+
+
+def _assignment_rows(
+    assignments: List[TaskAssignment],
+    tasks: Dict[int, Task],
+    include_user: bool = False
+) -> List[dict]:
+    """Input for ``json_response`` listing ``assignments`` with their catalog task.
+
+    Each distinct task is validated into a ``TaskResponse`` once per page
+    rather than once per row.
+    """
+    task_responses = {}
+    rows = []
+    for assignment in assignments:
+        task_response = task_responses.get(assignment.task_id)
+        if task_response is None and assignment.task_id in tasks:
+            task_response = task_responses[assignment.task_id] = TaskResponse.model_validate(tasks[assignment.task_id])
+        row = assignment.model_dump()
+        row["task"] = task_response
+        row["user"] = assignment.user if include_user else None
+        rows.append(row)
+    return rows
+
+
+def _parse_date_range(from_date: str | None, to_date: str | None) -> Tuple[Optional[date], Optional[date]]:
+    """Parse optional YYYY-MM-DD query parameters."""
+    try:
+        fd = datetime.strptime(from_date, "%Y-%m-%d").date() if from_date else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid from_date format, expected YYYY-MM-DD")
+    try:
+        td = datetime.strptime(to_date, "%Y-%m-%d").date() if to_date else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid to_date format, expected YYYY-MM-DD")
+    return fd, td
+
+
+def _filter_dates(statement, entity, fd: Optional[date], td: Optional[date]):
+    if fd:
+        statement = statement.where(entity.scheduled_date >= fd)
+    if td:
+        statement = statement.where(entity.scheduled_date <= td)
+    return statement
+
 
 @router.get("/", response_model=List[TaskResponse])
-async def get_tasks(session: Session = Depends(get_session), current_user: User = Depends(get_current_user)):
-    statement = select(Task).where(Task.is_active == True)
-    tasks = session.exec(statement).all()
-    return tasks
+@query_budget(3)
+async def get_tasks(
+    response: Response,
+    session: AsyncSession = Depends(get_session),
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    etag: str = Depends(conditional_get(TASK_CATALOG))
+):
+    return json_response(List[TaskResponse], await task_catalog.active(session), response)
 
 
 @router.post("/", response_model=TaskResponse)
 async def create_task(
     task_data: TaskCreate, 
-    session: Session = Depends(get_session), 
-    current_user: User = Depends(get_current_user)
+    session: AsyncSession = Depends(get_session), 
+    current_user: AuthenticatedUser = Depends(get_current_user)
 ):
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(
@@ -32,8 +150,10 @@ async def create_task(
     
     task = Task(**task_data.dict())
     session.add(task)
-    session.commit()
-    session.refresh(task)
+    await bump_version(session, TASK_CATALOG)
+    await session.commit()
+    forget_version(TASK_CATALOG)
+    await session.refresh(task)
     return task
 
 
@@ -41,8 +161,8 @@ async def create_task(
 async def update_task(
     task_id: int,
     task_data: TaskCreate,
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    session: AsyncSession = Depends(get_session),
+    current_user: AuthenticatedUser = Depends(get_current_user)
 ):
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(
@@ -50,7 +170,7 @@ async def update_task(
             detail="Only administrators can update tasks"
         )
 
-    task = session.get(Task, task_id)
+    task = await session.get(Task, task_id)
     if not task:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -62,8 +182,10 @@ async def update_task(
         setattr(task, field, value)
 
     session.add(task)
-    session.commit()
-    session.refresh(task)
+    await bump_version(session, TASK_CATALOG)
+    await session.commit()
+    forget_version(TASK_CATALOG)
+    await session.refresh(task)
     return task
 
 
@@ -71,8 +193,8 @@ async def update_task(
 async def patch_task(
     task_id: int,
     task_data: TaskUpdate,
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    session: AsyncSession = Depends(get_session),
+    current_user: AuthenticatedUser = Depends(get_current_user)
 ):
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(
@@ -80,7 +202,7 @@ async def patch_task(
             detail="Only administrators can update tasks"
         )
 
-    task = session.get(Task, task_id)
+    task = await session.get(Task, task_id)
     if not task:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -93,16 +215,18 @@ async def patch_task(
         setattr(task, field, value)
 
     session.add(task)
-    session.commit()
-    session.refresh(task)
+    await bump_version(session, TASK_CATALOG)
+    await session.commit()
+    forget_version(TASK_CATALOG)
+    await session.refresh(task)
     return task
 
 
 @router.delete("/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_task(
     task_id: int,
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    session: AsyncSession = Depends(get_session),
+    current_user: AuthenticatedUser = Depends(get_current_user)
 ):
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(
@@ -110,7 +234,7 @@ async def delete_task(
             detail="Only administrators can delete tasks"
         )
     
-    task = session.get(Task, task_id)
+    task = await session.get(Task, task_id)
     if not task:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -120,14 +244,16 @@ async def delete_task(
     # Instead of hard delete, set as inactive
     task.is_active = False
     session.add(task)
-    session.commit()
+    await bump_version(session, TASK_CATALOG)
+    await session.commit()
+    forget_version(TASK_CATALOG)
 
 
 @router.post("/assign/{task_id}", response_model=TaskAssignmentResponse)
 async def assign_task(
     task_id: int,
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    session: AsyncSession = Depends(get_session),
+    current_user: AuthenticatedUser = Depends(get_current_user)
 ):
     # Check if user is admin (admins cannot assign tasks to themselves)
     if current_user.role == UserRole.ADMIN:
@@ -136,95 +262,178 @@ async def assign_task(
             detail="Administrators cannot assign tasks to themselves"
         )
     
-    # Check if task exists
-    task = session.get(Task, task_id)
-    if not task or not task.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Task not found"
-        )
-    
     # Para tareas diarias: limitar por día (scheduled_date)
     today = datetime.utcnow().date()
 
-    # Para tareas individuales, permitir múltiples asignaciones a diferentes usuarios
-    # Para tareas colectivas, verificar si ya está asignada ese día
-    if task.task_type == "collective":
-        # Verificar si la tarea colectiva ya está asignada a cualquier usuario hoy
-        statement = select(TaskAssignment).where(
-            TaskAssignment.task_id == task_id,
-            TaskAssignment.scheduled_date == today,
-            TaskAssignment.status.in_([TaskStatus.PENDING, TaskStatus.COMPLETED])
-        )
-        existing_assignment = session.exec(statement).first()
-        if existing_assignment:
+    # Una sola sentencia: inserta si la tarea existe y está activa; los índices
+    # únicos parciales rechazan una segunda asignación abierta del mismo día
+    # (de cualquier usuario para tareas colectivas, del mismo usuario para las
+    # individuales), incluso entre peticiones concurrentes
+    statement = _insert_assignments(session).from_select(
+        ["task_id", "user_id", "scheduled_date", "status", "collective", "created_at"],
+        select(
+            Task.id,
+            literal(current_user.id),
+            literal(today),
+            literal(TaskStatus.PENDING, TaskAssignment.__table__.c.status.type),
+            Task.task_type == TaskType.COLLECTIVE,
+            literal(datetime.utcnow()),
+        ).where(Task.id == task_id, Task.is_active == True)
+    ).on_conflict_do_nothing().returning(TaskAssignment)
+    assignment = (await session.exec(statement)).scalars().first()
+
+    if assignment is None:
+        # Nothing inserted: find out why (only on the error path)
+        task = await session.get(Task, task_id)
+        if not task or not task.is_active:
             raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Esta tarea colectiva ya está asignada hoy a un usuario"
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Task not found"
             )
-    else:  # Tarea individual
-        # Solo verificar si el mismo usuario ya tiene esta tarea asignada hoy
-        statement = select(TaskAssignment).where(
-            TaskAssignment.task_id == task_id,
-            TaskAssignment.user_id == current_user.id,
-            TaskAssignment.scheduled_date == today,
-            TaskAssignment.status.in_([TaskStatus.PENDING, TaskStatus.COMPLETED])
-        )
-        existing_assignment = session.exec(statement).first()
-        if existing_assignment:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Ya tienes esta tarea asignada hoy"
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=(
+                "Esta tarea colectiva ya está asignada hoy a un usuario"
+                if task.task_type == TaskType.COLLECTIVE else "Ya tienes esta tarea asignada hoy"
             )
+        )
 
-    assignment = TaskAssignment(task_id=task_id, user_id=current_user.id, scheduled_date=today)
-    session.add(assignment)
-    session.commit()
-    session.refresh(assignment)
-    return assignment
+    await record_transition(session, assignment, None, TaskStatus.PENDING)
+    await publish_events(session, [assignment_event(EventType.ASSIGNMENT_CREATED, assignment, TaskStatus.PENDING)])
+    await session.commit()
+    return _assignment_response(assignment, include_task=False)
+
+
+@router.post("/assign", response_model=BulkAssignResponse)
+@query_budget(5)
+async def assign_tasks(
+    request: BulkAssignRequest,
+    session: AsyncSession = Depends(get_session),
+    current_user: AuthenticatedUser = Depends(get_current_user)
+):
+    """Assign several tasks to the current user, optionally over a date range.
+
+    The tasks are checked against the cached catalog and the valid items inserted with one
+    multi-row INSERT ... ON CONFLICT DO NOTHING, so days already taken are
+    skipped by the partial unique indexes; the whole batch commits once.
+    Items that cannot be assigned are reported individually instead of
+    failing the request.
+    """
+    if current_user.role == UserRole.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Administrators cannot assign tasks to themselves"
+        )
+
+    today = datetime.utcnow().date()
+    from_date = request.from_date or today
+    to_date = request.to_date or from_date
+    if from_date < today or to_date < from_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid date range: it must start today or later and end after it starts"
+        )
+    days = [from_date + timedelta(days=offset) for offset in range((to_date - from_date).days + 1)]
+    if not request.task_ids or len(request.task_ids) > MAX_BULK_ASSIGN_TASKS or len(days) > MAX_BULK_ASSIGN_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Assign between 1 and {MAX_BULK_ASSIGN_TASKS} tasks over at most {MAX_BULK_ASSIGN_DAYS} days"
+        )
+
+    tasks = await task_catalog.rows(session)
+
+    results = []
+    candidates = []
+    seen = set()
+    for task_id in request.task_ids:
+        for day in days:
+            item = BulkAssignItemResult(task_id=task_id, scheduled_date=day, assigned=False)
+            results.append(item)
+            task = tasks.get(task_id)
+            if (task_id, day) in seen:
+                item.detail = "Duplicated in request"
+            elif not task or not task.is_active:
+                item.detail = "Task not found"
+            else:
+                candidates.append(item)
+            seen.add((task_id, day))
+
+    assigned = 0
+    if candidates:
+        # Rows clashing with an open assignment are skipped by the partial
+        # unique indexes; whatever RETURNING leaves out was already taken
+        now = datetime.utcnow()
+        created = (await session.exec(
+            _insert_assignments(session)
+            .values([
+                {
+                    "task_id": item.task_id,
+                    "user_id": current_user.id,
+                    "scheduled_date": item.scheduled_date,
+                    "status": TaskStatus.PENDING,
+                    "collective": tasks[item.task_id].task_type == TaskType.COLLECTIVE,
+                    "created_at": now,
+                }
+                for item in candidates
+            ])
+            .on_conflict_do_nothing()
+            .returning(TaskAssignment)
+        )).scalars().all()
+        if created:
+            await record_transitions(session, [(assignment, None, TaskStatus.PENDING, 0) for assignment in created])
+            await publish_events(session, [
+                assignment_event(EventType.ASSIGNMENT_CREATED, assignment, TaskStatus.PENDING) for assignment in created
+            ])
+            await session.commit()
+
+        by_key = {(assignment.task_id, assignment.scheduled_date): assignment for assignment in created}
+        for item in candidates:
+            assignment = by_key.get((item.task_id, item.scheduled_date))
+            if assignment is None:
+                item.detail = (
+                    "Esta tarea colectiva ya está asignada ese día a un usuario"
+                    if tasks[item.task_id].task_type == TaskType.COLLECTIVE else "Ya tienes esta tarea asignada ese día"
+                )
+                continue
+            item.assigned = True
+            item.assignment = _assignment_response(assignment, include_task=False)
+            assigned += 1
+
+    return BulkAssignResponse(assigned=assigned, failed=len(results) - assigned, results=results)
 
 
 @router.get("/assignments", response_model=List[TaskAssignmentResponse])
+@query_budget(5)
 async def get_user_assignments(
+    response: Response,
     from_date: str | None = None,
     to_date: str | None = None,
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    page: PageParams = Depends(),
+    session: AsyncSession = Depends(get_session),
+    current_user: AuthenticatedUser = Depends(get_current_user)
 ):
-    statement = select(TaskAssignment).where(TaskAssignment.user_id == current_user.id)
     # Apply date filters if provided (YYYY-MM-DD)
-    if from_date:
-        try:
-            fd = datetime.strptime(from_date, "%Y-%m-%d").date()
-            statement = statement.where(TaskAssignment.scheduled_date >= fd)
-        except ValueError:
-            raise HTTPException(status_code=400, detail="Invalid from_date format, expected YYYY-MM-DD")
-    if to_date:
-        try:
-            td = datetime.strptime(to_date, "%Y-%m-%d").date()
-            statement = statement.where(TaskAssignment.scheduled_date <= td)
-        except ValueError:
-            raise HTTPException(status_code=400, detail="Invalid to_date format, expected YYYY-MM-DD")
+    fd, td = _parse_date_range(from_date, to_date)
+    # Ranges reaching past the archive horizon also read archived rows
+    history = assignment_history(fd)
+    statement = select(history).where(history.user_id == current_user.id)
+    statement = _filter_dates(statement, history, fd, td)
 
-    assignments = session.exec(statement).all()
-
-    # Create response objects with task data
-    response_assignments = []
-    for assignment in assignments:
-        task = session.get(Task, assignment.task_id)
-        assignment_dict = assignment.dict()
-        assignment_dict['task'] = task.dict() if task else None
-        response_assignments.append(TaskAssignmentResponse(**assignment_dict))
-
-    return response_assignments
+    statement = paginate(statement, history.scheduled_date, history.id, page)
+    assignments = finish_page((await session.exec(statement)).all(), "scheduled_date", page, response)
+    rows = _assignment_rows(assignments, await task_catalog.rows(session))
+    return json_response(List[TaskAssignmentResponse], rows, response)
 
 
 @router.get("/assignments/all", response_model=List[TaskAssignmentResponse])
+@query_budget(6)
 async def get_all_assignments(
+    response: Response,
     from_date: str | None = None,
     to_date: str | None = None,
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    page: PageParams = Depends(),
+    session: AsyncSession = Depends(get_session),
+    current_user: AuthenticatedUser = Depends(get_current_user)
 ):
     """Get all task assignments - only for administrators"""
     if current_user.role != UserRole.ADMIN:
@@ -233,46 +442,24 @@ async def get_all_assignments(
             detail="Only administrators can view all assignments"
         )
 
-    statement = select(TaskAssignment)
-    # Apply date filters if provided
-    if from_date:
-        try:
-            fd = datetime.strptime(from_date, "%Y-%m-%d").date()
-            statement = statement.where(TaskAssignment.scheduled_date >= fd)
-        except ValueError:
-            raise HTTPException(status_code=400, detail="Invalid from_date format, expected YYYY-MM-DD")
-    if to_date:
-        try:
-            td = datetime.strptime(to_date, "%Y-%m-%d").date()
-            statement = statement.where(TaskAssignment.scheduled_date <= td)
-        except ValueError:
-            raise HTTPException(status_code=400, detail="Invalid to_date format, expected YYYY-MM-DD")
+    fd, td = _parse_date_range(from_date, to_date)
+    history = assignment_history(fd)
+    statement = select(history).options(selectinload(history.user))
+    statement = _filter_dates(statement, history, fd, td)
 
-    assignments = session.exec(statement).all()
-
-    # Create response objects with task and user data
-    response_assignments = []
-    for assignment in assignments:
-        task = session.get(Task, assignment.task_id)
-        user = session.get(User, assignment.user_id)
-        assignment_dict = assignment.dict()
-        assignment_dict['task'] = task.dict() if task else None
-        assignment_dict['user'] = {
-            'id': user.id,
-            'username': user.username
-        } if user else None
-        response_assignments.append(TaskAssignmentResponse(**assignment_dict))
-
-    return response_assignments
+    statement = paginate(statement, history.scheduled_date, history.id, page)
+    assignments = finish_page((await session.exec(statement)).all(), "scheduled_date", page, response)
+    rows = _assignment_rows(assignments, await task_catalog.rows(session), include_user=True)
+    return json_response(List[TaskAssignmentResponse], rows, response)
 
 
 @router.patch("/complete/{assignment_id}", response_model=TaskAssignmentResponse)
 async def complete_task(
     assignment_id: int,
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    session: AsyncSession = Depends(get_session),
+    current_user: AuthenticatedUser = Depends(get_current_user)
 ):
-    assignment = session.get(TaskAssignment, assignment_id)
+    assignment = await session.get(TaskAssignment, assignment_id)
     if not assignment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -294,16 +481,18 @@ async def complete_task(
     assignment.status = TaskStatus.COMPLETED
     assignment.completed_at = datetime.utcnow()
     session.add(assignment)
-    session.commit()
-    session.refresh(assignment)
-    return assignment
+    await record_transition(session, assignment, TaskStatus.PENDING, TaskStatus.COMPLETED)
+    await publish_events(session, [assignment_event(EventType.ASSIGNMENT_COMPLETED, assignment, TaskStatus.COMPLETED)])
+    await session.commit()
+    await session.refresh(assignment)
+    return _assignment_response(assignment, include_task=False)
 
 
 @router.patch("/approve/{assignment_id}", response_model=TaskAssignmentResponse)
 async def approve_task(
     assignment_id: int,
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    session: AsyncSession = Depends(get_session),
+    current_user: AuthenticatedUser = Depends(get_current_user)
 ):
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(
@@ -311,7 +500,7 @@ async def approve_task(
             detail="Only administrators can approve tasks"
         )
     
-    assignment = session.get(TaskAssignment, assignment_id)
+    assignment = await session.get(TaskAssignment, assignment_id)
     if not assignment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -325,28 +514,44 @@ async def approve_task(
         )
     
     # Get task to award credits
-    task = session.get(Task, assignment.task_id)
-    user = session.get(User, assignment.user_id)
-    
-    assignment.status = TaskStatus.APPROVED
-    assignment.approved_at = datetime.utcnow()
-    assignment.approved_by = current_user.id
-    
+    task = (await task_catalog.get_many(session, [assignment.task_id]))[assignment.task_id]
+
+    if not await _transition_assignment(
+        session, assignment, TaskStatus.COMPLETED,
+        status=TaskStatus.APPROVED, approved_at=datetime.utcnow(), approved_by=current_user.id
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Task must be completed before approval"
+        )
+
     # Award credits to user
-    user.credits += task.credits
-    
-    session.add(assignment)
-    session.add(user)
-    session.commit()
-    session.refresh(assignment)
-    return assignment
+    balance = await adjust_credits(session, assignment.user_id, task.credits)
+    if balance is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+
+    record_credit_change(
+        session, assignment.user_id, task.credits, CreditReason.TASK_APPROVAL,
+        assignment_id=assignment.id, created_by=current_user.id
+    )
+    await record_transition(session, assignment, TaskStatus.COMPLETED, TaskStatus.APPROVED, credits=task.credits)
+    await publish_events(session, [
+        assignment_event(EventType.ASSIGNMENT_APPROVED, assignment, TaskStatus.APPROVED),
+        credits_event(assignment.user_id, balance, task.credits, CreditReason.TASK_APPROVAL),
+    ])
+    await session.commit()
+    await session.refresh(assignment)
+    return _assignment_response(assignment, include_task=False)
 
 
 @router.patch("/reject/{assignment_id}", response_model=TaskAssignmentResponse)
 async def reject_task(
     assignment_id: int,
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    session: AsyncSession = Depends(get_session),
+    current_user: AuthenticatedUser = Depends(get_current_user)
 ):
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(
@@ -354,7 +559,7 @@ async def reject_task(
             detail="Only administrators can reject tasks"
         )
     
-    assignment = session.get(TaskAssignment, assignment_id)
+    assignment = await session.get(TaskAssignment, assignment_id)
     if not assignment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -367,21 +572,134 @@ async def reject_task(
             detail="Task must be completed before rejection"
         )
     
-    assignment.status = TaskStatus.REJECTED
-    assignment.approved_by = current_user.id
-    
-    session.add(assignment)
-    session.commit()
-    session.refresh(assignment)
-    return assignment
+    if not await _transition_assignment(
+        session, assignment, TaskStatus.COMPLETED,
+        status=TaskStatus.REJECTED, approved_by=current_user.id
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Task must be completed before rejection"
+        )
+
+    await record_transition(session, assignment, TaskStatus.COMPLETED, TaskStatus.REJECTED)
+    await publish_events(session, [assignment_event(EventType.ASSIGNMENT_REJECTED, assignment, TaskStatus.REJECTED)])
+    await session.commit()
+    await session.refresh(assignment)
+    return _assignment_response(assignment, include_task=False)
+
+
+async def _review_assignments(
+    session: AsyncSession,
+    request: BulkReviewRequest,
+    to_status: TaskStatus,
+    reviewer_id: int
+) -> BulkReviewResponse:
+    """Approve or reject every completed assignment matching ``request`` in one transaction.
+
+    One UPDATE ... RETURNING moves the matching rows, credits are summed per
+    user and applied with one conditional UPDATE each, and the ledger rows
+    and rollup deltas are written in bulk before the single commit.
+    """
+    if not request.assignment_ids and request.scheduled_date is None and request.user_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide assignment_ids or a filter (scheduled_date, user_id)"
+        )
+
+    statement = update(TaskAssignment).where(TaskAssignment.status == TaskStatus.COMPLETED)
+    if request.assignment_ids:
+        statement = statement.where(TaskAssignment.id.in_(set(request.assignment_ids)))
+    if request.scheduled_date is not None:
+        statement = statement.where(TaskAssignment.scheduled_date == request.scheduled_date)
+    if request.user_id is not None:
+        statement = statement.where(TaskAssignment.user_id == request.user_id)
+    values = {"status": to_status, "approved_by": reviewer_id}
+    if to_status == TaskStatus.APPROVED:
+        values["approved_at"] = datetime.utcnow()
+    rows = (await session.exec(
+        statement.values(**values)
+        .returning(TaskAssignment.id, TaskAssignment.user_id, TaskAssignment.task_id, TaskAssignment.scheduled_date)
+        .execution_options(synchronize_session=False)
+    )).all()
+
+    credits_by_task = {}
+    if rows and to_status == TaskStatus.APPROVED:
+        tasks = await task_catalog.get_many(session, {row.task_id for row in rows})
+        credits_by_task = {task_id: task.credits for task_id, task in tasks.items()}
+
+    credits_by_user = {}
+    transitions = []
+    for row in rows:
+        credits = credits_by_task[row.task_id] if to_status == TaskStatus.APPROVED else 0
+        transitions.append((row, TaskStatus.COMPLETED, to_status, credits))
+        if credits:
+            credits_by_user[row.user_id] = credits_by_user.get(row.user_id, 0) + credits
+            record_credit_change(
+                session, row.user_id, credits, CreditReason.TASK_APPROVAL,
+                assignment_id=row.id, created_by=reviewer_id
+            )
+
+    event_type = EventType.ASSIGNMENT_APPROVED if to_status == TaskStatus.APPROVED else EventType.ASSIGNMENT_REJECTED
+    events = [assignment_event(event_type, row, to_status) for row in rows]
+    # Fixed order so concurrent bulk approvals lock users consistently
+    for user_id in sorted(credits_by_user):
+        balance = await adjust_credits(session, user_id, credits_by_user[user_id])
+        if balance is not None:
+            events.append(credits_event(user_id, balance, credits_by_user[user_id], CreditReason.TASK_APPROVAL))
+    await record_transitions(session, transitions)
+    await publish_events(session, events)
+    await session.commit()
+
+    updated_ids = [row.id for row in rows]
+    updated = set(updated_ids)
+    return BulkReviewResponse(
+        status=to_status,
+        updated=len(updated_ids),
+        assignment_ids=updated_ids,
+        skipped_ids=[assignment_id for assignment_id in (request.assignment_ids or []) if assignment_id not in updated],
+        credits_by_user=credits_by_user
+    )
+
+
+@router.patch("/assignments/approve", response_model=BulkReviewResponse)
+async def approve_tasks(
+    request: BulkReviewRequest,
+    session: AsyncSession = Depends(get_session),
+    current_user: AuthenticatedUser = Depends(get_current_user)
+):
+    """Approve completed assignments in bulk, by ids and/or date/user filter."""
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only administrators can approve tasks"
+        )
+    return await _review_assignments(session, request, TaskStatus.APPROVED, current_user.id)
+
+
+@router.patch("/assignments/reject", response_model=BulkReviewResponse)
+async def reject_tasks(
+    request: BulkReviewRequest,
+    session: AsyncSession = Depends(get_session),
+    current_user: AuthenticatedUser = Depends(get_current_user)
+):
+    """Reject completed assignments in bulk, by ids and/or date/user filter."""
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only administrators can reject tasks"
+        )
+    return await _review_assignments(session, request, TaskStatus.REJECTED, current_user.id)
 
 
 @router.get("/pending-approvals", response_model=List[TaskAssignmentResponse])
+@query_budget(6)
 async def get_pending_approvals(
+    response: Response,
     from_date: str | None = None,
     to_date: str | None = None,
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    page: PageParams = Depends(),
+    session: AsyncSession = Depends(get_session),
+    current_user: AuthenticatedUser = Depends(get_current_user)
 ):
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(
@@ -389,34 +707,68 @@ async def get_pending_approvals(
             detail="Only administrators can view pending approvals"
         )
 
-    statement = select(TaskAssignment).where(TaskAssignment.status == TaskStatus.COMPLETED)
-    # Apply date filters if provided
-    if from_date:
-        try:
-            fd = datetime.strptime(from_date, "%Y-%m-%d").date()
-            statement = statement.where(TaskAssignment.scheduled_date >= fd)
-        except ValueError:
-            raise HTTPException(status_code=400, detail="Invalid from_date format, expected YYYY-MM-DD")
-    if to_date:
-        try:
-            td = datetime.strptime(to_date, "%Y-%m-%d").date()
-            statement = statement.where(TaskAssignment.scheduled_date <= td)
-        except ValueError:
-            raise HTTPException(status_code=400, detail="Invalid to_date format, expected YYYY-MM-DD")
+    statement = (
+        select(TaskAssignment)
+        .where(TaskAssignment.status == TaskStatus.COMPLETED)
+        .options(selectinload(TaskAssignment.user))
+    )
+    # Apply date filters if provided; open assignments are never archived
+    fd, td = _parse_date_range(from_date, to_date)
+    statement = _filter_dates(statement, TaskAssignment, fd, td)
+
+    statement = paginate(statement, TaskAssignment.scheduled_date, TaskAssignment.id, page)
+    assignments = finish_page((await session.exec(statement)).all(), "scheduled_date", page, response)
+    rows = _assignment_rows(assignments, await task_catalog.rows(session), include_user=True)
+    return json_response(List[TaskAssignmentResponse], rows, response)
+
+
+async def _reset(session: AsyncSession, scope: ResetScope, response: Response, current_user: AuthenticatedUser) -> ResetResponse:
+    total = await count_assignments(session, scope)
+    if total <= RESET_INLINE_LIMIT:
+        deleted = await reset_assignments(session, scope)
+        return ResetResponse(
+            message=f"Successfully reset {deleted} task assignments", total=total, deleted=deleted
+        )
 
-    assignments = session.exec(statement).all()
+    async def run(job_session: AsyncSession, job_id: str) -> None:
+        await reset_assignments(job_session, scope, job_id=job_id)
 
-    # Load task data for each assignment
-    for assignment in assignments:
-        assignment.task = session.get(Task, assignment.task_id)
+    job = await start_job(session, "reset_assignments", run, params=scope.as_dict(), total=total, created_by=current_user.id)
+    response.status_code = status.HTTP_202_ACCEPTED
+    return ResetResponse(
+        message=f"Reset of {total} task assignments started", total=total, job_id=job.id
+    )
 
-    return assignments
 
+@router.post("/reset", response_model=ResetResponse)
+async def reset_tasks(
+    request: ResetRequest,
+    response: Response,
+    session: AsyncSession = Depends(get_session),
+    current_user: AuthenticatedUser = Depends(get_current_user)
+):
+    """Delete assignments by date range, user and/or task - only for administrators.
 
-@router.post("/reset-all")
+    Small resets run inline; larger ones return 202 with a job id whose
+    progress is available at GET /api/jobs/{job_id}.
+    """
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only administrators can reset tasks"
+        )
+    if request.from_date and request.to_date and request.to_date < request.from_date:
+        raise HTTPException(status_code=400, detail="to_date must not be before from_date")
+
+    scope = ResetScope(request.from_date, request.to_date, request.user_id, request.task_id)
+    return await _reset(session, scope, response, current_user)
+
+
+@router.post("/reset-all", response_model=ResetResponse)
 async def reset_all_tasks(
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    response: Response,
+    session: AsyncSession = Depends(get_session),
+    current_user: AuthenticatedUser = Depends(get_current_user)
 ):
     """Reset all task assignments - only for administrators"""
     if current_user.role != UserRole.ADMIN:
@@ -425,29 +777,37 @@ async def reset_all_tasks(
             detail="Only administrators can reset tasks"
         )
 
-    # Delete all task assignments to make tasks available again
-    statement = select(TaskAssignment)
-    assignments = session.exec(statement).all()
+    return await _reset(session, ResetScope(), response, current_user)
 
-    for assignment in assignments:
-        session.delete(assignment)
-
-    session.commit()
 
-    return {"message": f"Successfully reset {len(assignments)} task assignments"}
+STATS_GROUP_BY = ("day", "user", "task")
+STATS_COUNTERS = ("pending", "completed", "approved", "rejected", "credits")
 
 
 @router.get("/stats/daily")
+@query_budget(2)
 async def get_daily_stats(
     from_date: str | None = None,
     to_date: str | None = None,
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    group_by: str | None = None,
+    session: AsyncSession = Depends(get_session),
+    current_user: AuthenticatedUser = Depends(get_current_user)
 ):
-    """Return counts per status in a date range (scheduled_date). Admin only."""
+    """Return counts per status in a date range (scheduled_date). Admin only.
+
+    Reads the daily rollup, so the cost depends on the number of days in the
+    range rather than the number of assignments. With ``group_by=day|user|task``
+    the response also carries a ``groups`` breakdown from the same query.
+    """
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(status_code=403, detail="Only administrators can view stats")
 
+    if group_by is not None and group_by not in STATS_GROUP_BY:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid group_by, expected one of: {', '.join(STATS_GROUP_BY)}"
+        )
+
     # Default to today if not provided
     if not from_date and not to_date:
         today = datetime.utcnow().date()
@@ -459,27 +819,48 @@ async def get_daily_stats(
         except ValueError:
             raise HTTPException(status_code=400, detail="Invalid date format, expected YYYY-MM-DD")
 
-    statement = select(TaskAssignment).where(
-        TaskAssignment.scheduled_date >= from_dt,
-        TaskAssignment.scheduled_date <= to_dt,
+    # Dimension columns selected and grouped alongside the summed counters
+    if group_by == "day":
+        dimensions = [DailyAssignmentRollup.scheduled_date.label("date")]
+    elif group_by == "user":
+        dimensions = [DailyAssignmentRollup.user_id.label("user_id"), User.username.label("username")]
+    elif group_by == "task":
+        dimensions = [DailyAssignmentRollup.task_id.label("task_id"), Task.name.label("task_name")]
+    else:
+        dimensions = []
+
+    sums = [
+        func.coalesce(func.sum(getattr(DailyAssignmentRollup, counter)), 0).label(counter)
+        for counter in STATS_COUNTERS
+    ]
+    statement = select(*dimensions, *sums)
+    if group_by == "user":
+        statement = statement.join(User, User.id == DailyAssignmentRollup.user_id)
+    elif group_by == "task":
+        statement = statement.join(Task, Task.id == DailyAssignmentRollup.task_id)
+    statement = statement.where(
+        DailyAssignmentRollup.scheduled_date >= from_dt,
+        DailyAssignmentRollup.scheduled_date <= to_dt,
     )
-    assignments = session.exec(statement).all()
-
-    counts = {s: 0 for s in [
-        TaskStatus.PENDING.value,
-        TaskStatus.COMPLETED.value,
-        TaskStatus.APPROVED.value,
-        TaskStatus.REJECTED.value,
-    ]}
-    for a in assignments:
-        counts[a.status.value] = counts.get(a.status.value, 0) + 1
-
-    return {
+    if dimensions:
+        statement = statement.group_by(*dimensions).order_by(*dimensions)
+    rows = (await session.exec(statement)).all()
+
+    groups = []
+    counts = {"total": 0, **{counter: 0 for counter in STATS_COUNTERS}}
+    for row in rows:
+        group = dict(row._mapping)
+        group["total"] = sum(group[counter] for counter in STATS_COUNTERS if counter != "credits")
+        for counter in ("total", *STATS_COUNTERS):
+            counts[counter] += group[counter]
+        groups.append(group)
+
+    result = {
         "from_date": from_dt.isoformat(),
         "to_date": to_dt.isoformat(),
-        "total": len(assignments),
-        "pending": counts[TaskStatus.PENDING.value],
-        "completed": counts[TaskStatus.COMPLETED.value],
-        "approved": counts[TaskStatus.APPROVED.value],
-        "rejected": counts[TaskStatus.REJECTED.value],
+        **counts,
     }
+    if group_by:
+        result["group_by"] = group_by
+        result["groups"] = groups
+    return result
@@ -1,23 +1,95 @@
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select, func
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import select, func
+from sqlmodel.ext.asyncio.session import AsyncSession
 from ..core.database import get_session
+from ..core.events import credits_event, publish_events
+from ..core.archive import assignment_history
+from ..core.pagination import PageParams, paginate, finish_page
+from ..core.serialization import json_response
 from ..models.user import User, UserRole
-from ..models.task import TaskAssignment, TaskStatus, Task
-from ..schemas.auth import UserResponse, UserCreate
-from ..schemas.user import UserUpdate, UserStats, PasswordChange
-from .auth import get_current_user
-from ..core.security import get_password_hash, verify_password
+from ..models.task import TaskAssignment, TaskAssignmentArchive, TaskStatus, Task
+from ..models.reward import RewardRedemption
+from ..schemas.auth import UserResponse, UserCreate, AuthenticatedUser
+from ..schemas.user import UserUpdate, UserStats, UserStatsEntry, PasswordChange
+from .auth import get_current_user, get_current_db_user, revoke_user_tokens, create_user_token, set_auth_cookie
+from ..core.auth_cache import forget_epoch
+from ..core.security import get_password_hash_async, verify_password_async
+from ..core.ledger import adjust_credits, record_credit_change, balance_at
+from ..models.credit import CreditLedger, CreditReason
+from ..schemas.credit import CreditLedgerEntry, CreditBalance, CreditSummary
 
 router = APIRouter(prefix="/api/users", tags=["users"])
 
 
+def _user_has_history() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="User has credit, task or reward history; deactivate it instead"
+    )
+
+
+async def _apply_credit_adjustment(
+    session: AsyncSession,
+    user: User,
+    update_data: dict,
+    current_user: AuthenticatedUser
+) -> None:
+    """Apply an admin edit of ``credits`` as a delta and log it in the ledger.
+
+    The edit is turned into the difference from the balance read with
+    ``user`` and applied with one atomic UPDATE, like approvals and
+    redemptions, so a concurrent credit change is kept rather than
+    overwritten; ledger and balance stay in step. ``credits`` is taken out
+    of ``update_data``: refresh ``user`` after the commit.
+    """
+    new_credits = update_data.pop("credits", None)
+    if new_credits is None or new_credits == user.credits:
+        return
+    amount = new_credits - user.credits
+    balance = await adjust_credits(session, user.id, amount)
+    if balance is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    record_credit_change(
+        session, user.id, amount, CreditReason.ADMIN_ADJUSTMENT,
+        created_by=current_user.id
+    )
+    await publish_events(session, [credits_event(user.id, balance, amount, CreditReason.ADMIN_ADJUSTMENT)])
+
+
+def _revoke_tokens_if_needed(user: User, update_data: dict) -> bool:
+    """Revoke existing tokens when the password, role or active flag changes."""
+    changed = "password_hash" in update_data or any(
+        field in update_data and update_data[field] != getattr(user, field)
+        for field in ("role", "is_active")
+    )
+    if changed:
+        revoke_user_tokens(user)
+    return changed
+
+
+def _check_stats_access(current_user: AuthenticatedUser, user_id: int) -> None:
+    # Users can only see their own data, admins can see anyone's
+    if current_user.role != UserRole.ADMIN and current_user.id != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Can only view your own statistics"
+        )
+
+
 @router.post("/{user_id}/change-password", status_code=status.HTTP_200_OK)
 async def change_user_password(
     user_id: int,
     password_change: PasswordChange,
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    response: Response,
+    session: AsyncSession = Depends(get_session),
+    current_user: AuthenticatedUser = Depends(get_current_user)
 ):
     # Verificar si el usuario tiene permisos para cambiar esta contraseña
     # Los administradores pueden cambiar cualquier contraseña, los usuarios solo la suya
@@ -28,7 +100,7 @@ async def change_user_password(
         )
 
     # Obtener el usuario cuya contraseña se va a cambiar
-    user = session.get(User, user_id)
+    user = await session.get(User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -37,30 +109,38 @@ async def change_user_password(
 
     # Si es el propio usuario cambiando su contraseña, verificar la contraseña actual
     if current_user.id == user_id:
-        if not verify_password(password_change.current_password, user.password_hash):
+        if not await verify_password_async(password_change.current_password, user.password_hash):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="La contraseña actual es incorrecta"
             )
 
-    # Actualizar la contraseña
-    user.password_hash = get_password_hash(password_change.new_password)
+    # Actualizar la contraseña e invalidar los tokens emitidos antes del cambio
+    user.password_hash = await get_password_hash_async(password_change.new_password)
+    revoke_user_tokens(user)
     session.add(user)
-    session.commit()
+    await session.commit()
+    forget_epoch(user.id)
+
+    # El propio usuario sigue conectado con un token nuevo
+    if current_user.id == user_id:
+        access_token = create_user_token(user)
+        set_auth_cookie(response, access_token)
+        return {"message": "Contraseña actualizada correctamente", "access_token": access_token, "token_type": "bearer"}
 
     return {"message": "Contraseña actualizada correctamente"}
 
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user_profile(current_user: User = Depends(get_current_user)):
+async def get_current_user_profile(current_user: User = Depends(get_current_db_user)):
     return current_user
 
 
 @router.patch("/me", response_model=UserResponse)
 async def update_current_user(
     user_update: UserUpdate,
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_db_user)
 ):
     update_data = user_update.dict(exclude_unset=True)
     
@@ -72,90 +152,197 @@ async def update_current_user(
     
     # Hash password if provided
     if "password" in update_data:
-        from ..core.security import get_password_hash
-        update_data["password_hash"] = get_password_hash(update_data.pop("password"))
+        update_data["password_hash"] = await get_password_hash_async(update_data.pop("password"))
     
+    await _apply_credit_adjustment(session, current_user, update_data, current_user)
+    revoked = _revoke_tokens_if_needed(current_user, update_data)
     for field, value in update_data.items():
         setattr(current_user, field, value)
     
     session.add(current_user)
-    session.commit()
-    session.refresh(current_user)
+    await session.commit()
+    if revoked:
+        forget_epoch(current_user.id)
+    await session.refresh(current_user)
     return current_user
 
 
-@router.get("/{user_id}/stats", response_model=UserStats)
-async def get_user_stats(
-    user_id: int,
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+def _user_stats_statement():
+    """One grouped query producing every UserStats counter per user.
+
+    Counts cover archived assignments too.
+    """
+    history = assignment_history()
+    approved = history.status == TaskStatus.APPROVED
+    return (
+        select(
+            User.id,
+            User.username,
+            func.count(history.id).filter(approved).label("approved_tasks"),
+            func.count(history.id).filter(history.status == TaskStatus.PENDING).label("pending_tasks"),
+            func.count(history.id).filter(history.status == TaskStatus.REJECTED).label("rejected_tasks"),
+            # Calcular el total de créditos ganados históricamente sumando los créditos de las tareas aprobadas
+            func.coalesce(func.sum(Task.credits).filter(approved), 0).label("total_credits_earned"),
+        )
+        .outerjoin(history, history.user_id == User.id)
+        .outerjoin(Task, Task.id == history.task_id)
+        .group_by(User.id, User.username)
+    )
+
+
+def _row_to_stats(row) -> UserStatsEntry:
+    return UserStatsEntry(
+        user_id=row.id,
+        username=row.username,
+        total_tasks_completed=row.approved_tasks,
+        total_credits_earned=row.total_credits_earned,
+        pending_tasks=row.pending_tasks,
+        approved_tasks=row.approved_tasks,
+        rejected_tasks=row.rejected_tasks
+    )
+
+
+@router.get("/stats", response_model=List[UserStatsEntry])
+async def get_users_stats(
+    user_ids: List[int] | None = Query(None, alias="user_id"),
+    role: UserRole | None = None,
+    is_active: bool | None = None,
+    session: AsyncSession = Depends(get_session),
+    current_user: AuthenticatedUser = Depends(get_current_user)
 ):
-    # Users can only see their own stats, admins can see anyone's
-    if current_user.role != UserRole.ADMIN and current_user.id != user_id:
+    """Statistics for every user (or the filtered set) from a single query. Admin only."""
+    if current_user.role != UserRole.ADMIN:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
-            detail="Can only view your own statistics"
+            detail="Only administrators can view all statistics"
         )
+
+    statement = _user_stats_statement()
+    if user_ids:
+        statement = statement.where(User.id.in_(user_ids))
+    if role is not None:
+        statement = statement.where(User.role == role)
+    if is_active is not None:
+        statement = statement.where(User.is_active == is_active)
+
+    rows = (await session.exec(statement.order_by(User.id))).all()
+    return json_response(List[UserStatsEntry], [_row_to_stats(row) for row in rows])
+
+
+@router.get("/{user_id}/stats", response_model=UserStats)
+async def get_user_stats(
+    user_id: int,
+    session: AsyncSession = Depends(get_session),
+    current_user: AuthenticatedUser = Depends(get_current_user)
+):
+    _check_stats_access(current_user, user_id)
     
-    # Check if user exists
-    user = session.get(User, user_id)
-    if not user:
+    # No row means the user does not exist
+    row = (await session.exec(_user_stats_statement().where(User.id == user_id))).first()
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
     
-    # Calculate statistics
-    total_tasks_completed = session.exec(
-        select(func.count(TaskAssignment.id)).where(
-            TaskAssignment.user_id == user_id,
-            TaskAssignment.status == TaskStatus.APPROVED
-        )
-    ).first() or 0
-    
-    pending_tasks = session.exec(
-        select(func.count(TaskAssignment.id)).where(
-            TaskAssignment.user_id == user_id,
-            TaskAssignment.status == TaskStatus.PENDING
-        )
-    ).first() or 0
-    
-    approved_tasks = session.exec(
-        select(func.count(TaskAssignment.id)).where(
-            TaskAssignment.user_id == user_id,
-            TaskAssignment.status == TaskStatus.APPROVED
-        )
-    ).first() or 0
-    
-    rejected_tasks = session.exec(
-        select(func.count(TaskAssignment.id)).where(
-            TaskAssignment.user_id == user_id,
-            TaskAssignment.status == TaskStatus.REJECTED
-        )
-    ).first() or 0
-    
-    # Calcular el total de créditos ganados históricamente sumando los créditos de las tareas aprobadas
-    total_credits_earned = session.exec(
-        select(func.sum(Task.credits)).join(TaskAssignment).where(
-            TaskAssignment.user_id == user_id,
-            TaskAssignment.status == TaskStatus.APPROVED,
-            TaskAssignment.task_id == Task.id
+    return _row_to_stats(row)
+
+
+def _parse_datetime(value: str | None, field: str) -> datetime | None:
+    if value is None:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid {field} format, expected ISO 8601")
+
+
+@router.get("/{user_id}/credits/history", response_model=List[CreditLedgerEntry])
+async def get_credit_history(
+    user_id: int,
+    response: Response,
+    from_date: str | None = None,
+    to_date: str | None = None,
+    page: PageParams = Depends(),
+    session: AsyncSession = Depends(get_session),
+    current_user: AuthenticatedUser = Depends(get_current_user)
+):
+    """Credit movements of a user, read straight from the ledger."""
+    _check_stats_access(current_user, user_id)
+
+    statement = select(CreditLedger).where(CreditLedger.user_id == user_id)
+    from_dt = _parse_datetime(from_date, "from_date")
+    to_dt = _parse_datetime(to_date, "to_date")
+    if from_dt:
+        statement = statement.where(CreditLedger.created_at >= from_dt)
+    if to_dt:
+        statement = statement.where(CreditLedger.created_at <= to_dt)
+
+    statement = paginate(statement, CreditLedger.created_at, CreditLedger.id, page)
+    entries = finish_page((await session.exec(statement)).all(), "created_at", page, response)
+    return json_response(List[CreditLedgerEntry], entries, response)
+
+
+@router.get("/{user_id}/credits/balance", response_model=CreditBalance)
+async def get_credit_balance(
+    user_id: int,
+    at: str | None = None,
+    session: AsyncSession = Depends(get_session),
+    current_user: AuthenticatedUser = Depends(get_current_user)
+):
+    """Balance at a point in time: latest snapshot plus the ledger tail after it."""
+    _check_stats_access(current_user, user_id)
+
+    at_dt = _parse_datetime(at, "at") or datetime.utcnow()
+    return CreditBalance(user_id=user_id, balance=await balance_at(session, user_id, at_dt), at=at_dt)
+
+
+@router.get("/{user_id}/credits/summary", response_model=CreditSummary)
+async def get_credit_summary(
+    user_id: int,
+    from_date: str | None = None,
+    to_date: str | None = None,
+    session: AsyncSession = Depends(get_session),
+    current_user: AuthenticatedUser = Depends(get_current_user)
+):
+    """Credits earned, spent and adjusted in a period (current month by default)."""
+    _check_stats_access(current_user, user_id)
+
+    now = datetime.utcnow()
+    from_dt = _parse_datetime(from_date, "from_date") or now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    to_dt = _parse_datetime(to_date, "to_date") or now
+
+    def total(*reasons: CreditReason):
+        return func.coalesce(func.sum(CreditLedger.amount).filter(CreditLedger.reason.in_(reasons)), 0)
+
+    earned, spent, adjusted = (await session.exec(
+        select(
+            total(CreditReason.TASK_APPROVAL),
+            total(CreditReason.REWARD_REDEMPTION),
+            total(CreditReason.ADMIN_ADJUSTMENT, CreditReason.OPENING_BALANCE),
+        ).where(
+            CreditLedger.user_id == user_id,
+            CreditLedger.created_at >= from_dt,
+            CreditLedger.created_at <= to_dt
         )
-    ).first() or 0
-    
-    return UserStats(
-        total_tasks_completed=total_tasks_completed,
-        total_credits_earned=total_credits_earned,
-        pending_tasks=pending_tasks,
-        approved_tasks=approved_tasks,
-        rejected_tasks=rejected_tasks
+    )).one()
+
+    return CreditSummary(
+        user_id=user_id,
+        from_date=from_dt,
+        to_date=to_dt,
+        earned=earned,
+        spent=-spent,
+        adjusted=adjusted
     )
 
 
 @router.get("/", response_model=List[UserResponse])
 async def get_all_users(
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    response: Response,
+    page: PageParams = Depends(),
+    session: AsyncSession = Depends(get_session),
+    current_user: AuthenticatedUser = Depends(get_current_user)
 ):
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(
@@ -164,16 +351,16 @@ async def get_all_users(
         )
     
     # Mostrar todos los usuarios, incluso inactivos, para que el admin pueda gestionarlos
-    statement = select(User)
-    users = session.exec(statement).all()
-    return users
+    statement = paginate(select(User), User.created_at, User.id, page)
+    users = finish_page((await session.exec(statement)).all(), "created_at", page, response)
+    return json_response(List[UserResponse], users, response)
 
 
 @router.post("/", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 async def create_user(
     user_create: UserCreate,
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    session: AsyncSession = Depends(get_session),
+    current_user: AuthenticatedUser = Depends(get_current_user)
 ):
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(
@@ -182,7 +369,7 @@ async def create_user(
         )
     
     # Check if username already exists
-    existing_user = session.exec(select(User).where(User.username == user_create.username)).first()
+    existing_user = (await session.exec(select(User).where(User.username == user_create.username))).first()
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -190,7 +377,7 @@ async def create_user(
         )
     
     # Create new user
-    password_hash = get_password_hash(user_create.password)
+    password_hash = await get_password_hash_async(user_create.password)
     
     new_user = User(
         username=user_create.username,
@@ -201,8 +388,14 @@ async def create_user(
     )
     
     session.add(new_user)
-    session.commit()
-    session.refresh(new_user)
+    if new_user.credits:
+        await session.flush()
+        record_credit_change(
+            session, new_user.id, new_user.credits, CreditReason.ADMIN_ADJUSTMENT,
+            created_by=current_user.id
+        )
+    await session.commit()
+    await session.refresh(new_user)
     return new_user
 
 
@@ -210,8 +403,8 @@ async def create_user(
 async def update_user(
     user_id: int,
     user_update: UserUpdate,
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    session: AsyncSession = Depends(get_session),
+    current_user: AuthenticatedUser = Depends(get_current_user)
 ):
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(
@@ -220,7 +413,7 @@ async def update_user(
         )
 
     # Get user to update
-    user = session.get(User, user_id)
+    user = await session.get(User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -232,14 +425,18 @@ async def update_user(
 
     # Hash password if provided
     if "password" in update_data:
-        update_data["password_hash"] = get_password_hash(update_data.pop("password"))
+        update_data["password_hash"] = await get_password_hash_async(update_data.pop("password"))
 
+    await _apply_credit_adjustment(session, user, update_data, current_user)
+    revoked = _revoke_tokens_if_needed(user, update_data)
     for field, value in update_data.items():
         setattr(user, field, value)
 
     session.add(user)
-    session.commit()
-    session.refresh(user)
+    await session.commit()
+    if revoked:
+        forget_epoch(user.id)
+    await session.refresh(user)
     return user
 
 
@@ -247,8 +444,8 @@ async def update_user(
 async def patch_user(
     user_id: int,
     user_update: UserUpdate,
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    session: AsyncSession = Depends(get_session),
+    current_user: AuthenticatedUser = Depends(get_current_user)
 ):
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(
@@ -257,7 +454,7 @@ async def patch_user(
         )
 
     # Get user to update
-    user = session.get(User, user_id)
+    user = await session.get(User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -269,22 +466,26 @@ async def patch_user(
 
     # Hash password if provided
     if "password" in update_data:
-        update_data["password_hash"] = get_password_hash(update_data.pop("password"))
+        update_data["password_hash"] = await get_password_hash_async(update_data.pop("password"))
 
+    await _apply_credit_adjustment(session, user, update_data, current_user)
+    revoked = _revoke_tokens_if_needed(user, update_data)
     for field, value in update_data.items():
         setattr(user, field, value)
 
     session.add(user)
-    session.commit()
-    session.refresh(user)
+    await session.commit()
+    if revoked:
+        forget_epoch(user.id)
+    await session.refresh(user)
     return user
 
 
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_user(
     user_id: int,
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    session: AsyncSession = Depends(get_session),
+    current_user: AuthenticatedUser = Depends(get_current_user)
 ):
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(
@@ -300,14 +501,31 @@ async def delete_user(
         )
     
     # Get user to delete
-    user = session.get(User, user_id)
+    user = await session.get(User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
     
+    # Ledger rows, assignments and redemptions are records: a user with any
+    # of them is deactivated instead. Snapshots and rollup rows cascade.
+    history = (
+        select(CreditLedger.id).where(CreditLedger.user_id == user_id),
+        select(TaskAssignment.id).where(TaskAssignment.user_id == user_id),
+        select(TaskAssignmentArchive.id).where(TaskAssignmentArchive.user_id == user_id),
+        select(RewardRedemption.id).where(RewardRedemption.user_id == user_id),
+    )
+    if (await session.exec(select(or_(*(statement.exists() for statement in history))))).one():
+        raise _user_has_history()
+
     # Delete user
-    session.delete(user)
-    session.commit()
+    await session.delete(user)
+    try:
+        await session.commit()
+    except IntegrityError:
+        # History written since the check above
+        await session.rollback()
+        raise _user_has_history()
+    forget_epoch(user_id)
     return None
@@ -0,0 +1,122 @@
+import json
+import logging
+import queue
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+from .config import settings
+from .metrics import match_route
+
+REQUEST_ID_HEADER = "x-request-id"
+
+access_logger = logging.getLogger("app.access")
+access_logger.propagate = False
+
+_listener: Optional[QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; the access fields travel in ``record.access``."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+        }
+        entry.update(getattr(record, "access", None) or {"message": record.getMessage()})
+        return json.dumps(entry, separators=(",", ":"), default=str)
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """Enqueue the record untouched so formatting happens on the listener thread."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def setup_access_log() -> None:
+    """Route access records through a queue drained by a background thread."""
+    global _listener
+    if _listener is not None:
+        return
+    if settings.access_log_path:
+        target: logging.Handler = logging.FileHandler(settings.access_log_path, encoding="utf-8")
+    else:
+        target = logging.StreamHandler(sys.stdout)
+    target.setFormatter(JsonFormatter())
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    access_logger.handlers = [_DeferredQueueHandler(log_queue)]
+    access_logger.setLevel(logging.INFO)
+    _listener = QueueListener(log_queue, target, respect_handler_level=False)
+    _listener.start()
+
+
+def shutdown_access_log() -> None:
+    """Flush pending records and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+class AccessLogMiddleware:
+    """Pure ASGI middleware writing one structured record per request.
+
+    The record is built from values already at hand and handed to the queue,
+    so the request path never waits on the log file. ``/health`` probes are
+    skipped and successful responses are sampled with
+    ``access_log_success_sample_rate``; 4xx/5xx and slow requests are always
+    logged.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(settings.access_log_exclude_prefix):
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")[:64]
+                break
+        if not request_id:
+            request_id = uuid.uuid4().hex
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [
+                    (REQUEST_ID_HEADER.encode(), request_id.encode("latin-1"))
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - started
+            if (
+                status_code >= 400
+                or duration * 1000 >= settings.access_log_slow_ms
+                or random.random() < settings.access_log_success_sample_rate
+            ):
+                access_logger.info("", extra={"access": {
+                    "request_id": request_id,
+                    "method": scope["method"],
+                    "route": match_route(scope["app"], scope),
+                    "status": status_code,
+                    "duration_ms": round(duration * 1000, 2),
+                }})
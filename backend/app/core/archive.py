@@ -0,0 +1,98 @@
+from datetime import date, timedelta
+from typing import Optional, Set
+from sqlalchemy import delete, insert, text, union_all
+from sqlalchemy.orm import aliased
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from ..models.task import TaskAssignment, TaskAssignmentArchive, TaskStatus
+from ..models.user import User  # noqa: F401  aliased() needs every TaskAssignment relationship target mapped
+from .config import settings
+
+# Rows moved per transaction
+ARCHIVE_BATCH_SIZE = 1000
+
+ARCHIVE_COLUMNS = (
+    "id", "task_id", "user_id", "status", "scheduled_date",
+    "completed_at", "approved_at", "approved_by", "created_at", "collective",
+)
+
+
+def archive_cutoff() -> date:
+    """Days before this one may live in the archive table."""
+    return date.today() - timedelta(days=settings.archive_after_days)
+
+
+def assignment_history(from_date: Optional[date] = None):
+    """Entity to query assignment history with, hot and archived rows alike.
+
+    Returns ``TaskAssignment`` itself when the range starts after the
+    archive horizon (the common daily-board case), otherwise an alias of
+    ``TaskAssignment`` over ``taskassignment UNION ALL taskassignment_archive``
+    that supports the same columns, filters, ordering and eager loads.
+    """
+    if from_date is not None and from_date >= archive_cutoff():
+        return TaskAssignment
+    history = union_all(
+        select(*(getattr(TaskAssignment, column) for column in ARCHIVE_COLUMNS)),
+        select(*(getattr(TaskAssignmentArchive, column) for column in ARCHIVE_COLUMNS)),
+    ).subquery("assignment_history")
+    return aliased(TaskAssignment, history)
+
+
+async def _ensure_partitions(session: AsyncSession, years: Set[int], created: Set[int]) -> None:
+    for year in sorted(years - created):
+        await session.exec(text(
+            f"CREATE TABLE IF NOT EXISTS taskassignment_archive_{year} "
+            f"PARTITION OF taskassignment_archive "
+            f"FOR VALUES FROM ('{year}-01-01') TO ('{year + 1}-01-01')"
+        ))
+        created.add(year)
+
+
+async def archive_assignments(
+    session: AsyncSession,
+    before: Optional[date] = None,
+    batch_size: int = ARCHIVE_BATCH_SIZE,
+    verbose: bool = False
+) -> int:
+    """Move approved/rejected assignments scheduled before ``before`` to the archive.
+
+    Open (pending/completed) assignments always stay hot. Each batch copies
+    up to ``batch_size`` rows with INSERT ... SELECT and deletes them from
+    the hot table in one short transaction, so readers never see a row
+    twice or not at all and no lock is held for long. The rollup is not
+    touched: archived rows still count. Returns the number of rows moved.
+    """
+    before = before or archive_cutoff()
+    postgres = session.get_bind().dialect.name == "postgresql"
+    partitions: Set[int] = set()
+    moved = 0
+    while True:
+        rows = (await session.exec(
+            select(TaskAssignment.id, TaskAssignment.scheduled_date)
+            .where(
+                TaskAssignment.scheduled_date < before,
+                TaskAssignment.status.in_([TaskStatus.APPROVED, TaskStatus.REJECTED])
+            )
+            .order_by(TaskAssignment.id)
+            .limit(batch_size)
+        )).all()
+        if not rows:
+            break
+
+        if postgres:
+            await _ensure_partitions(session, {row.scheduled_date.year for row in rows}, partitions)
+        ids = [row.id for row in rows]
+        await session.exec(
+            insert(TaskAssignmentArchive).from_select(
+                list(ARCHIVE_COLUMNS),
+                select(*(getattr(TaskAssignment, column) for column in ARCHIVE_COLUMNS))
+                .where(TaskAssignment.id.in_(ids))
+            )
+        )
+        await session.exec(delete(TaskAssignment).where(TaskAssignment.id.in_(ids)))
+        await session.commit()
+        moved += len(ids)
+        if verbose:
+            print(f"  moved {moved} assignments (up to {rows[-1].scheduled_date.isoformat()})")
+    return moved
@@ -0,0 +1,31 @@
+import time
+from typing import Dict, Optional, Tuple
+from .config import settings
+
+# user_id -> (auth_epoch, monotonic time it was read from the database)
+_epochs: Dict[int, Tuple[int, float]] = {}
+
+
+def cached_epoch(user_id: int) -> Optional[int]:
+    """Return the known auth epoch of a user, or None when unknown or stale."""
+    entry = _epochs.get(user_id)
+    if entry is None:
+        return None
+    epoch, fetched_at = entry
+    if time.monotonic() - fetched_at > settings.auth_epoch_cache_seconds:
+        _epochs.pop(user_id, None)
+        return None
+    return epoch
+
+
+def remember_epoch(user_id: int, epoch: int) -> None:
+    _epochs[user_id] = (epoch, time.monotonic())
+
+
+def forget_epoch(user_id: int) -> None:
+    """Drop a cached epoch so the next request re-reads it from the database.
+
+    Other workers pick the change up once their entry goes stale, which
+    bounds how long a revoked token can still be accepted.
+    """
+    _epochs.pop(user_id, None)
@@ -0,0 +1,79 @@
+import time
+from typing import Collection, Dict, Generic, List, Optional, Tuple, Type, TypeVar
+from sqlmodel import SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from .config import settings
+from .versions import REWARD_CATALOG, TASK_CATALOG, current_etag
+from ..models.reward import Reward
+from ..models.task import Task
+
+ModelT = TypeVar("ModelT", bound=SQLModel)
+
+
+class CatalogCache(Generic[ModelT]):
+    """Per-worker read-through copy of a small, rarely written table.
+
+    Keyed on the resource's version (see ``versions.py``): while the version
+    is unchanged a lookup is a dict access, and the first access after a
+    bump reloads the whole table in one query. The version is read before
+    the rows, so a copy can only be newer than its label, never older.
+
+    Rows are detached copies shared by every request of the worker: read
+    them, never modify them. Writes go through ``session.get`` as usual and
+    bump the version; rows inserted or deleted without a bump still change
+    the ETag, and the copy is reloaded at least every
+    RESOURCE_VERSION_MAX_AGE_SECONDS.
+    """
+
+    def __init__(self, name: str, model: Type[ModelT]):
+        self.name = name
+        self.model = model
+        # (etag the rows were loaded at, rows by id, active rows in id order)
+        self._state: Optional[Tuple[str, Dict[int, ModelT], List[ModelT]]] = None
+        self._loaded_at = 0.0
+
+    async def _current(self, session: AsyncSession) -> Tuple[str, Dict[int, ModelT], List[ModelT]]:
+        etag = await current_etag(session, self.name)
+        state = self._state
+        # The age limit bounds how long an update made without a bump (which
+        # leaves the ETag as it was) can stay invisible to this worker
+        stale = time.monotonic() - self._loaded_at > settings.resource_version_max_age_seconds
+        if state is None or state[0] != etag or stale:
+            columns = self.model.__table__.columns
+            result = await session.exec(select(*columns).order_by(columns["id"]))
+            rows = {row.id: self.model(**row._mapping) for row in result.all()}
+            state = (etag, rows, [row for row in rows.values() if row.is_active])
+            self._state = state
+            self._loaded_at = time.monotonic()
+        return state
+
+    async def rows(self, session: AsyncSession) -> Dict[int, ModelT]:
+        """Every row by id, inactive ones included (old assignments point at them)."""
+        return (await self._current(session))[1]
+
+    async def get_many(self, session: AsyncSession, row_ids: Collection[int]) -> Dict[int, ModelT]:
+        """Rows for ``row_ids`` by id, inactive ones included.
+
+        Ids the copy does not have yet (created by another worker within the
+        version cache window) are read from the table instead of going
+        missing, so callers that need every row, like credit awards, get it.
+        """
+        rows = await self.rows(session)
+        found = {row_id: rows[row_id] for row_id in row_ids if row_id in rows}
+        missing = [row_id for row_id in row_ids if row_id not in found]
+        if missing:
+            columns = self.model.__table__.columns
+            result = await session.exec(select(*columns).where(columns["id"].in_(missing)))
+            found.update((row.id, self.model(**row._mapping)) for row in result.all())
+        return found
+
+    async def active(self, session: AsyncSession) -> List[ModelT]:
+        return (await self._current(session))[2]
+
+    async def get_active(self, session: AsyncSession, row_id: int) -> Optional[ModelT]:
+        row = (await self._current(session))[1].get(row_id)
+        return row if row is not None and row.is_active else None
+
+
+task_catalog = CatalogCache(TASK_CATALOG, Task)
+reward_catalog = CatalogCache(REWARD_CATALOG, Reward)
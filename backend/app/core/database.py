@@ -1,13 +1,71 @@
-from sqlmodel import SQLModel, create_engine, Session
+from pathlib import Path
+from sqlalchemy import text
+from sqlmodel import SQLModel, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from .config import settings
+from .metrics import install_query_metrics
+from .pool import InstrumentedAsyncQueuePool, install_leak_detection
+from .query_budget import install_query_budget
 
-engine = create_engine(settings.database_url, echo=settings.debug)
+# Synchronous engine for maintenance scripts and schema creation
+engine = create_engine(
+    settings.database_url,
+    echo=settings.sql_echo,
+    pool_pre_ping=settings.db_pool_pre_ping,
+    pool_recycle=settings.db_pool_recycle,
+)
 
+# Async engine used by the API so queries never block the event loop
+async_engine = create_async_engine(
+    settings.async_database_url,
+    echo=settings.sql_echo,
+    poolclass=InstrumentedAsyncQueuePool,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=settings.db_pool_timeout,
+    pool_recycle=settings.db_pool_recycle,
+    pool_pre_ping=settings.db_pool_pre_ping,
+)
+install_leak_detection(async_engine.sync_engine)
+install_query_metrics(async_engine.sync_engine)
+install_query_budget(async_engine.sync_engine)
 
-def create_db_and_tables():
-    SQLModel.metadata.create_all(engine)
+# Objects stay usable after commit; handlers refresh explicitly when needed
+async_session_maker = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
 
 
-def get_session():
-    with Session(engine) as session:
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+
+def upgrade_database():
+    """Bring the schema to the latest migration (``alembic upgrade head``).
+
+    Alembic owns the schema: the app and the maintenance scripts call this
+    instead of ``create_all``. Databases created by ``create_all`` before
+    migrations existed are adopted, since every migration only adds the
+    tables, columns and indexes that are missing.
+    """
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(BACKEND_DIR / "alembic"))
+    # Keep the app's logging setup (alembic.ini would replace it)
+    config.attributes["configure_logger"] = False
+    command.upgrade(config, "head")
+
+
+def reset_database():
+    """Drop every table and recreate the schema; benchmarks and load tests only."""
+    from ..models import credit, job, resource_version, reward, rollup, task, user  # noqa: F401
+
+    SQLModel.metadata.drop_all(engine)
+    with engine.begin() as connection:
+        connection.execute(text("DROP TABLE IF EXISTS alembic_version"))
+    upgrade_database()
+
+
+async def get_session():
+    async with async_session_maker() as session:
         yield session
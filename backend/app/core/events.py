@@ -0,0 +1,187 @@
+import asyncio
+import json
+import logging
+import uuid
+from enum import Enum
+from typing import Iterable, Iterator, List, NamedTuple, Set
+from sqlalchemy import event as sa_event, func
+from sqlalchemy.orm import Session
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from . import notify
+from .config import settings
+from ..models.credit import CreditReason
+from ..models.task import TaskStatus
+
+logger = logging.getLogger(__name__)
+
+# PostgreSQL channel carrying committed events to every worker
+EVENTS_CHANNEL = "app_events"
+# NOTIFY payloads must stay below 8000 bytes
+MAX_PAYLOAD_BYTES = 7000
+
+# Tells this worker's own notifications apart: it already delivered them
+WORKER_ID = uuid.uuid4().hex
+
+# Session.info key for events waiting on the commit
+_PENDING = "pending_events"
+
+
+class EventType(str, Enum):
+    ASSIGNMENT_CREATED = "assignment.created"
+    ASSIGNMENT_COMPLETED = "assignment.completed"
+    ASSIGNMENT_APPROVED = "assignment.approved"
+    ASSIGNMENT_REJECTED = "assignment.rejected"
+    REDEMPTION_CREATED = "redemption.created"
+    CREDITS_CHANGED = "credits.changed"
+
+
+class Event(NamedTuple):
+    type: EventType
+    # The child the event is about: only they and the administrators get it
+    user_id: int
+    data: dict
+
+    def frame(self) -> str:
+        """The event as a Server-Sent Events message."""
+        return f"event: {self.type.value}\ndata: {json.dumps(self.data, separators=(',', ':'))}\n\n"
+
+
+def assignment_event(event_type: EventType, assignment, status: TaskStatus) -> Event:
+    """Event for a TaskAssignment or a RETURNING row with the same columns."""
+    return Event(event_type, assignment.user_id, {
+        "id": assignment.id,
+        "task_id": assignment.task_id,
+        "user_id": assignment.user_id,
+        "status": status.value,
+        "scheduled_date": assignment.scheduled_date.isoformat(),
+    })
+
+
+def redemption_event(redemption) -> Event:
+    return Event(EventType.REDEMPTION_CREATED, redemption.user_id, {
+        "id": redemption.id,
+        "reward_id": redemption.reward_id,
+        "user_id": redemption.user_id,
+        "redeemed_at": redemption.redeemed_at.isoformat(),
+    })
+
+
+def credits_event(user_id: int, balance: int, amount: int, reason: CreditReason) -> Event:
+    return Event(EventType.CREDITS_CHANGED, user_id, {
+        "user_id": user_id,
+        "credits": balance,
+        "amount": amount,
+        "reason": reason.value,
+    })
+
+
+class Subscriber:
+    """One open event stream: a bounded queue of the events it may see."""
+
+    def __init__(self, user_id: int, is_admin: bool):
+        self.user_id = user_id
+        self.is_admin = is_admin
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=settings.events_queue_size)
+
+    def wants(self, event: Event) -> bool:
+        return self.is_admin or event.user_id == self.user_id
+
+    def overflow(self) -> None:
+        # A client this far behind gets its stream closed (None) instead of
+        # holding memory; EventSource reconnects and the UI refetches
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+
+class EventBroker:
+    """In-process fan-out of committed events to this worker's streams.
+
+    Only touched from the event loop thread, like the metrics counters.
+    """
+
+    def __init__(self):
+        self._subscribers: Set[Subscriber] = set()
+
+    def subscribe(self, user_id: int, is_admin: bool) -> Subscriber:
+        subscriber = Subscriber(user_id, is_admin)
+        self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        self._subscribers.discard(subscriber)
+
+    def dispatch(self, events: Iterable[Event]) -> None:
+        for event in events:
+            for subscriber in list(self._subscribers):
+                if not subscriber.wants(event):
+                    continue
+                try:
+                    subscriber.queue.put_nowait(event)
+                except asyncio.QueueFull:
+                    logger.warning("Event stream of user %s fell behind, closing it", subscriber.user_id)
+                    subscriber.overflow()
+                    self._subscribers.discard(subscriber)
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+
+broker = EventBroker()
+
+
+def _payloads(events: List[Event]) -> Iterator[str]:
+    """Serialize events for NOTIFY, as few payloads as the size limit allows."""
+    batch: List[str] = []
+    size = 0
+    for event in events:
+        item = json.dumps({"type": event.type.value, "user_id": event.user_id, "data": event.data},
+                          separators=(",", ":"))
+        if batch and size + len(item) > MAX_PAYLOAD_BYTES:
+            yield f'{{"origin":"{WORKER_ID}","events":[{",".join(batch)}]}}'
+            batch, size = [], 0
+        batch.append(item)
+        size += len(item) + 1
+    if batch:
+        yield f'{{"origin":"{WORKER_ID}","events":[{",".join(batch)}]}}'
+
+
+async def publish_events(session: AsyncSession, events: List[Event]) -> None:
+    """Send ``events`` to the open streams once the caller's transaction commits.
+
+    This worker delivers them from its broker right after the commit and
+    forgets them on rollback. On PostgreSQL they also travel as a NOTIFY in
+    the same transaction, so the other workers' listeners deliver them too;
+    elsewhere (single-process SQLite) the local broker is the whole story.
+    """
+    if not events:
+        return
+    if session.get_bind().dialect.name == "postgresql":
+        for payload in _payloads(events):
+            await session.exec(select(func.pg_notify(EVENTS_CHANNEL, payload)))
+    session.sync_session.info.setdefault(_PENDING, []).extend(events)
+
+
+@sa_event.listens_for(Session, "after_commit")
+def _after_commit(session) -> None:
+    events = session.info.pop(_PENDING, None)
+    if events:
+        broker.dispatch(events)
+
+
+@sa_event.listens_for(Session, "after_rollback")
+def _after_rollback(session) -> None:
+    session.info.pop(_PENDING, None)
+
+
+def _on_notify(payload: str) -> None:
+    message = json.loads(payload)
+    if message["origin"] == WORKER_ID:
+        return
+    broker.dispatch(
+        Event(EventType(item["type"]), item["user_id"], item["data"]) for item in message["events"]
+    )
+
+
+notify.listen(EVENTS_CHANNEL, _on_notify)
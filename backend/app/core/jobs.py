@@ -0,0 +1,76 @@
+import asyncio
+import json
+import logging
+import uuid
+from datetime import datetime
+from typing import Awaitable, Callable, Optional, Set
+from sqlalchemy import update
+from sqlmodel.ext.asyncio.session import AsyncSession
+from ..models.job import BackgroundJob, JobStatus
+from .database import async_session_maker
+
+logger = logging.getLogger(__name__)
+
+# Runner signature: (session, job_id) -> None. The runner reports progress
+# with ``job_progress`` inside its own transactions.
+JobRunner = Callable[[AsyncSession, str], Awaitable[None]]
+
+# Strong references so running tasks are not garbage collected
+_running: Set[asyncio.Task] = set()
+
+
+def job_progress(session: AsyncSession, job_id: str, processed: int, total: Optional[int] = None):
+    """Statement updating a job's progress; execute it in the batch's transaction."""
+    values = {"processed": processed}
+    if total is not None:
+        values["total"] = total
+    return (
+        update(BackgroundJob)
+        .where(BackgroundJob.id == job_id)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def start_job(
+    session: AsyncSession,
+    kind: str,
+    runner: JobRunner,
+    params: Optional[dict] = None,
+    total: Optional[int] = None,
+    created_by: Optional[int] = None
+) -> BackgroundJob:
+    """Record a job and run ``runner`` in the background of this worker."""
+    job = BackgroundJob(
+        id=uuid.uuid4().hex, kind=kind, total=total, created_by=created_by,
+        params=json.dumps(params, default=str) if params is not None else None
+    )
+    session.add(job)
+    await session.commit()
+
+    task = asyncio.create_task(_run(job.id, runner))
+    _running.add(task)
+    task.add_done_callback(_running.discard)
+    return job
+
+
+async def _set_status(job_id: str, **values) -> None:
+    async with async_session_maker() as session:
+        await session.exec(
+            update(BackgroundJob).where(BackgroundJob.id == job_id).values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        await session.commit()
+
+
+async def _run(job_id: str, runner: JobRunner) -> None:
+    await _set_status(job_id, status=JobStatus.RUNNING, started_at=datetime.utcnow())
+    try:
+        async with async_session_maker() as session:
+            await runner(session, job_id)
+    except Exception as exc:
+        logger.exception("Background job %s failed", job_id)
+        await _set_status(job_id, status=JobStatus.FAILED, error=str(exc)[:500], finished_at=datetime.utcnow())
+    else:
+        await _set_status(job_id, status=JobStatus.COMPLETED, finished_at=datetime.utcnow())
+
@@ -0,0 +1,131 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import text, update
+from sqlmodel import select, func
+from sqlmodel.ext.asyncio.session import AsyncSession
+from ..models.credit import CreditLedger, CreditReason, CreditSnapshot
+from ..models.user import User
+
+
+async def adjust_credits(session: AsyncSession, user_id: int, amount: int, require_funds: bool = False) -> Optional[int]:
+    """Atomically add ``amount`` to a user's credits and return the new balance.
+
+    Issues a single ``UPDATE ... SET credits = credits + :amount RETURNING
+    credits`` so concurrent requests never lose an update. With
+    ``require_funds`` the update only matches while the balance covers the
+    debit; ``None`` means no row was updated (unknown user or insufficient
+    credits).
+    """
+    statement = update(User).where(User.id == user_id)
+    if require_funds:
+        statement = statement.where(User.credits >= -amount)
+    statement = (
+        statement.values(credits=User.credits + amount)
+        .returning(User.credits)
+        .execution_options(synchronize_session=False)
+    )
+    return (await session.exec(statement)).scalar_one_or_none()
+
+
+def record_credit_change(
+    session: AsyncSession,
+    user_id: int,
+    amount: int,
+    reason: CreditReason,
+    assignment_id: Optional[int] = None,
+    redemption_id: Optional[int] = None,
+    created_by: Optional[int] = None
+) -> CreditLedger:
+    """Append a ledger row in the caller's transaction.
+
+    Must be called next to the matching ``User.credits`` update so both are
+    committed (or rolled back) together.
+    """
+    entry = CreditLedger(
+        user_id=user_id,
+        amount=amount,
+        reason=reason,
+        assignment_id=assignment_id,
+        redemption_id=redemption_id,
+        created_by=created_by
+    )
+    session.add(entry)
+    return entry
+
+
+async def _latest_snapshot(session: AsyncSession, user_id: int, at: Optional[datetime] = None) -> Optional[CreditSnapshot]:
+    statement = select(CreditSnapshot).where(CreditSnapshot.user_id == user_id)
+    if at is not None:
+        statement = statement.where(CreditSnapshot.created_at <= at)
+    statement = statement.order_by(CreditSnapshot.last_ledger_id.desc()).limit(1)
+    return (await session.exec(statement)).first()
+
+
+async def balance_at(session: AsyncSession, user_id: int, at: Optional[datetime] = None) -> int:
+    """Ledger balance of a user at ``at`` (now when omitted).
+
+    Starts from the latest snapshot taken before ``at`` and only sums the
+    ledger tail written after it, so the cost is bounded by the snapshot
+    interval rather than the whole history.
+    """
+    snapshot = await _latest_snapshot(session, user_id, at)
+    statement = select(func.coalesce(func.sum(CreditLedger.amount), 0)).where(CreditLedger.user_id == user_id)
+    if snapshot:
+        statement = statement.where(CreditLedger.id > snapshot.last_ledger_id)
+    if at is not None:
+        statement = statement.where(CreditLedger.created_at <= at)
+    tail = (await session.exec(statement)).one()
+    return (snapshot.balance if snapshot else 0) + tail
+
+
+async def _settled_ledger_id(session: AsyncSession) -> Optional[int]:
+    """Highest ledger id below which no row can still show up.
+
+    On PostgreSQL ids come from a sequence when the INSERT runs, so a row
+    with a lower id may commit after ``max(id)`` was read and would be
+    skipped by every snapshot built on it. SHARE mode conflicts with the
+    ROW EXCLUSIVE lock each INSERT holds until its commit: once granted, all
+    ids handed out so far are committed or rolled back, and later ones are
+    higher. The lock is released right away, so writers only wait for the
+    ledger transactions already in flight. SQLite serializes writers and
+    needs no lock.
+    """
+    if session.get_bind().dialect.name == "postgresql":
+        await session.exec(text("LOCK TABLE credit_ledger IN SHARE MODE"))
+    last_ledger_id = (await session.exec(select(func.max(CreditLedger.id)))).one()
+    await session.commit()
+    return last_ledger_id
+
+
+async def take_snapshots(session: AsyncSession) -> int:
+    """Write a balance snapshot for every user with ledger activity since their last one.
+
+    Safe to run under live traffic: snapshots only cover ledger ids that can
+    no longer be joined by a late commit (see ``_settled_ledger_id``).
+    """
+    last_ledger_id = await _settled_ledger_id(session)
+    if last_ledger_id is None:
+        return 0
+
+    taken = 0
+    user_ids = (await session.exec(select(User.id))).all()
+    for user_id in user_ids:
+        snapshot = await _latest_snapshot(session, user_id)
+        since = snapshot.last_ledger_id if snapshot else 0
+        tail = (await session.exec(
+            select(func.count(CreditLedger.id), func.coalesce(func.sum(CreditLedger.amount), 0)).where(
+                CreditLedger.user_id == user_id,
+                CreditLedger.id > since,
+                CreditLedger.id <= last_ledger_id
+            )
+        )).one()
+        if not tail[0]:
+            continue
+        session.add(CreditSnapshot(
+            user_id=user_id,
+            balance=(snapshot.balance if snapshot else 0) + tail[1],
+            last_ledger_id=last_ledger_id
+        ))
+        taken += 1
+    await session.commit()
+    return taken
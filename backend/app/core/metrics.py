@@ -0,0 +1,254 @@
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Dict, Optional, Sequence, Tuple
+from sqlalchemy import event
+from starlette.routing import Match
+from .pool import pool_metrics
+
+# Counters are only ever mutated from the event loop thread (SQLAlchemy's
+# async engine runs its events in greenlets on that same thread), so plain
+# ints and lists are enough: no locks on the request path.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+DB_TIME_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class Histogram:
+    """Cumulative-at-render histogram with fixed upper bounds."""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class RequestStats:
+    """Database work done on behalf of the current request."""
+
+    __slots__ = ("scope", "queries", "db_seconds", "shapes", "flagged", "_started")
+
+    def __init__(self, scope=None):
+        self.scope = scope
+        self.queries = 0
+        self.db_seconds = 0.0
+        # normalized statement -> executions, filled by the query budget hook
+        self.shapes: Dict[str, int] = {}
+        self.flagged = set()
+        self._started = []
+
+
+current_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("current_request_stats", default=None)
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.requests: Dict[Tuple[str, str, int], int] = {}
+        self.in_progress: Dict[Tuple[str, str], int] = {}
+        self.latency: Dict[Tuple[str, str], Histogram] = {}
+        self.queries_per_request: Dict[str, Histogram] = {}
+        self.db_time_per_request: Dict[str, Histogram] = {}
+        self.db_queries_total = 0
+        self.db_query_seconds_total = 0.0
+
+    def request_started(self, method: str, route: str) -> None:
+        key = (method, route)
+        self.in_progress[key] = self.in_progress.get(key, 0) + 1
+
+    def request_finished(self, method: str, route: str, status_code: int, seconds: float, stats: RequestStats) -> None:
+        key = (method, route)
+        self.in_progress[key] -= 1
+        counter = (method, route, status_code)
+        self.requests[counter] = self.requests.get(counter, 0) + 1
+
+        histogram = self.latency.get(key)
+        if histogram is None:
+            histogram = self.latency[key] = Histogram(LATENCY_BUCKETS)
+        histogram.observe(seconds)
+
+        histogram = self.queries_per_request.get(route)
+        if histogram is None:
+            histogram = self.queries_per_request[route] = Histogram(QUERY_COUNT_BUCKETS)
+        histogram.observe(stats.queries)
+
+        histogram = self.db_time_per_request.get(route)
+        if histogram is None:
+            histogram = self.db_time_per_request[route] = Histogram(DB_TIME_BUCKETS)
+        histogram.observe(stats.db_seconds)
+
+
+metrics = MetricsRegistry()
+
+
+def install_query_metrics(engine) -> None:
+    """Time every statement and attribute it to the request that issued it."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        stats = current_request_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats._started.append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        stats = current_request_stats.get()
+        if stats is not None and stats._started:
+            elapsed = time.perf_counter() - stats._started.pop()
+            stats.db_seconds += elapsed
+            metrics.db_queries_total += 1
+            metrics.db_query_seconds_total += elapsed
+
+
+def match_route(app, scope) -> str:
+    """Path template the router will dispatch ``scope`` to.
+
+    Resolved before the request runs so the in-flight gauge can carry the
+    route label; a method mismatch still reports the template it matched.
+    Shared with the access log and cached per (method, path), so each
+    distinct URL walks the route table once.
+    """
+    return _resolve_route(app, scope["method"], scope["path"])
+
+
+@lru_cache(maxsize=4096)
+def _resolve_route(app, method: str, path: str) -> str:
+    scope = {"type": "http", "method": method, "path": path, "root_path": ""}
+    partial = None
+    for route in app.router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+        if match == Match.PARTIAL and partial is None:
+            partial = route.path
+    return partial or UNMATCHED_ROUTE
+
+
+# Long-lived streams: their duration is the client's session, not latency,
+# and the in-flight gauge would count every open one
+UNTIMED_ROUTES = frozenset({"/api/events"})
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware feeding the per-route request metrics."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route = match_route(scope["app"], scope)
+        if route in UNTIMED_ROUTES:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        stats = RequestStats(scope)
+        token = current_request_stats.set(stats)
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        metrics.request_started(method, route)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            metrics.request_finished(method, route, status_code, time.perf_counter() - started, stats)
+            current_request_stats.reset(token)
+
+
+def _labels(**labels) -> str:
+    inner = ",".join(
+        '%s="%s"' % (name, str(value).replace("\\", "\\\\").replace('"', '\\"'))
+        for name, value in labels.items()
+    )
+    return "{" + inner + "}" if inner else ""
+
+
+def _render_histogram(lines, name: str, histogram: Histogram, **labels) -> None:
+    cumulative = 0
+    for bound, count in zip(histogram.buckets, histogram.counts):
+        cumulative += count
+        lines.append(f"{name}_bucket{_labels(**labels, le=bound)} {cumulative}")
+    lines.append(f"{name}_bucket{_labels(**labels, le='+Inf')} {histogram.count}")
+    lines.append(f"{name}_sum{_labels(**labels)} {histogram.sum}")
+    lines.append(f"{name}_count{_labels(**labels)} {histogram.count}")
+
+
+def render_metrics(engine) -> str:
+    """Prometheus text exposition (format 0.0.4) for this worker."""
+    lines = []
+
+    lines.append("# HELP http_requests_total Requests handled, by route template and status.")
+    lines.append("# TYPE http_requests_total counter")
+    for (method, route, status_code), value in list(metrics.requests.items()):
+        lines.append(f"http_requests_total{_labels(method=method, route=route, status=status_code)} {value}")
+
+    lines.append("# HELP http_requests_in_progress Requests currently being served.")
+    lines.append("# TYPE http_requests_in_progress gauge")
+    for (method, route), value in list(metrics.in_progress.items()):
+        lines.append(f"http_requests_in_progress{_labels(method=method, route=route)} {value}")
+
+    lines.append("# HELP http_request_duration_seconds Request latency, by route template.")
+    lines.append("# TYPE http_request_duration_seconds histogram")
+    for (method, route), histogram in list(metrics.latency.items()):
+        _render_histogram(lines, "http_request_duration_seconds", histogram, method=method, route=route)
+
+    lines.append("# HELP db_queries_per_request SQL statements executed per request.")
+    lines.append("# TYPE db_queries_per_request histogram")
+    for route, histogram in list(metrics.queries_per_request.items()):
+        _render_histogram(lines, "db_queries_per_request", histogram, route=route)
+
+    lines.append("# HELP db_time_per_request_seconds Time spent in SQL statements per request.")
+    lines.append("# TYPE db_time_per_request_seconds histogram")
+    for route, histogram in list(metrics.db_time_per_request.items()):
+        _render_histogram(lines, "db_time_per_request_seconds", histogram, route=route)
+
+    lines.append("# HELP db_queries_total SQL statements executed while serving requests.")
+    lines.append("# TYPE db_queries_total counter")
+    lines.append(f"db_queries_total {metrics.db_queries_total}")
+    lines.append("# HELP db_query_seconds_total Time spent in SQL statements while serving requests.")
+    lines.append("# TYPE db_query_seconds_total counter")
+    lines.append(f"db_query_seconds_total {metrics.db_query_seconds_total}")
+
+    pool = engine.pool
+    lines.append("# HELP db_pool_checkouts_total Connections handed out by the pool.")
+    lines.append("# TYPE db_pool_checkouts_total counter")
+    lines.append(f"db_pool_checkouts_total {pool_metrics.checkouts}")
+    lines.append("# HELP db_pool_checkout_wait_seconds_total Time spent waiting for a pooled connection.")
+    lines.append("# TYPE db_pool_checkout_wait_seconds_total counter")
+    lines.append(f"db_pool_checkout_wait_seconds_total {pool_metrics.checkout_wait_seconds}")
+    lines.append("# HELP db_pool_slow_checkouts_total Checkouts slower than DB_POOL_SLOW_CHECKOUT_SECONDS.")
+    lines.append("# TYPE db_pool_slow_checkouts_total counter")
+    lines.append(f"db_pool_slow_checkouts_total {pool_metrics.slow_checkouts}")
+    lines.append("# HELP db_pool_checkout_timeouts_total Checkouts that gave up after DB_POOL_TIMEOUT.")
+    lines.append("# TYPE db_pool_checkout_timeouts_total counter")
+    lines.append(f"db_pool_checkout_timeouts_total {pool_metrics.checkout_timeouts}")
+    lines.append("# HELP db_pool_checked_out Connections currently checked out.")
+    lines.append("# TYPE db_pool_checked_out gauge")
+    lines.append(f"db_pool_checked_out {pool.checkedout()}")
+    lines.append("# HELP db_pool_size Configured pool size.")
+    lines.append("# TYPE db_pool_size gauge")
+    lines.append(f"db_pool_size {pool.size()}")
+
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,88 @@
+import asyncio
+import logging
+from typing import Callable, Dict, List, Optional
+from sqlalchemy.engine import make_url
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+# channel -> callback(payload), registered by the modules that listen
+_handlers: Dict[str, Callable[[str], None]] = {}
+# Run after every (re)connect: notifications sent meanwhile were missed
+_on_connect: List[Callable[[], None]] = []
+
+# True while this worker holds a LISTEN connection
+connected = False
+_listener_task: Optional[asyncio.Task] = None
+
+
+def listen(channel: str, handler: Callable[[str], None], on_connect: Optional[Callable[[], None]] = None) -> None:
+    """Register ``handler`` for NOTIFY payloads on ``channel`` (PostgreSQL only).
+
+    Must be called at import time, before ``start_listener``.
+    """
+    _handlers[channel] = handler
+    if on_connect is not None:
+        _on_connect.append(on_connect)
+
+
+def _on_notify(connection, pid, channel, payload) -> None:
+    try:
+        _handlers[channel](payload)
+    except Exception:
+        logger.exception("Handler for channel %s failed", channel)
+
+
+async def _listen(dsn: str) -> None:
+    """Hold one LISTEN connection for every channel, reconnecting after failures."""
+    import asyncpg
+
+    global connected
+    # The version cache trusts this connection, so a dead one must be noticed
+    # within the window it would otherwise have polled
+    interval = settings.resource_version_cache_seconds
+    while True:
+        connection = None
+        try:
+            connection = await asyncpg.connect(dsn)
+            for channel in _handlers:
+                await connection.add_listener(channel, _on_notify)
+            for callback in _on_connect:
+                callback()
+            connected = True
+            logger.info("Listening for notifications on %s", ", ".join(_handlers))
+            while True:
+                # Keepalive: a dead connection fails here instead of silently
+                # leaving the listeners deaf
+                await asyncio.sleep(interval)
+                await connection.execute("SELECT 1")
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            logger.warning("Notification listener failed, retrying: %s", exc)
+        finally:
+            connected = False
+            if connection is not None and not connection.is_closed():
+                await connection.close()
+        await asyncio.sleep(interval)
+
+
+async def start_listener() -> None:
+    """Start this worker's LISTEN task on PostgreSQL; elsewhere there is nothing to listen to."""
+    global _listener_task
+    url = make_url(settings.async_database_url)
+    if url.get_backend_name() != "postgresql" or _listener_task is not None or not _handlers:
+        return
+    dsn = url.set(drivername="postgresql").render_as_string(hide_password=False)
+    _listener_task = asyncio.create_task(_listen(dsn))
+
+
+async def stop_listener() -> None:
+    global _listener_task
+    if _listener_task is not None:
+        _listener_task.cancel()
+        try:
+            await _listener_task
+        except asyncio.CancelledError:
+            pass
+        _listener_task = None
@@ -0,0 +1,80 @@
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, List, Optional, Sequence, Tuple
+from fastapi import HTTPException, Query, Response, status
+from sqlalchemy import and_, or_
+
+# Page size when the client does not ask for one, and the largest it can ask for
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# List endpoints keep returning a plain JSON array so existing clients keep
+# working; the cursor for the following page travels in this header.
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class PageParams:
+    """Query parameters shared by every paginated list endpoint."""
+
+    def __init__(
+        self,
+        cursor: Optional[str] = Query(None, description="Opaque cursor returned in X-Next-Cursor"),
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size")
+    ):
+        self.cursor = cursor
+        self.limit = limit
+
+
+def encode_cursor(sort_value: Any, row_id: int) -> str:
+    if isinstance(sort_value, (date, datetime)):
+        sort_value = sort_value.isoformat()
+    raw = json.dumps([sort_value, row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_column) -> Tuple[Any, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        python_type = sort_column.type.python_type
+        if python_type is datetime:
+            sort_value = datetime.fromisoformat(sort_value)
+        elif python_type is date:
+            sort_value = date.fromisoformat(sort_value)
+        return sort_value, int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def paginate(statement, sort_column, id_column, page: PageParams):
+    """Order ``statement`` by (sort_column, id) and seek past the cursor.
+
+    The seek predicate is spelled out with OR/AND instead of a row-value
+    comparison so it behaves the same on PostgreSQL and SQLite, and both can
+    serve it from an index on (sort_column, id) regardless of page depth.
+    One extra row is fetched to know whether another page exists.
+    """
+    statement = statement.order_by(sort_column, id_column)
+    if page.cursor:
+        sort_value, row_id = decode_cursor(page.cursor, sort_column)
+        statement = statement.where(
+            or_(
+                sort_column > sort_value,
+                and_(sort_column == sort_value, id_column > row_id)
+            )
+        )
+    return statement.limit(page.limit + 1)
+
+
+def finish_page(rows: Sequence[Any], sort_attr: str, page: PageParams, response: Response) -> List[Any]:
+    """Trim the look-ahead row and expose the next cursor, if any."""
+    rows = list(rows)
+    if len(rows) > page.limit:
+        rows = rows[:page.limit]
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(getattr(last, sort_attr), last.id)
+    return rows
@@ -0,0 +1,107 @@
+import logging
+import threading
+import time
+from typing import Dict
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class PoolMetrics:
+    """Counters describing how requests compete for pooled connections."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkout_wait_seconds = 0.0
+        self.max_checkout_wait_seconds = 0.0
+        self.slow_checkouts = 0
+        self.checkout_timeouts = 0
+        self.leaked_connections = 0
+        # id(connection record) -> monotonic time of checkout
+        self.checked_out_at: Dict[int, float] = {}
+
+    def record_checkout_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.checkout_wait_seconds += seconds
+            self.max_checkout_wait_seconds = max(self.max_checkout_wait_seconds, seconds)
+            if seconds >= settings.db_pool_slow_checkout_seconds:
+                self.slow_checkouts += 1
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.checkout_timeouts += 1
+
+    def record_leak(self) -> None:
+        with self._lock:
+            self.leaked_connections += 1
+
+
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that measures how long callers wait for a connection."""
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            pool_metrics.record_timeout()
+            logger.warning(
+                "Database pool exhausted: no connection within %ss (size=%s, overflow=%s)",
+                settings.db_pool_timeout, self.size(), self.overflow()
+            )
+            raise
+        waited = time.perf_counter() - started
+        pool_metrics.record_checkout_wait(waited)
+        if waited >= settings.db_pool_slow_checkout_seconds:
+            logger.warning("Slow database pool checkout: waited %.3fs", waited)
+        return connection
+
+
+def install_leak_detection(engine) -> None:
+    """Warn about connections held longer than ``db_pool_leak_seconds``."""
+    pool = engine.pool
+
+    @event.listens_for(pool, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        pool_metrics.checked_out_at[id(connection_record)] = time.monotonic()
+
+    @event.listens_for(pool, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        started = pool_metrics.checked_out_at.pop(id(connection_record), None)
+        if started is not None:
+            held = time.monotonic() - started
+            if held >= settings.db_pool_leak_seconds:
+                pool_metrics.record_leak()
+                logger.warning("Database connection held for %.1fs before being returned", held)
+
+
+def pool_status(engine) -> dict:
+    """Snapshot of the pool occupancy plus the accumulated wait counters."""
+    pool = engine.pool
+    now = time.monotonic()
+    held_too_long = sum(
+        1 for started in list(pool_metrics.checked_out_at.values())
+        if now - started >= settings.db_pool_leak_seconds
+    )
+    checkouts = pool_metrics.checkouts
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": settings.db_max_overflow,
+        "checkouts": checkouts,
+        "avg_checkout_wait_ms": round(pool_metrics.checkout_wait_seconds / checkouts * 1000, 3) if checkouts else 0.0,
+        "max_checkout_wait_ms": round(pool_metrics.max_checkout_wait_seconds * 1000, 3),
+        "slow_checkouts": pool_metrics.slow_checkouts,
+        "checkout_timeouts": pool_metrics.checkout_timeouts,
+        "held_too_long": held_too_long,
+        "leaked_connections": pool_metrics.leaked_connections,
+    }
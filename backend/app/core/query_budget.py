@@ -0,0 +1,113 @@
+import logging
+import re
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Callable, Iterator, Optional
+from sqlalchemy import event
+from .config import settings
+from .metrics import RequestStats, current_request_stats
+
+logger = logging.getLogger(__name__)
+
+_IN_LIST = re.compile(r"\bIN\s*\((?:[^()]|\([^()]*\))*\)", re.IGNORECASE)
+_VALUES_ROWS = re.compile(r"\bVALUES\s*(\([^()]*\))(?:\s*,\s*\([^()]*\))+", re.IGNORECASE)
+
+
+class QueryBudgetExceeded(RuntimeError):
+    """Raised in ``raise`` mode when a request breaks its query budget."""
+
+
+def query_budget(max_queries: int) -> Callable:
+    """Declare how many SQL statements one call of an endpoint may run.
+
+    Put it below the router decorator so FastAPI registers the annotated
+    function::
+
+        @router.get("/assignments")
+        @query_budget(4)
+        async def get_user_assignments(...):
+    """
+    def decorator(endpoint: Callable) -> Callable:
+        endpoint.__query_budget__ = max_queries
+        return endpoint
+    return decorator
+
+
+@lru_cache(maxsize=2048)
+def statement_shape(statement: str) -> str:
+    """Collapse IN lists and multi-row VALUES so equivalent statements compare equal."""
+    shape = _IN_LIST.sub("IN (...)", statement)
+    shape = _VALUES_ROWS.sub(r"VALUES \1, ...", shape)
+    return " ".join(shape.split())
+
+
+def _report(stats: RequestStats, key: str, message: str) -> None:
+    if key in stats.flagged:
+        return
+    stats.flagged.add(key)
+    if settings.query_budget_mode == "raise":
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
+
+
+def _route_name(stats: RequestStats) -> str:
+    scope = stats.scope or {}
+    endpoint = scope.get("endpoint")
+    name = getattr(endpoint, "__name__", None) or "<no endpoint>"
+    return f"{scope.get('method', '')} {scope.get('path', '')} ({name})"
+
+
+def check_statement(stats: RequestStats, statement: str) -> None:
+    """Record the statement shape and flag budget or repetition violations."""
+    shape = statement_shape(statement)
+    repeats = stats.shapes.get(shape, 0) + 1
+    stats.shapes[shape] = repeats
+
+    if repeats > settings.query_repeat_threshold:
+        _report(
+            stats, shape,
+            f"Possible N+1 in {_route_name(stats)}: statement ran {repeats} times: {shape[:200]}"
+        )
+
+    endpoint = (stats.scope or {}).get("endpoint")
+    budget = getattr(endpoint, "__query_budget__", None)
+    if budget is not None and stats.queries > budget:
+        _report(
+            stats, "__budget__",
+            f"Query budget exceeded in {_route_name(stats)}: {stats.queries} statements, budget {budget}"
+        )
+
+
+def install_query_budget(engine) -> None:
+    """Check every request's statements against its budget (QUERY_BUDGET_MODE).
+
+    Must be installed after ``install_query_metrics`` so the request's
+    statement count already includes the statement being checked.
+    """
+    if settings.query_budget_mode not in ("log", "raise"):
+        return
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        stats = current_request_stats.get()
+        if stats is not None:
+            check_statement(stats, statement)
+
+
+@contextmanager
+def count_queries(scope: Optional[dict] = None) -> Iterator[RequestStats]:
+    """Attribute statements run inside the block to a fresh ``RequestStats``.
+
+    Meant for test fixtures and scripts that call the session directly, e.g.
+    ``with count_queries() as stats: ...; assert stats.queries <= 3``.
+    Requests made through the ASGI app are already counted by
+    ``MetricsMiddleware``; with QUERY_BUDGET_MODE=raise a budgeted endpoint
+    going over its limit fails with a 500, so an API test suite catches N+1
+    regressions without extra assertions.
+    """
+    stats = RequestStats(scope)
+    token = current_request_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        current_request_stats.reset(token)
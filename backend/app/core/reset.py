@@ -0,0 +1,131 @@
+from datetime import date
+from typing import Optional
+from sqlalchemy import delete
+from sqlmodel import select, func
+from sqlmodel.ext.asyncio.session import AsyncSession
+from ..models.rollup import DailyAssignmentRollup
+from ..models.task import Task, TaskAssignment, TaskAssignmentArchive, TaskStatus
+from .archive import archive_cutoff
+from .jobs import job_progress
+from .rollup import record_transitions
+
+# Rows deleted per transaction
+RESET_BATCH_SIZE = 1000
+# Resets touching more rows than this run as background jobs
+RESET_INLINE_LIMIT = 5000
+
+
+class ResetScope:
+    """Which assignments a reset removes, hot or archived; every filter is optional."""
+
+    def __init__(
+        self,
+        from_date: Optional[date] = None,
+        to_date: Optional[date] = None,
+        user_id: Optional[int] = None,
+        task_id: Optional[int] = None
+    ):
+        self.from_date = from_date
+        self.to_date = to_date
+        self.user_id = user_id
+        self.task_id = task_id
+
+    def apply(self, statement, model):
+        """Add the scope filters against ``model`` (assignments or rollup rows)."""
+        if self.from_date is not None:
+            statement = statement.where(model.scheduled_date >= self.from_date)
+        if self.to_date is not None:
+            statement = statement.where(model.scheduled_date <= self.to_date)
+        if self.user_id is not None:
+            statement = statement.where(model.user_id == self.user_id)
+        if self.task_id is not None:
+            statement = statement.where(model.task_id == self.task_id)
+        return statement
+
+    def models(self) -> tuple:
+        """Tables holding assignments in scope: the archive only when the range reaches it."""
+        if self.from_date is not None and self.from_date >= archive_cutoff():
+            return (TaskAssignment,)
+        return (TaskAssignment, TaskAssignmentArchive)
+
+    def as_dict(self) -> dict:
+        return {
+            "from_date": self.from_date, "to_date": self.to_date,
+            "user_id": self.user_id, "task_id": self.task_id,
+        }
+
+
+async def count_assignments(session: AsyncSession, scope: ResetScope) -> int:
+    return sum([
+        (await session.exec(scope.apply(select(func.count(model.id)), model))).one()
+        for model in scope.models()
+    ])
+
+
+async def _reset_table(
+    session: AsyncSession,
+    model,
+    scope: ResetScope,
+    batch_size: int,
+    job_id: Optional[str],
+    deleted: int
+) -> int:
+    """Batched delete of ``model`` rows in scope; returns ``deleted`` plus the rows removed."""
+    while True:
+        ids = (await session.exec(
+            scope.apply(select(model.id), model).order_by(model.id).limit(batch_size)
+        )).all()
+        if not ids:
+            return deleted
+
+        # The rollup is corrected from what the DELETE really removed, with the
+        # status each row had at that moment: rows already taken by an
+        # overlapping reset are not subtracted twice, and an approval that
+        # committed after the SELECT is subtracted as approved
+        rows = (await session.exec(
+            delete(model).where(model.id.in_(ids)).returning(
+                model.id, model.scheduled_date, model.user_id, model.task_id, model.status
+            )
+        )).all()
+        approved_task_ids = {row.task_id for row in rows if row.status == TaskStatus.APPROVED}
+        credits_by_task = dict((await session.exec(
+            select(Task.id, Task.credits).where(Task.id.in_(approved_task_ids))
+        )).all()) if approved_task_ids else {}
+        await record_transitions(session, [
+            (row, row.status, None, -credits_by_task.get(row.task_id, 0) if row.status == TaskStatus.APPROVED else 0)
+            for row in rows
+        ])
+        deleted += len(rows)
+        if job_id is not None:
+            await session.exec(job_progress(session, job_id, deleted))
+        await session.commit()
+
+
+async def reset_assignments(
+    session: AsyncSession,
+    scope: ResetScope,
+    batch_size: int = RESET_BATCH_SIZE,
+    job_id: Optional[str] = None
+) -> int:
+    """Delete the assignments in ``scope``, hot and archived, in batches that each commit.
+
+    Every batch removes up to ``batch_size`` rows with one DELETE ... WHERE
+    id IN (...) RETURNING, subtracts the returned rows from the rollup (which
+    counts archived rows too) and, when running as a job, records progress
+    in the same transaction. Rollup rows left with no assignments in the
+    scope are dropped at the end. Returns the number of assignments deleted.
+    """
+    deleted = 0
+    for model in scope.models():
+        deleted = await _reset_table(session, model, scope, batch_size, job_id, deleted)
+
+    # Credits of a task may have changed since approval; dropping the emptied
+    # rows also discards any leftover drift for them
+    await session.exec(scope.apply(delete(DailyAssignmentRollup), DailyAssignmentRollup).where(
+        DailyAssignmentRollup.pending <= 0,
+        DailyAssignmentRollup.completed <= 0,
+        DailyAssignmentRollup.approved <= 0,
+        DailyAssignmentRollup.rejected <= 0,
+    ))
+    await session.commit()
+    return deleted
@@ -0,0 +1,157 @@
+from datetime import timedelta
+from typing import Iterable, Optional, Tuple
+from sqlalchemy import case, delete, func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from ..models.rollup import DailyAssignmentRollup
+from ..models.task import Task, TaskAssignment, TaskStatus
+from .archive import assignment_history
+
+ROLLUP_COUNTERS = ("pending", "completed", "approved", "rejected", "credits")
+
+
+def _upsert(session: AsyncSession):
+    if session.get_bind().dialect.name == "postgresql":
+        return postgresql.insert(DailyAssignmentRollup)
+    return sqlite.insert(DailyAssignmentRollup)
+
+
+async def record_transition(
+    session: AsyncSession,
+    assignment: TaskAssignment,
+    from_status: Optional[TaskStatus],
+    to_status: TaskStatus,
+    credits: int = 0
+) -> None:
+    """Move one assignment between status counters of its rollup row.
+
+    Runs as a single INSERT ... ON CONFLICT DO UPDATE in the caller's
+    transaction, so the rollup commits or rolls back together with the
+    assignment change and concurrent updates cannot lose increments.
+    """
+    deltas = {counter: 0 for counter in ROLLUP_COUNTERS}
+    if from_status is not None:
+        deltas[TaskStatus(from_status).value] -= 1
+    deltas[TaskStatus(to_status).value] += 1
+    deltas["credits"] += credits
+
+    table = DailyAssignmentRollup.__table__
+    statement = _upsert(session).values(
+        scheduled_date=assignment.scheduled_date,
+        user_id=assignment.user_id,
+        task_id=assignment.task_id,
+        **deltas
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c.scheduled_date, table.c.user_id, table.c.task_id],
+        set_={counter: table.c[counter] + deltas[counter] for counter in ROLLUP_COUNTERS if deltas[counter]}
+    )
+    await session.exec(statement)
+
+
+async def record_transitions(
+    session: AsyncSession,
+    transitions: Iterable[Tuple[TaskAssignment, Optional[TaskStatus], Optional[TaskStatus], int]]
+) -> None:
+    """Bulk form of ``record_transition`` for (assignment, from, to, credits) tuples.
+
+    ``to`` may be None for assignments being deleted. Deltas are summed per
+    rollup key first, then applied with a single multi-row
+    INSERT ... ON CONFLICT DO UPDATE in the caller's transaction.
+    """
+    deltas_by_key = {}
+    for assignment, from_status, to_status, credits in transitions:
+        key = (assignment.scheduled_date, assignment.user_id, assignment.task_id)
+        deltas = deltas_by_key.setdefault(key, {counter: 0 for counter in ROLLUP_COUNTERS})
+        if from_status is not None:
+            deltas[TaskStatus(from_status).value] -= 1
+        if to_status is not None:
+            deltas[TaskStatus(to_status).value] += 1
+        deltas["credits"] += credits
+    if not deltas_by_key:
+        return
+
+    table = DailyAssignmentRollup.__table__
+    statement = _upsert(session).values([
+        {"scheduled_date": day, "user_id": user_id, "task_id": task_id, **deltas}
+        for (day, user_id, task_id), deltas in deltas_by_key.items()
+    ])
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c.scheduled_date, table.c.user_id, table.c.task_id],
+        set_={counter: table.c[counter] + statement.excluded[counter] for counter in ROLLUP_COUNTERS}
+    )
+    await session.exec(statement)
+
+
+async def rebuild_rollup(session: AsyncSession, batch_days: int = 31, verbose: bool = False) -> int:
+    """Recompute the rollup from the assignment history (hot and archived).
+
+    Works one ``batch_days`` window at a time: each window's rollup rows are
+    deleted and re-aggregated with one INSERT ... SELECT ... ON CONFLICT DO
+    UPDATE in a single transaction, so the stats endpoints never see a
+    window half rebuilt and a transition recorded concurrently by the API
+    cannot make the insert fail. Returns the number of rollup rows written.
+    """
+    # Archived assignments are part of the history the rollup covers
+    history = assignment_history()
+    bounds = (await session.exec(
+        select(func.min(history.scheduled_date), func.max(history.scheduled_date))
+    )).first()
+    if not bounds or bounds[0] is None:
+        await session.exec(delete(DailyAssignmentRollup))
+        await session.commit()
+        return 0
+
+    first_day, last_day = bounds
+    table = DailyAssignmentRollup.__table__
+
+    def status_count(status_value: TaskStatus):
+        return func.sum(case((history.status == status_value, 1), else_=0))
+
+    written = 0
+    window_start = first_day
+    while window_start <= last_day:
+        window_end = min(window_start + timedelta(days=batch_days - 1), last_day)
+        aggregate = (
+            select(
+                history.scheduled_date,
+                history.user_id,
+                history.task_id,
+                status_count(TaskStatus.PENDING),
+                status_count(TaskStatus.COMPLETED),
+                status_count(TaskStatus.APPROVED),
+                status_count(TaskStatus.REJECTED),
+                func.sum(case((history.status == TaskStatus.APPROVED, Task.credits), else_=0)),
+            )
+            .join(Task, Task.id == history.task_id)
+            .where(
+                history.scheduled_date >= window_start,
+                history.scheduled_date <= window_end,
+            )
+            .group_by(history.scheduled_date, history.user_id, history.task_id)
+        )
+        await session.exec(delete(DailyAssignmentRollup).where(
+            DailyAssignmentRollup.scheduled_date >= window_start,
+            DailyAssignmentRollup.scheduled_date <= window_end,
+        ))
+        statement = _upsert(session).from_select(["scheduled_date", "user_id", "task_id", *ROLLUP_COUNTERS], aggregate)
+        # A row upserted by a live transition since the DELETE is replaced
+        # by the recomputed counters instead of failing the insert
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.scheduled_date, table.c.user_id, table.c.task_id],
+            set_={counter: statement.excluded[counter] for counter in ROLLUP_COUNTERS}
+        )
+        result = await session.exec(statement)
+        await session.commit()
+        written += max(result.rowcount or 0, 0)
+        if verbose:
+            print(f"{window_start.isoformat()} .. {window_end.isoformat()}: {result.rowcount} rows")
+        window_start = window_end + timedelta(days=1)
+
+    # Rows for days the history no longer covers
+    await session.exec(delete(DailyAssignmentRollup).where(
+        (DailyAssignmentRollup.scheduled_date < first_day) | (DailyAssignmentRollup.scheduled_date > last_day)
+    ))
+    await session.commit()
+    return written
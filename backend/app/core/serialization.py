@@ -0,0 +1,32 @@
+from functools import lru_cache
+from typing import Any, Optional
+from fastapi import Response
+from pydantic import TypeAdapter
+
+
+@lru_cache(maxsize=None)
+def type_adapter(response_type: Any) -> TypeAdapter:
+    """One TypeAdapter per response type; building the validator is the slow part."""
+    return TypeAdapter(response_type)
+
+
+def json_response(response_type: Any, content: Any, response: Optional[Response] = None) -> Response:
+    """Validate ``content`` once against ``response_type`` and render it to JSON.
+
+    Returning a ``Response`` skips FastAPI's own pass over ``response_model``
+    (validate again, ``jsonable_encoder``, ``json.dumps``); the bytes come
+    straight from pydantic-core's serializer and match what that pass
+    produces. Keep ``response_model`` on the route for the OpenAPI schema.
+
+    ``content`` may hold ORM objects, dicts or already built response
+    models. Pass the endpoint's injected ``response`` so headers set on it
+    (X-Next-Cursor, ETag) and its status code are carried over.
+    """
+    adapter = type_adapter(response_type)
+    body = adapter.dump_json(adapter.validate_python(content, from_attributes=True))
+    result = Response(body, media_type="application/json")
+    if response is not None:
+        if response.status_code:
+            result.status_code = response.status_code
+        result.raw_headers.extend(response.headers.raw)
+    return result
@@ -0,0 +1,153 @@
+import time
+from datetime import datetime
+from typing import Callable, Dict, Optional, Tuple
+from fastapi import Depends, HTTPException, Request, Response, status
+from sqlalchemy import func
+from sqlalchemy.engine import Connection
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from . import notify
+from .config import settings
+from .database import get_session
+from ..models.resource_version import ResourceVersion
+from ..models.reward import Reward
+from ..models.task import Task
+
+# Resources with a version counter
+TASK_CATALOG = "tasks"
+REWARD_CATALOG = "rewards"
+
+# Table behind each resource: its row count and highest id are part of the
+# ETag, so rows inserted or deleted without a bump (manual SQL, an old
+# script) still change it
+_TABLES = {TASK_CATALOG: Task, REWARD_CATALOG: Reward}
+
+# PostgreSQL channel carrying the name of every bumped resource
+NOTIFY_CHANNEL = "resource_version"
+
+# name -> (etag, monotonic time it was read from the database)
+_etags: Dict[str, Tuple[str, float]] = {}
+
+
+def _etag(name: str, version: int, updated_at: Optional[datetime], rows: int, last_id: int) -> str:
+    # The timestamp keeps ETags from a recreated database from colliding
+    stamp = int(updated_at.timestamp() * 1000) if updated_at else 0
+    return f'"{name}-{version or 0}-{stamp:x}-{rows:x}.{last_id:x}"'
+
+
+def _bump_statement(dialect: str, name: str):
+    now = datetime.utcnow()
+    if dialect == "postgresql":
+        statement = postgresql.insert(ResourceVersion)
+    else:
+        statement = sqlite.insert(ResourceVersion)
+    return statement.values(name=name, version=1, updated_at=now).on_conflict_do_update(
+        index_elements=[ResourceVersion.name],
+        set_={"version": ResourceVersion.version + 1, "updated_at": now}
+    )
+
+
+async def bump_version(session: AsyncSession, name: str) -> None:
+    """Count a write to ``name`` in the caller's transaction.
+
+    Call ``forget_version(name)`` after the commit so this worker serves the
+    new ETag right away. On PostgreSQL the commit also delivers a NOTIFY
+    that makes every other worker drop it; elsewhere they pick the change up
+    once their entry goes stale (RESOURCE_VERSION_CACHE_SECONDS).
+    """
+    dialect = session.get_bind().dialect.name
+    await session.exec(_bump_statement(dialect, name))
+    if dialect == "postgresql":
+        # Queued by the server and delivered only if the transaction commits
+        await session.exec(select(func.pg_notify(NOTIFY_CHANNEL, name)))
+
+
+def bump_version_sync(connection: Connection, name: str) -> None:
+    """``bump_version`` for scripts writing through a synchronous connection.
+
+    Every script that writes tasks or rewards must call it in the same
+    transaction (``session.connection()`` for a Session).
+    """
+    dialect = connection.dialect.name
+    connection.execute(_bump_statement(dialect, name))
+    if dialect == "postgresql":
+        connection.execute(select(func.pg_notify(NOTIFY_CHANNEL, name)))
+
+
+def forget_version(name: str) -> None:
+    _etags.pop(name, None)
+
+
+async def current_etag(session: AsyncSession, name: str) -> str:
+    """Strong ETag for the current version of ``name``; cached per worker."""
+    entry = _etags.get(name)
+    if entry is not None:
+        age = time.monotonic() - entry[1]
+        # While this worker holds a LISTEN connection cached ETags are trusted
+        # until a notification drops them, up to a hard maximum age so writes
+        # made without a bump are still picked up
+        if age <= settings.resource_version_cache_seconds or (
+            notify.connected and age <= settings.resource_version_max_age_seconds
+        ):
+            return entry[0]
+    table = _TABLES[name]
+    current = ResourceVersion.name == name
+    row = (await session.exec(select(
+        select(ResourceVersion.version).where(current).scalar_subquery(),
+        select(ResourceVersion.updated_at).where(current).scalar_subquery(),
+        select(func.count(table.id)).scalar_subquery(),
+        select(func.coalesce(func.max(table.id), 0)).scalar_subquery(),
+    ))).one()
+    etag = _etag(name, *row)
+    _etags[name] = (etag, time.monotonic())
+    return etag
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison: W/ prefixes are ignored
+    return any(
+        candidate.strip().removeprefix("W/") == etag
+        for candidate in if_none_match.split(",")
+    )
+
+
+def conditional_get(name: str) -> Callable:
+    """Dependency answering ``If-None-Match`` for a versioned resource.
+
+    Resolves the resource's ETag (usually from the worker's cache, without a
+    query) and raises a 304 when the client already has it; otherwise the
+    ETag is added to the response. Declare it after the auth dependency so
+    unauthenticated clients still get a 401::
+
+        @router.get("/")
+        async def get_tasks(..., current_user = Depends(get_current_user),
+                            _: str = Depends(conditional_get(TASK_CATALOG))):
+
+    The ETag is read before the endpoint queries the data, so a concurrent
+    write can only make the label older than the content, never newer.
+    """
+    async def dependency(
+        request: Request,
+        response: Response,
+        session: AsyncSession = Depends(get_session)
+    ) -> str:
+        etag = await current_etag(session, name)
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and _matches(if_none_match, etag):
+            raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        response.headers.update(headers)
+        return etag
+
+    return dependency
+
+
+def _on_connect() -> None:
+    # Bumps may have been missed while not listening
+    _etags.clear()
+
+
+notify.listen(NOTIFY_CHANNEL, forget_version, on_connect=_on_connect)
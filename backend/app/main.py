@@ -1,8 +1,16 @@
-from fastapi import FastAPI, Request
+from fastapi import Depends, FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
+from .core.access_log import AccessLogMiddleware, setup_access_log, shutdown_access_log
 from .core.config import settings
-from .core.database import create_db_and_tables
-from .api import auth, tasks, users, rewards
+from .core.database import async_engine, upgrade_database
+from .core.metrics import MetricsMiddleware, render_metrics
+from .core.pool import pool_status
+from .core.pagination import NEXT_CURSOR_HEADER
+from .core.security import shutdown_password_executor
+from .core.notify import start_listener, stop_listener
+from .api import auth, tasks, users, rewards, jobs, events
+from .api.auth import require_monitoring_access
 import logging
 
 # Configure logging
@@ -27,31 +35,45 @@ app.add_middleware(
     ],
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"],
-    allow_headers=["Content-Type", "Authorization", "X-Requested-With"],
-    expose_headers=["*"],
+    allow_headers=["Content-Type", "Authorization", "X-Requested-With", "If-None-Match"],
+    # A wildcard is ignored on credentialed requests; list what the frontend reads
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
 
-# Debug middleware for mobile requests
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    user_agent = request.headers.get("user-agent", "")
-    origin = request.headers.get("origin", "")
-    logger.info(f"Request: {request.method} {request.url} - Origin: {origin} - User-Agent: {user_agent[:50]}...")
-
-    response = await call_next(request)
-    logger.info(f"Response: {response.status_code}")
-    return response
+# Per-route Prometheus metrics and the structured JSON access log
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(AccessLogMiddleware)
 
 # Include routers
 app.include_router(auth.router)
 app.include_router(tasks.router)
 app.include_router(users.router)
 app.include_router(rewards.router)
+app.include_router(jobs.router)
+app.include_router(events.router)
 
 
 @app.on_event("startup")
 def on_startup():
-    create_db_and_tables()
+    setup_access_log()
+    upgrade_database()
+
+
+@app.on_event("startup")
+async def start_listeners():
+    # Cross-worker catalog invalidation and event fan-out (PostgreSQL LISTEN/NOTIFY)
+    await start_listener()
+
+
+@app.on_event("shutdown")
+async def stop_listeners():
+    await stop_listener()
+
+
+@app.on_event("shutdown")
+def on_shutdown():
+    shutdown_password_executor()
+    shutdown_access_log()
 
 
 @app.get("/")
@@ -62,3 +84,18 @@ def read_root():
 @app.get("/health")
 def health_check():
     return {"status": "healthy"}
+
+
+@app.get("/health/db-pool", dependencies=[Depends(require_monitoring_access)])
+def db_pool_health():
+    """Connection pool occupancy and checkout-wait counters for this worker."""
+    return pool_status(async_engine.sync_engine)
+
+
+@app.get("/metrics", response_class=PlainTextResponse, dependencies=[Depends(require_monitoring_access)])
+def prometheus_metrics():
+    """Request, query and pool metrics for this worker in Prometheus text format."""
+    return PlainTextResponse(
+        render_metrics(async_engine.sync_engine),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -0,0 +1,50 @@
+from typing import Optional
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Column, ForeignKey, Index, Integer
+from datetime import datetime
+from enum import Enum
+
+
+class CreditReason(str, Enum):
+    TASK_APPROVAL = "task_approval"
+    REWARD_REDEMPTION = "reward_redemption"
+    ADMIN_ADJUSTMENT = "admin_adjustment"
+    OPENING_BALANCE = "opening_balance"
+
+
+class CreditLedger(SQLModel, table=True):
+    """Append-only record of every change to ``User.credits``."""
+    __tablename__ = "credit_ledger"
+    __table_args__ = (Index("ix_credit_ledger_user_id_created_at", "user_id", "created_at"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: int = Field(foreign_key="user.id")
+    amount: int  # Positive when credits are earned, negative when spent
+    reason: CreditReason
+    # History must survive assignment resets, so source rows may go away.
+    # Not a foreign key: archived assignments keep their id in
+    # taskassignment_archive and the ledger must keep pointing at them.
+    assignment_id: Optional[int] = Field(default=None, sa_column=Column(Integer, index=True))
+    redemption_id: Optional[int] = Field(
+        default=None,
+        sa_column=Column(Integer, ForeignKey("rewardredemption.id", ondelete="SET NULL"))
+    )
+    # Who made the change; only attribution, so deleting that user keeps the row
+    created_by: Optional[int] = Field(
+        default=None,
+        sa_column=Column(Integer, ForeignKey("user.id", ondelete="SET NULL"))
+    )
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class CreditSnapshot(SQLModel, table=True):
+    """Balance of a user after applying every ledger row up to ``last_ledger_id``."""
+    __tablename__ = "credit_snapshot"
+    __table_args__ = (Index("ix_credit_snapshot_user_id_created_at", "user_id", "created_at"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    # Derived from the ledger: goes away with the user
+    user_id: int = Field(sa_column=Column(Integer, ForeignKey("user.id", ondelete="CASCADE"), nullable=False))
+    balance: int
+    last_ledger_id: int = Field(default=0)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -0,0 +1,32 @@
+from typing import Optional
+from sqlmodel import SQLModel, Field
+from datetime import datetime
+from enum import Enum
+
+
+class JobStatus(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class BackgroundJob(SQLModel, table=True):
+    """Long-running maintenance work started from the API (e.g. scoped resets).
+
+    Stored in the database so any worker can report progress, not only the
+    one running the job.
+    """
+    __tablename__ = "background_job"
+
+    id: str = Field(primary_key=True)
+    kind: str
+    status: JobStatus = Field(default=JobStatus.PENDING)
+    params: Optional[str] = None  # JSON
+    total: Optional[int] = None
+    processed: int = Field(default=0)
+    error: Optional[str] = None
+    created_by: Optional[int] = Field(default=None, foreign_key="user.id")
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
@@ -0,0 +1,15 @@
+from sqlmodel import SQLModel, Field
+from datetime import datetime
+
+
+class ResourceVersion(SQLModel, table=True):
+    """Change counter of a rarely written resource (e.g. the task catalog).
+
+    Bumped in the same transaction as every write to the resource; clients
+    revalidate against it through ETags instead of re-downloading.
+    """
+    __tablename__ = "resource_version"
+
+    name: str = Field(primary_key=True)
+    version: int = Field(default=0)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -1,5 +1,6 @@
 from typing import Optional
 from sqlmodel import SQLModel, Field
+from sqlalchemy import Index
 from datetime import datetime
 
 
@@ -13,6 +14,9 @@ class Reward(SQLModel, table=True):
 
 
 class RewardRedemption(SQLModel, table=True):
+    # A user's redemptions, in the keyset order used by GET /redemptions
+    __table_args__ = (Index("ix_rewardredemption_user_id_redeemed_at", "user_id", "redeemed_at"),)
+
     id: Optional[int] = Field(default=None, primary_key=True)
     reward_id: int = Field(foreign_key="reward.id")
     user_id: int = Field(foreign_key="user.id")
@@ -0,0 +1,24 @@
+from sqlalchemy import Column, ForeignKey, Integer
+from sqlmodel import SQLModel, Field
+from datetime import date
+
+
+class DailyAssignmentRollup(SQLModel, table=True):
+    """Per-day, per-user, per-task assignment counters.
+
+    Maintained in the same transaction as every assignment status change so
+    range reports scale with the number of days instead of assignments.
+    """
+    __tablename__ = "daily_assignment_rollup"
+
+    scheduled_date: date = Field(primary_key=True)
+    # Derived counters: they go away with the user
+    user_id: int = Field(
+        sa_column=Column(Integer, ForeignKey("user.id", ondelete="CASCADE"), primary_key=True)
+    )
+    task_id: int = Field(primary_key=True, foreign_key="task.id")
+    pending: int = Field(default=0)
+    completed: int = Field(default=0)
+    approved: int = Field(default=0)
+    rejected: int = Field(default=0)
+    credits: int = Field(default=0)  # Credits awarded by approved assignments
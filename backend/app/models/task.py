@@ -1,8 +1,12 @@
-from typing import Optional
-from sqlmodel import SQLModel, Field
+from typing import Optional, TYPE_CHECKING
+from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Index, text
 from datetime import datetime, date
 from enum import Enum
 
+if TYPE_CHECKING:
+    from .user import User
+
 
 class TaskType(str, Enum):
     INDIVIDUAL = "individual"
@@ -33,7 +37,34 @@ class Task(SQLModel, table=True):
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
 
+# Open assignments (pending or completed) are the ones the once-per-day
+# rules apply to; settled ones may repeat freely
+_OPEN_ASSIGNMENT = "status IN ('PENDING', 'COMPLETED')"
+
+
 class TaskAssignment(SQLModel, table=True):
+    # Composite indexes for the real access paths: a child's board and
+    # history, the approval queue, and the once-per-day assignment checks
+    __table_args__ = (
+        Index("ix_taskassignment_user_id_scheduled_date", "user_id", "scheduled_date"),
+        Index("ix_taskassignment_status_scheduled_date", "status", "scheduled_date"),
+        Index("ix_taskassignment_task_id_scheduled_date_status", "task_id", "scheduled_date", "status"),
+        # Una tarea colectiva abierta por día, para cualquier usuario
+        Index(
+            "uq_taskassignment_open_collective", "task_id", "scheduled_date", unique=True,
+            sqlite_where=text(f"{_OPEN_ASSIGNMENT} AND collective"),
+            postgresql_where=text(f"{_OPEN_ASSIGNMENT} AND collective"),
+        ),
+        # Una tarea individual abierta por día y usuario
+        Index(
+            "uq_taskassignment_open_individual", "task_id", "user_id", "scheduled_date", unique=True,
+            sqlite_where=text(f"{_OPEN_ASSIGNMENT} AND NOT collective"),
+            postgresql_where=text(f"{_OPEN_ASSIGNMENT} AND NOT collective"),
+        ),
+        # Archived rows keep their id: SQLite must never hand one out again
+        {"sqlite_autoincrement": True},
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     task_id: int = Field(foreign_key="task.id")
     user_id: int = Field(foreign_key="user.id")
@@ -43,3 +74,41 @@ class TaskAssignment(SQLModel, table=True):
     approved_at: Optional[datetime] = None
     approved_by: Optional[int] = Field(default=None, foreign_key="user.id")
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    # Copy of task.task_type == COLLECTIVE taken at assignment time: the
+    # partial unique indexes above cannot look at the task row
+    collective: bool = Field(default=False)
+
+    # Relationships are never lazy-loaded: listings must request them explicitly
+    # with selectinload/joinedload, otherwise attribute access raises.
+    task: Optional[Task] = Relationship(sa_relationship_kwargs={"lazy": "raise"})
+    user: Optional["User"] = Relationship(
+        sa_relationship_kwargs={"lazy": "raise", "foreign_keys": "TaskAssignment.user_id"}
+    )
+    approver: Optional["User"] = Relationship(
+        sa_relationship_kwargs={"lazy": "raise", "foreign_keys": "TaskAssignment.approved_by"}
+    )
+
+
+class TaskAssignmentArchive(SQLModel, table=True):
+    """Settled assignments moved out of ``taskassignment`` by the archiver.
+
+    Same columns and ids as the hot table. On PostgreSQL the table is
+    range-partitioned by scheduled_date (one partition per year, created on
+    demand), so the partition key is part of the primary key.
+    """
+    __tablename__ = "taskassignment_archive"
+    __table_args__ = (
+        Index("ix_taskassignment_archive_user_id_scheduled_date", "user_id", "scheduled_date"),
+        {"postgresql_partition_by": "RANGE (scheduled_date)"},
+    )
+
+    id: int = Field(primary_key=True, sa_column_kwargs={"autoincrement": False})
+    scheduled_date: date = Field(primary_key=True)
+    task_id: int
+    user_id: int
+    status: TaskStatus
+    completed_at: Optional[datetime] = None
+    approved_at: Optional[datetime] = None
+    approved_by: Optional[int] = None
+    created_at: datetime
+    collective: bool = False
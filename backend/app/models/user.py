@@ -16,4 +16,6 @@ class User(SQLModel, table=True):
     role: UserRole = Field(default=UserRole.USER)
     credits: int = Field(default=0)
     is_active: bool = Field(default=True)
+    # Bumped to revoke every token issued before (deactivation, role or password change)
+    auth_epoch: int = Field(default=0)
     created_at: datetime = Field(default_factory=datetime.utcnow)
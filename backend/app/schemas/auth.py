@@ -12,6 +12,17 @@ class TokenData(BaseModel):
     username: Optional[str] = None
 
 
+class AuthenticatedUser(BaseModel):
+    """Identity carried by a verified access token."""
+    id: int
+    username: str
+    role: UserRole
+    # None for tokens issued before the epoch claim existed
+    auth_epoch: Optional[int] = None
+    # "exp" claim, seconds since 1970-01-01 UTC
+    expires_at: Optional[int] = None
+
+
 class UserLogin(BaseModel):
     username: str
     password: str
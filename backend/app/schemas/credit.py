@@ -0,0 +1,33 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+from ..models.credit import CreditReason
+
+
+class CreditLedgerEntry(BaseModel):
+    id: int
+    user_id: int
+    amount: int
+    reason: CreditReason
+    assignment_id: Optional[int]
+    redemption_id: Optional[int]
+    created_by: Optional[int]
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class CreditBalance(BaseModel):
+    user_id: int
+    balance: int
+    at: datetime
+
+
+class CreditSummary(BaseModel):
+    user_id: int
+    from_date: datetime
+    to_date: datetime
+    earned: int
+    spent: int
+    adjusted: int
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Dict, List, Optional
 from datetime import datetime, date
 from ..models.task import TaskType, TaskStatus, TaskPeriodicity
 
@@ -59,3 +59,57 @@ class TaskAssignmentResponse(BaseModel):
 
 class TaskAssignmentUpdate(BaseModel):
     status: TaskStatus
+
+
+class BulkAssignRequest(BaseModel):
+    task_ids: List[int]
+    # Defaults to today; a range assigns every task on each day in it
+    from_date: Optional[date] = None
+    to_date: Optional[date] = None
+
+
+class BulkAssignItemResult(BaseModel):
+    task_id: int
+    scheduled_date: date
+    assigned: bool
+    detail: Optional[str] = None
+    assignment: Optional[TaskAssignmentResponse] = None
+
+
+class BulkAssignResponse(BaseModel):
+    assigned: int
+    failed: int
+    results: List[BulkAssignItemResult]
+
+
+class BulkReviewRequest(BaseModel):
+    # Explicit ids and/or a filter; only completed assignments are touched
+    assignment_ids: Optional[List[int]] = None
+    scheduled_date: Optional[date] = None
+    user_id: Optional[int] = None
+
+
+class BulkReviewResponse(BaseModel):
+    status: TaskStatus
+    updated: int
+    assignment_ids: List[int]
+    # Requested ids that were missing or not in the completed state
+    skipped_ids: List[int] = []
+    credits_by_user: Dict[int, int] = {}
+
+
+class ResetRequest(BaseModel):
+    # No filters resets every assignment
+    from_date: Optional[date] = None
+    to_date: Optional[date] = None
+    user_id: Optional[int] = None
+    task_id: Optional[int] = None
+
+
+class ResetResponse(BaseModel):
+    message: str
+    total: int
+    # Set when the reset ran inline
+    deleted: Optional[int] = None
+    # Set when the reset runs as a background job (GET /api/jobs/{job_id})
+    job_id: Optional[str] = None
@@ -22,3 +22,8 @@ class UserStats(BaseModel):
     pending_tasks: int
     approved_tasks: int
     rejected_tasks: int
+
+
+class UserStatsEntry(UserStats):
+    user_id: int
+    username: str
@@ -5,6 +5,7 @@ Convierte los valores de minúsculas a mayúsculas para que coincidan con el enu
 
 from sqlalchemy import create_engine, text
 from app.core.config import settings
+from app.core.versions import TASK_CATALOG, bump_version_sync
 
 def fix_periodicity_values():
     """Corrige los valores de la columna 'periodicity' en la tabla 'task'."""
@@ -24,6 +25,8 @@ def fix_periodicity_values():
     with engine.connect() as conn:
         for sql in sql_commands:
             conn.execute(sql)
+        # The catalog caches and ETags only notice counted writes
+        bump_version_sync(conn, TASK_CATALOG)
         conn.commit()
         print("Valores de la columna 'periodicity' corregidos correctamente.")
 
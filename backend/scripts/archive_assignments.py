@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Move settled (approved/rejected) task assignments older than the archive
+horizon from taskassignment into taskassignment_archive.
+
+Runs in small batches that each commit, so it can run while the API is
+serving traffic; schedule it daily (e.g. from cron). On PostgreSQL the
+yearly archive partitions are created as needed.
+"""
+import argparse
+import asyncio
+import os
+import sys
+from datetime import date, timedelta
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(CURRENT_DIR)
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from app.core.archive import ARCHIVE_BATCH_SIZE, archive_assignments
+from app.core.config import settings
+from app.core.database import async_engine, async_session_maker, upgrade_database
+
+
+async def archive(before: date, batch_size: int) -> int:
+    async with async_session_maker() as session:
+        moved = await archive_assignments(session, before, batch_size, verbose=True)
+    await async_engine.dispose()
+    return moved
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--days", type=int, default=settings.archive_after_days,
+                        help=f"Archive assignments scheduled more than this many days ago "
+                             f"(default: ARCHIVE_AFTER_DAYS={settings.archive_after_days})")
+    parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE,
+                        help=f"Rows moved per transaction (default: {ARCHIVE_BATCH_SIZE})")
+    args = parser.parse_args()
+    if args.days < settings.archive_after_days:
+        parser.error("--days cannot be lower than ARCHIVE_AFTER_DAYS: reads of recent ranges skip the archive")
+
+    upgrade_database()
+    before = date.today() - timedelta(days=args.days)
+    moved = asyncio.run(archive(before, args.batch_size))
+    print(f"Archived {moved} assignments scheduled before {before.isoformat()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Scripted end-to-end benchmark of the main API flows.
+
+Drives the real endpoints in-process through the ASGI app, against whatever
+DATABASE_URL points at (SQLite or a local PostgreSQL). Every virtual user is
+a generated child account that logs in and then repeatedly assigns a task,
+completes it, has its parent approve it, lists its assignments, reads the
+daily stats and tries to redeem a reward. Latency percentiles (p50/p95/p99)
+and throughput are reported per operation and written as JSON, optionally
+compared against a stored baseline:
+
+    DATABASE_URL=sqlite:///./bench.db python scripts/benchmark_api.py --generate \\
+        --output bench.json --baseline benchmarks/baseline-sqlite.json
+
+Use --generate to (re)create the data set with generate_load_data.py first;
+without it the database must already contain generated families.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import time
+from datetime import date, datetime, timedelta
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(CURRENT_DIR)
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+import httpx
+import logging
+from app.main import app
+from app.core import database
+from app.core.config import settings
+from generate_load_data import generate
+
+# One line per request would drown the report
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+OPERATIONS = ["login", "assign", "complete", "approve", "list_assignments", "stats", "redeem"]
+
+
+def percentile(sorted_values, fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+class Recorder:
+    def __init__(self):
+        self.samples = {operation: [] for operation in OPERATIONS}
+        self.statuses = {operation: {} for operation in OPERATIONS}
+
+    async def call(self, operation: str, request) -> httpx.Response:
+        started = time.perf_counter()
+        response = await request
+        self.samples[operation].append(time.perf_counter() - started)
+        bucket = f"{response.status_code // 100}xx"
+        self.statuses[operation][bucket] = self.statuses[operation].get(bucket, 0) + 1
+        return response
+
+    def summary(self, elapsed: float) -> dict:
+        operations = {}
+        for operation, samples in self.samples.items():
+            samples = sorted(samples)
+            operations[operation] = {
+                "requests": len(samples),
+                "statuses": self.statuses[operation],
+                "throughput_rps": round(len(samples) / elapsed, 1) if elapsed else 0.0,
+                "p50_ms": round(percentile(samples, 0.50) * 1000, 2),
+                "p95_ms": round(percentile(samples, 0.95) * 1000, 2),
+                "p99_ms": round(percentile(samples, 0.99) * 1000, 2),
+            }
+        total = sum(len(samples) for samples in self.samples.values())
+        return {
+            "requests": total,
+            "elapsed_s": round(elapsed, 2),
+            "throughput_rps": round(total / elapsed, 1) if elapsed else 0.0,
+            "operations": operations,
+        }
+
+
+async def login(client: httpx.AsyncClient, recorder: Recorder, username: str, password: str) -> dict:
+    response = await recorder.call("login", client.post(
+        "/api/user/login", data={"username": username, "password": password}
+    ))
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def make_client(transport: httpx.ASGITransport) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None)
+
+
+async def virtual_user(transport, recorder, family: int, kid: int, args, task_ids, reward_id) -> None:
+    # Login also sets an auth cookie, so each identity needs its own client
+    async with make_client(transport) as kid_client, make_client(transport) as parent_client:
+        await flow(kid_client, parent_client, recorder, family, kid, args, task_ids, reward_id)
+
+
+async def flow(kid_client, parent_client, recorder, family: int, kid: int, args, task_ids, reward_id) -> None:
+    kid_headers = await login(kid_client, recorder, f"family{family}_kid{kid}", args.password)
+    parent_headers = await login(parent_client, recorder, f"family{family}_parent", args.password)
+    today = date.today()
+    stats_query = f"from_date={(today - timedelta(days=30)).isoformat()}&to_date={today.isoformat()}"
+
+    for iteration in range(args.iterations):
+        task_id = task_ids[(kid + iteration) % len(task_ids)]
+        response = await recorder.call("assign", kid_client.post(f"/api/tasks/assign/{task_id}", headers=kid_headers))
+        if response.status_code == 200:
+            assignment_id = response.json()["id"]
+            response = await recorder.call("complete", kid_client.patch(
+                f"/api/tasks/complete/{assignment_id}", headers=kid_headers
+            ))
+            if response.status_code == 200:
+                await recorder.call("approve", parent_client.patch(
+                    f"/api/tasks/approve/{assignment_id}", headers=parent_headers
+                ))
+        await recorder.call("list_assignments", kid_client.get(
+            f"/api/tasks/assignments?limit={args.page_size}", headers=kid_headers
+        ))
+        await recorder.call("stats", parent_client.get(f"/api/tasks/stats/daily?{stats_query}", headers=parent_headers))
+        await recorder.call("redeem", kid_client.post(f"/api/rewards/redeem/{reward_id}", headers=kid_headers))
+
+
+async def run(args) -> dict:
+    recorder = Recorder()
+    transport = httpx.ASGITransport(app=app)
+    async with make_client(transport) as client:
+        # Catalog lookups are setup, not part of the measured flow
+        response = await client.post("/api/user/login", data={"username": "family0_parent", "password": args.password})
+        if response.status_code != 200:
+            raise SystemExit("No generated data found; run with --generate or scripts/generate_load_data.py")
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        tasks = (await client.get("/api/tasks/", headers=headers)).json()
+        rewards = (await client.get("/api/rewards/", headers=headers)).json()
+    task_ids = [task["id"] for task in tasks if task["task_type"] == "individual"]
+    reward_id = min(rewards, key=lambda reward: reward["cost"])["id"]
+
+    users = [(family, kid) for family in range(args.families) for kid in range(args.children)]
+    users = users[:args.concurrency]
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        virtual_user(transport, recorder, family, kid, args, task_ids, reward_id) for family, kid in users
+    ))
+    elapsed = time.perf_counter() - started
+
+    # Close pooled async connections inside the loop that opened them
+    await database.async_engine.dispose()
+    result = recorder.summary(elapsed)
+    result["meta"] = {
+        "database": settings.async_database_url.split("://", 1)[0],
+        "virtual_users": len(users),
+        "iterations": args.iterations,
+        "families": args.families,
+        "children": args.children,
+        "years": args.years,
+        "python": platform.python_version(),
+        "timestamp": datetime.utcnow().isoformat(timespec="seconds"),
+    }
+    return result
+
+
+def compare(result: dict, baseline: dict, max_regression: float) -> bool:
+    """Print the change against ``baseline``; False if any p95/throughput regressed too far."""
+    ok = True
+    print(f"\n{'operation':<18}{'p95 base':>10}{'p95 now':>10}{'change':>9}")
+    for operation, current in result["operations"].items():
+        previous = baseline.get("operations", {}).get(operation)
+        if not previous or not previous["p95_ms"]:
+            continue
+        change = (current["p95_ms"] - previous["p95_ms"]) / previous["p95_ms"] * 100
+        flag = ""
+        if change > max_regression:
+            ok, flag = False, "  REGRESSION"
+        print(f"{operation:<18}{previous['p95_ms']:>10}{current['p95_ms']:>10}{change:>+8.1f}%{flag}")
+    if baseline.get("throughput_rps"):
+        change = (result["throughput_rps"] - baseline["throughput_rps"]) / baseline["throughput_rps"] * 100
+        flag = ""
+        if -change > max_regression:
+            ok, flag = False, "  REGRESSION"
+        print(f"{'throughput':<18}{baseline['throughput_rps']:>10}{result['throughput_rps']:>10}{change:>+8.1f}%{flag}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--generate", action="store_true", help="Reset the database and load a fresh data set")
+    parser.add_argument("--families", type=int, default=5)
+    parser.add_argument("--children", type=int, default=3, help="Children per family")
+    parser.add_argument("--years", type=float, default=1.0, help="Years of generated history")
+    parser.add_argument("--password", default="bench")
+    parser.add_argument("--concurrency", type=int, default=10, help="Virtual users running at once")
+    parser.add_argument("--iterations", type=int, default=20, help="Flow repetitions per virtual user")
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--baseline", help="Compare against a previous --output file")
+    parser.add_argument("--max-regression", type=float, default=25.0,
+                        help="Fail when a p95 grows or throughput drops by more than this percent")
+    args = parser.parse_args()
+
+    if args.generate:
+        generate(args.families, args.children, args.years, reset=True, password=args.password)
+    result = asyncio.run(run(args))
+
+    print(f"{'operation':<18}{'requests':>9}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}  statuses")
+    for operation, stats in result["operations"].items():
+        print(f"{operation:<18}{stats['requests']:>9}{stats['throughput_rps']:>9}{stats['p50_ms']:>9}"
+              f"{stats['p95_ms']:>9}{stats['p99_ms']:>9}  {stats['statuses']}")
+    print(f"total: {result['requests']} requests in {result['elapsed_s']}s ({result['throughput_rps']} req/s)")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if not compare(result, baseline, args.max_regression):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
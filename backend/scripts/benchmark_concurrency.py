@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Measure concurrent-request throughput of the API in-process.
+
+Seeds a throwaway database, then fires batches of concurrent requests at a
+few read endpoints through the ASGI app and reports requests/second and
+latency percentiles. Run it before and after a change with the same
+arguments to compare, e.g.:
+
+    DATABASE_URL=sqlite:///./bench.db DEBUG=false python scripts/benchmark_concurrency.py
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(CURRENT_DIR)
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+import httpx
+from sqlmodel import Session, SQLModel
+from app.main import app
+from app.core import database
+from app.core.database import engine
+from app.core.security import get_password_hash
+from app.models.user import User, UserRole
+from app.models.task import Task, TaskAssignment, TaskStatus
+
+try:
+    from app.core.rollup import rebuild_rollup
+except ImportError:
+    # The baseline computes the daily stats from the assignments themselves
+    rebuild_rollup = None
+
+ENDPOINTS = [
+    "/health",
+    "/api/tasks/",
+    "/api/tasks/assignments/all",
+    "/api/tasks/stats/daily",
+]
+
+
+def seed(children: int, days: int) -> None:
+    # Only what both the baseline and the current tree have, so the same
+    # script can benchmark either; the schema comes from the models
+    SQLModel.metadata.drop_all(engine)
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(User(username="bench_admin", password_hash=get_password_hash("bench"), role=UserRole.ADMIN))
+        kids = [User(username=f"bench_kid_{i}", password_hash="x") for i in range(children)]
+        tasks = [Task(name=f"Task {i}", credits=5 + i) for i in range(8)]
+        session.add_all(kids + tasks)
+        session.commit()
+        today = date.today()
+        statuses = list(TaskStatus)
+        assignments = [
+            TaskAssignment(
+                task_id=task.id,
+                user_id=kid.id,
+                scheduled_date=today - timedelta(days=day),
+                status=statuses[(day + task.id + kid.id) % len(statuses)],
+            )
+            for day in range(days) for kid in kids for task in tasks
+        ]
+        session.add_all(assignments)
+        session.commit()
+
+
+async def run(path: str, concurrency: int, rounds: int, headers: dict) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers) as client:
+        latencies = []
+
+        async def one():
+            started = time.perf_counter()
+            response = await client.get(path)
+            latencies.append(time.perf_counter() - started)
+            response.raise_for_status()
+
+        started = time.perf_counter()
+        for _ in range(rounds):
+            await asyncio.gather(*(one() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "path": path,
+        "requests": len(latencies),
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 2),
+    }
+
+
+async def main_async(args) -> list:
+    # The seed inserts assignments directly, bypassing the rollup upkeep
+    if rebuild_rollup is not None:
+        async with database.async_session_maker() as session:
+            await rebuild_rollup(session)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        response = await client.post("/api/user/login", data={"username": "bench_admin", "password": "bench"})
+        response.raise_for_status()
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    # The daily stats endpoint gets a wide range so it is the slow report
+    today = date.today()
+    paths = [
+        p if p != "/api/tasks/stats/daily"
+        else f"{p}?from_date={(today - timedelta(days=args.days)).isoformat()}&to_date={today.isoformat()}"
+        for p in ENDPOINTS
+    ]
+    results = [await run(path, args.concurrency, args.rounds, headers) for path in paths]
+
+    # Close pooled async connections inside the loop that opened them
+    # (the attribute is absent when benchmarking the synchronous baseline)
+    if hasattr(database, "async_engine"):
+        await database.async_engine.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--children", type=int, default=4)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    seed(args.children, args.days)
+    results = asyncio.run(main_async(args))
+    for result in results:
+        print(f"{result['path'][:60]:<60} {result['throughput_rps']:>8} req/s  "
+              f"p50 {result['p50_ms']:>8} ms  p95 {result['p95_ms']:>8} ms")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
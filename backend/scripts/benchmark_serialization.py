@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of assignment list serialization, per row.
+
+Compares the previous path of the listing endpoints (``assignment.dict()``
+plus ``task.dict()`` into a ``TaskAssignmentResponse``, then FastAPI
+validating the list again against ``response_model``, ``jsonable_encoder``
+and ``json.dumps``) with the current one (one validation through a cached
+TypeAdapter, JSON straight from pydantic-core). Both must produce the same
+bytes; no database is needed:
+
+    python scripts/benchmark_serialization.py --rows 500 --rounds 50
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta
+from typing import List
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(CURRENT_DIR)
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+import warnings
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from app.api.tasks import _assignment_rows
+from app.core.serialization import json_response
+from app.models.user import User
+from app.models.task import Task, TaskAssignment, TaskStatus, TaskType
+from app.schemas.task import TaskAssignmentResponse
+
+# SQLModel 0.0.14 warns on every .dict() call of the previous path
+warnings.filterwarnings("ignore", category=DeprecationWarning)
+
+
+def build_rows(count: int, task_count: int):
+    now = datetime.utcnow()
+    tasks = {
+        task_id: Task(
+            id=task_id, name=f"Tarea {task_id}", description="Recoger la habitación", credits=5 + task_id,
+            task_type=TaskType.COLLECTIVE if task_id % 3 == 0 else TaskType.INDIVIDUAL, created_at=now
+        )
+        for task_id in range(1, task_count + 1)
+    }
+    users = [User(id=user_id, username=f"kid{user_id}", password_hash="x") for user_id in range(1, 6)]
+    statuses = list(TaskStatus)
+    assignments = []
+    for index in range(count):
+        assignment = TaskAssignment(
+            id=index + 1, task_id=index % task_count + 1, user_id=users[index % len(users)].id,
+            status=statuses[index % len(statuses)], scheduled_date=date.today() - timedelta(days=index // 10),
+            completed_at=now, approved_at=now if index % 2 else None, approved_by=1 if index % 2 else None,
+            created_at=now,
+        )
+        assignment.user = users[index % len(users)]
+        assignments.append(assignment)
+    return assignments, tasks
+
+
+def previous_path(assignments, tasks, field) -> bytes:
+    responses = []
+    for assignment in assignments:
+        assignment_dict = assignment.dict()
+        assignment_dict["task"] = tasks[assignment.task_id].dict()
+        assignment_dict["user"] = {"id": assignment.user.id, "username": assignment.user.username}
+        responses.append(TaskAssignmentResponse(**assignment_dict))
+    content = asyncio.run(serialize_response(field=field, response_content=responses, is_coroutine=True))
+    return JSONResponse(content).body
+
+
+def current_path(assignments, tasks) -> bytes:
+    return json_response(List[TaskAssignmentResponse], _assignment_rows(assignments, tasks, include_user=True)).body
+
+
+def measure(function, rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        function()
+    return (time.perf_counter() - started) / rounds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500, help="Assignments per listing")
+    parser.add_argument("--tasks", type=int, default=10, help="Distinct tasks in the catalog")
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    assignments, tasks = build_rows(args.rows, args.tasks)
+    field = create_response_field(name="response", type_=List[TaskAssignmentResponse])
+    if previous_path(assignments, tasks, field) != current_path(assignments, tasks):
+        raise SystemExit("Serialized output differs between the two paths")
+
+    # Warm-up builds the cached TypeAdapter
+    current_path(assignments, tasks)
+    previous = measure(lambda: previous_path(assignments, tasks, field), args.rounds)
+    current = measure(lambda: current_path(assignments, tasks), args.rounds)
+    print(f"{'path':<10}{'ms/listing':>12}{'us/row':>10}")
+    print(f"{'previous':<10}{previous * 1000:>12.2f}{previous / args.rows * 1e6:>10.2f}")
+    print(f"{'current':<10}{current * 1000:>12.2f}{current / args.rows * 1e6:>10.2f}")
+    print(f"speedup: {previous / current:.1f}x for {args.rows} rows, identical output")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Bulk-load a realistic data set for load tests and benchmarks.
+
+Creates N families (one admin parent plus M children each), a shared task
+and reward catalog, and years of daily task assignment history with the
+matching approvals, redemptions, credit ledger rows, balances, rollup and
+snapshots. History rows are written with multi-row INSERTs in batches, so
+millions of rows load in minutes instead of hours. The output is
+deterministic for a given --seed.
+
+The schema has no family entity: a family is simply a parent account and
+its children, named familyN_parent / familyN_kidM. Every account shares
+the same password (--password, default "bench").
+
+    DATABASE_URL=sqlite:///./bench.db python scripts/generate_load_data.py --families 50 --children 3 --years 2 --reset
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(CURRENT_DIR)
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from sqlalchemy import func, text, update
+from sqlmodel import Session, select
+from app.core import database, versions
+from app.core.database import engine, async_session_maker, reset_database, upgrade_database
+from app.core.ledger import take_snapshots
+from app.core.rollup import rebuild_rollup
+from app.core.security import get_password_hash
+from app.models.user import User, UserRole
+from app.models.task import Task, TaskAssignment, TaskStatus, TaskType
+from app.models.reward import Reward, RewardRedemption
+from app.models.credit import CreditLedger, CreditReason
+
+TASK_CATALOG = [
+    ("Hacer la cama", 5, TaskType.INDIVIDUAL),
+    ("Recoger la habitación", 10, TaskType.INDIVIDUAL),
+    ("Hacer los deberes", 15, TaskType.INDIVIDUAL),
+    ("Lavarse los dientes", 2, TaskType.INDIVIDUAL),
+    ("Preparar la mochila", 3, TaskType.INDIVIDUAL),
+    ("Leer 20 minutos", 8, TaskType.INDIVIDUAL),
+    ("Poner la mesa", 5, TaskType.COLLECTIVE),
+    ("Sacar la basura", 8, TaskType.COLLECTIVE),
+    ("Pasear al perro", 10, TaskType.COLLECTIVE),
+    ("Vaciar el lavavajillas", 6, TaskType.COLLECTIVE),
+]
+
+REWARD_CATALOG = [
+    ("30 minutos de tablet", 20),
+    ("Elegir la cena", 40),
+    ("Ir al cine", 120),
+    ("Acostarse más tarde", 30),
+    ("Juguete pequeño", 200),
+]
+
+
+class BatchWriter:
+    """Accumulates rows per table and flushes them as multi-row INSERTs."""
+
+    def __init__(self, connection, batch_size: int):
+        self.connection = connection
+        self.batch_size = batch_size
+        self.pending = {}
+        self.written = {}
+
+    def add(self, model, row: dict) -> None:
+        rows = self.pending.setdefault(model, [])
+        rows.append(row)
+        if len(rows) >= self.batch_size:
+            self.flush(model)
+
+    def flush(self, model=None) -> None:
+        for table_model in ([model] if model else [TaskAssignment, RewardRedemption, CreditLedger]):
+            if table_model is CreditLedger:
+                # Ledger rows point at assignments and redemptions: write those first
+                self._write(TaskAssignment)
+                self._write(RewardRedemption)
+            self._write(table_model)
+
+    def _write(self, model) -> None:
+        rows = self.pending.get(model)
+        if rows:
+            self.connection.execute(model.__table__.insert(), rows)
+            self.written[model.__name__] = self.written.get(model.__name__, 0) + len(rows)
+            self.pending[model] = []
+
+
+def _next_id(session: Session, model) -> int:
+    return session.exec(select(func.coalesce(func.max(model.id), 0))).one() + 1
+
+
+def _status_for(rng: random.Random, day: date, today: date, task_type: TaskType) -> TaskStatus:
+    age = (today - day).days
+    if task_type == TaskType.COLLECTIVE or age > 2:
+        # Old history is settled; open collective rows would clash across families
+        # (uq_taskassignment_open_collective allows one per task and day)
+        return TaskStatus.REJECTED if rng.random() < 0.08 else TaskStatus.APPROVED
+    return rng.choice([TaskStatus.PENDING, TaskStatus.COMPLETED, TaskStatus.APPROVED])
+
+
+def generate(families: int, children: int, years: float, tasks_per_day: int = 3,
+             batch_size: int = 5000, seed: int = 42, password: str = "bench",
+             reset: bool = False, verbose: bool = True) -> dict:
+    """Load the data set and return a summary of what was written."""
+    rng = random.Random(seed)
+    if reset:
+        reset_database()
+    else:
+        upgrade_database()
+    started = time.perf_counter()
+
+    password_hash = get_password_hash(password)
+    with Session(engine) as session:
+        if session.exec(select(User.id).where(User.username == "family0_parent")).first():
+            raise SystemExit("Generated users already exist; run with --reset or use another database")
+
+        tasks = [Task(name=name, credits=credits, task_type=task_type) for name, credits, task_type in TASK_CATALOG]
+        rewards = [Reward(name=name, description=name, cost=cost) for name, cost in REWARD_CATALOG]
+        session.add_all(tasks + rewards)
+        parents, kids_by_family = [], []
+        for family in range(families):
+            parents.append(User(username=f"family{family}_parent", password_hash=password_hash, role=UserRole.ADMIN))
+            kids_by_family.append([
+                User(username=f"family{family}_kid{kid}", password_hash=password_hash)
+                for kid in range(children)
+            ])
+        session.add_all(parents + [kid for kids in kids_by_family for kid in kids])
+        versions.bump_version_sync(session.connection(), versions.TASK_CATALOG)
+        versions.bump_version_sync(session.connection(), versions.REWARD_CATALOG)
+        session.commit()
+        task_rows = [(task.id, task.credits, task.task_type) for task in tasks]
+        reward_rows = [(reward.id, reward.cost) for reward in rewards]
+        families_ids = [(parent.id, [kid.id for kid in kids]) for parent, kids in zip(parents, kids_by_family)]
+        next_assignment_id = _next_id(session, TaskAssignment)
+        next_redemption_id = _next_id(session, RewardRedemption)
+
+    today = date.today()
+    first_day = today - timedelta(days=int(years * 365))
+    individual = [row for row in task_rows if row[2] == TaskType.INDIVIDUAL]
+    collective = [row for row in task_rows if row[2] == TaskType.COLLECTIVE]
+    balances = {kid: 0 for _, kids in families_ids for kid in kids}
+
+    with engine.begin() as connection:
+        writer = BatchWriter(connection, batch_size)
+        day = first_day
+        while day <= today:
+            noon = datetime.combine(day, datetime.min.time()) + timedelta(hours=12)
+            for parent_id, kids in families_ids:
+                # Each collective chore goes to one child of the family; recent
+                # days are left open only for individual tasks
+                if (today - day).days > 2:
+                    for task_id, credits, task_type in rng.sample(collective, k=min(2, len(collective))):
+                        next_assignment_id = _write_assignment(
+                            writer, rng, (rng.choice(kids), task_id, credits, task_type), parent_id, day, today,
+                            noon, balances, next_assignment_id)
+                for kid in kids:
+                    for task_id, credits, task_type in rng.sample(individual, k=min(tasks_per_day, len(individual))):
+                        next_assignment_id = _write_assignment(
+                            writer, rng, (kid, task_id, credits, task_type), parent_id, day, today, noon,
+                            balances, next_assignment_id)
+                    # Weekly chance to spend credits on an affordable reward
+                    if day.weekday() == 5 and rng.random() < 0.6:
+                        affordable = [reward for reward in reward_rows if reward[1] <= balances[kid]]
+                        if affordable:
+                            reward_id, cost = rng.choice(affordable)
+                            redeemed_at = noon + timedelta(hours=6)
+                            writer.add(RewardRedemption, {
+                                "id": next_redemption_id, "reward_id": reward_id, "user_id": kid,
+                                "redeemed_at": redeemed_at,
+                            })
+                            writer.add(CreditLedger, {
+                                "user_id": kid, "amount": -cost, "reason": CreditReason.REWARD_REDEMPTION,
+                                "assignment_id": None, "redemption_id": next_redemption_id,
+                                "created_by": kid, "created_at": redeemed_at,
+                            })
+                            balances[kid] -= cost
+                            next_redemption_id += 1
+            if verbose and day.day == 1:
+                print(f"  {day.isoformat()}: {writer.written.get('TaskAssignment', 0)} assignments written")
+            day += timedelta(days=1)
+        writer.flush()
+
+        for kid, balance in balances.items():
+            connection.execute(update(User.__table__).where(User.__table__.c.id == kid).values(credits=balance))
+
+        if connection.dialect.name == "postgresql":
+            # Ids were assigned here, so move the sequences past them
+            for table in ("taskassignment", "rewardredemption"):
+                connection.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                    f"(SELECT COALESCE(MAX(id), 1) FROM {table}))"
+                ))
+
+    rollup_rows = asyncio.run(_finish())
+    summary = {
+        "families": families,
+        "children_per_family": children,
+        "days": (today - first_day).days + 1,
+        "rows": writer.written,
+        "rollup_rows": rollup_rows,
+        "seconds": round(time.perf_counter() - started, 1),
+    }
+    if verbose:
+        print(f"Generated {summary}")
+    return summary
+
+
+def _write_assignment(writer, rng, entry, parent_id, day, today, noon, balances, next_id) -> int:
+    kid, task_id, credits, task_type = entry
+    status = _status_for(rng, day, today, task_type)
+    completed_at = noon if status != TaskStatus.PENDING else None
+    settled = status in (TaskStatus.APPROVED, TaskStatus.REJECTED)
+    approved_at = noon + timedelta(hours=3) if settled else None
+    writer.add(TaskAssignment, {
+        "id": next_id, "task_id": task_id, "user_id": kid, "status": status,
+        "scheduled_date": day, "completed_at": completed_at, "approved_at": approved_at,
+        "approved_by": parent_id if settled else None,
+        "created_at": datetime.combine(day, datetime.min.time()) + timedelta(hours=8),
+        "collective": task_type == TaskType.COLLECTIVE,
+    })
+    if status == TaskStatus.APPROVED:
+        writer.add(CreditLedger, {
+            "user_id": kid, "amount": credits, "reason": CreditReason.TASK_APPROVAL,
+            "assignment_id": next_id, "redemption_id": None,
+            "created_by": parent_id, "created_at": approved_at,
+        })
+        balances[kid] += credits
+    return next_id + 1
+
+
+async def _finish() -> int:
+    async with async_session_maker() as session:
+        written = await rebuild_rollup(session)
+        await take_snapshots(session)
+    # Close pooled connections inside the loop that opened them
+    await database.async_engine.dispose()
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--families", type=int, default=10)
+    parser.add_argument("--children", type=int, default=3, help="Children per family")
+    parser.add_argument("--years", type=float, default=1.0, help="Years of history ending today")
+    parser.add_argument("--tasks-per-day", type=int, default=3, help="Individual tasks per child and day")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Rows per INSERT batch")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--password", default="bench")
+    parser.add_argument("--reset", action="store_true", help="Drop and recreate every table first")
+    args = parser.parse_args()
+
+    generate(args.families, args.children, args.years, args.tasks_per_day,
+             args.batch_size, args.seed, args.password, args.reset)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Rebuild the daily_assignment_rollup table from the task assignment history.
+"""
+import argparse
+import asyncio
+import os
+import sys
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(CURRENT_DIR)
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from app.core.database import async_session_maker, upgrade_database
+from app.core.rollup import rebuild_rollup
+
+
+async def rebuild(batch_days: int) -> int:
+    async with async_session_maker() as session:
+        return await rebuild_rollup(session, batch_days=batch_days, verbose=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-days", type=int, default=31,
+                        help="Days of history aggregated per transaction (default: 31)")
+    args = parser.parse_args()
+
+    upgrade_database()
+    written = asyncio.run(rebuild(args.batch_days))
+    print(f"Rollup rebuilt: {written} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -16,6 +16,7 @@ from app.models.user import User, UserRole
 from app.models.task import Task, TaskType
 from app.models.reward import Reward
 from app.core.security import get_password_hash
+from app.core.versions import REWARD_CATALOG, TASK_CATALOG, bump_version_sync
 
 
 def seed_database():
@@ -100,6 +101,7 @@ def seed_database():
         ]
         
         session.add_all(tasks)
+        bump_version_sync(session.connection(), TASK_CATALOG)
         session.commit()
         
         # Create sample rewards
@@ -147,6 +149,7 @@ def seed_database():
         ]
         
         session.add_all(rewards)
+        bump_version_sync(session.connection(), REWARD_CATALOG)
         session.commit()
         
         print("✅ Database seeded successfully!")
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+Write periodic credit balance snapshots (run from cron, e.g. nightly).
+"""
+import argparse
+import asyncio
+import os
+import sys
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(CURRENT_DIR)
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from app.core.database import async_session_maker, upgrade_database
+from app.core.ledger import take_snapshots
+
+
+async def snapshot() -> None:
+    async with async_session_maker() as session:
+        print(f"Snapshots written: {await take_snapshots(session)}")
+
+
+def main():
+    argparse.ArgumentParser(description=__doc__).parse_args()
+
+    # Also records opening balances (migration 0005) on databases that predate the ledger
+    upgrade_database()
+    asyncio.run(snapshot())
+
+
+if __name__ == "__main__":
+    main()
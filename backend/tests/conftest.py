@@ -0,0 +1,144 @@
+import os
+import sys
+import tempfile
+from datetime import date, datetime, timedelta
+from urllib.parse import urlsplit
+import pytest
+from starlette.routing import Match
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(CURRENT_DIR)
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+# Settings are read when app.core.config is imported: point the app at a
+# throwaway SQLite database and make budget violations fail the request
+_DB_DIR = tempfile.mkdtemp(prefix="family_tasks_tests_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_DB_DIR, 'test.db')}"
+os.environ["QUERY_BUDGET_MODE"] = "raise"
+os.environ["DEBUG"] = "false"
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+from app.main import app
+from app.core import database
+from app.core.archive import archive_cutoff
+from app.core.metrics import metrics
+from app.core.security import get_password_hash
+from app.models.task import Task, TaskAssignment, TaskAssignmentArchive, TaskStatus, TaskType
+from app.models.reward import Reward, RewardRedemption
+from app.models.user import User, UserRole
+
+PASSWORD = "secret"
+# Enough rows per listing that a per-row query would run more than
+# QUERY_REPEAT_THRESHOLD times and break the endpoint's budget
+KIDS = 3
+TASKS = 12
+REWARDS = 12
+# Archived rows keep the id they had in taskassignment
+ARCHIVED_ID_START = 100000
+
+
+def _seed() -> None:
+    today = date.today()
+    old_day = archive_cutoff() - timedelta(days=30)
+    with Session(database.engine) as session:
+        admin = User(username="admin", password_hash=get_password_hash(PASSWORD), role=UserRole.ADMIN)
+        kids = [
+            User(username=f"kid{n}", password_hash=get_password_hash(PASSWORD), credits=1000)
+            for n in range(1, KIDS + 1)
+        ]
+        tasks = [
+            Task(name=f"task {n}", credits=n, task_type=TaskType.COLLECTIVE if n % 4 == 0 else TaskType.INDIVIDUAL)
+            for n in range(1, TASKS + 1)
+        ]
+        rewards = [Reward(name=f"reward {n}", description="", cost=n) for n in range(1, REWARDS + 1)]
+        session.add_all([admin, *kids, *tasks, *rewards])
+        session.commit()
+
+        now = datetime.utcnow()
+        archived = 0
+        for kid_index, kid in enumerate(kids):
+            for task in tasks:
+                if task.task_type == TaskType.COLLECTIVE and kid_index:
+                    continue
+                collective = task.task_type == TaskType.COLLECTIVE
+                # Settled history, hot and archived, for the date-range listings
+                session.add(TaskAssignment(
+                    task_id=task.id, user_id=kid.id, scheduled_date=today - timedelta(days=1),
+                    status=TaskStatus.APPROVED, approved_at=now, approved_by=admin.id, collective=collective
+                ))
+                archived += 1
+                session.add(TaskAssignmentArchive(
+                    id=ARCHIVED_ID_START + archived, task_id=task.id, user_id=kid.id, scheduled_date=old_day,
+                    created_at=now, status=TaskStatus.APPROVED, approved_at=now, approved_by=admin.id, collective=collective
+                ))
+                # Waiting for review, for the pending approvals listing
+                session.add(TaskAssignment(
+                    task_id=task.id, user_id=kid.id, scheduled_date=today,
+                    status=TaskStatus.COMPLETED, completed_at=now, collective=collective
+                ))
+        session.add_all([RewardRedemption(reward_id=reward.id, user_id=kids[0].id) for reward in rewards])
+        session.commit()
+
+
+@pytest.fixture(scope="session")
+def client():
+    # Starting the app migrates the empty database to head
+    with TestClient(app) as test_client:
+        _seed()
+        yield test_client
+
+
+def _login(client: TestClient, username: str) -> dict:
+    response = client.post("/api/user/login", data={"username": username, "password": PASSWORD})
+    assert response.status_code == 200, response.text
+    # Tests authenticate with the header; the cookie would leak across users
+    client.cookies.clear()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture(scope="session")
+def admin_headers(client) -> dict:
+    return _login(client, "admin")
+
+
+@pytest.fixture(scope="session")
+def kid_headers(client) -> dict:
+    return _login(client, "kid1")
+
+
+def _resolve_endpoint(method: str, url: str):
+    """(path template, endpoint function) the app routes ``method url`` to."""
+    scope = {"type": "http", "method": method, "path": urlsplit(url).path}
+    for route in app.router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path, route.endpoint
+    raise LookupError(f"No route for {method} {url}")
+
+
+@pytest.fixture
+def within_query_budget(client):
+    """Make a request and assert it ran no more SQL than its ``@query_budget``.
+
+    Reads the statement count MetricsMiddleware records for the route, so
+    the check holds whatever QUERY_BUDGET_MODE is; in ``raise`` mode the
+    app itself already fails the request as soon as it goes over.
+    """
+    def request(method: str, url: str, **kwargs):
+        template, endpoint = _resolve_endpoint(method, url)
+        budget = getattr(endpoint, "__query_budget__", None)
+        assert budget is not None, f"{method} {template} declares no query budget"
+
+        histogram = metrics.queries_per_request.get(template)
+        before = (histogram.count, histogram.sum) if histogram else (0, 0)
+        response = client.request(method, url, **kwargs)
+        assert response.status_code < 400, response.text
+
+        histogram = metrics.queries_per_request[template]
+        assert histogram.count == before[0] + 1
+        queries = histogram.sum - before[1]
+        assert queries <= budget, f"{method} {template} ran {queries:g} statements, budget {budget}"
+        return response
+    return request
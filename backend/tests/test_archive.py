@@ -0,0 +1,31 @@
+from datetime import date, datetime, timedelta
+from sqlmodel import Session, select
+from app.core import database
+from app.core.archive import archive_assignments, archive_cutoff
+from app.models.task import TaskAssignment, TaskAssignmentArchive, TaskStatus
+from app.models.user import User
+
+
+def test_archived_ids_are_not_reused(client, kid_headers):
+    with Session(database.engine) as session:
+        kid = session.exec(select(User).where(User.username == "kid1")).one()
+        # The newest row, settled long ago: archiving frees the highest id
+        old = TaskAssignment(
+            task_id=1, user_id=kid.id, scheduled_date=archive_cutoff() - timedelta(days=400),
+            status=TaskStatus.APPROVED, approved_at=datetime.utcnow()
+        )
+        session.add(old)
+        session.commit()
+        archived_id = old.id
+
+    async def archive():
+        async with database.async_session_maker() as session:
+            return await archive_assignments(session, archive_cutoff())
+    assert client.portal.call(archive) >= 1
+    with Session(database.engine) as session:
+        assert session.exec(select(TaskAssignmentArchive).where(TaskAssignmentArchive.id == archived_id)).one()
+
+    request = {"task_ids": [2], "from_date": str(date.today() + timedelta(days=30))}
+    body = client.post("/api/tasks/assign", json=request, headers=kid_headers).json()
+    assert body["assigned"] == 1, body
+    assert body["results"][0]["assignment"]["id"] > archived_id
@@ -0,0 +1,84 @@
+from datetime import date, datetime, timedelta
+import pytest
+from sqlmodel import Session, select
+from app.core import database
+from app.core.config import settings
+from app.models.task import Task, TaskAssignment, TaskStatus
+from app.models.user import User
+
+
+def _unseen_completed_assignment(client, kid_headers, credits: int) -> TaskAssignment:
+    """A completed assignment of a task this worker's catalog copy has not loaded.
+
+    The task is inserted while the worker trusts its cached ETag, as when
+    another worker created it within the version cache window.
+    """
+    assert client.get("/api/tasks/", headers=kid_headers).status_code == 200
+    with Session(database.engine) as session:
+        kid = session.exec(select(User).where(User.username == "kid2")).one()
+        task = Task(name=f"new task {credits}", credits=credits)
+        session.add(task)
+        session.commit()
+        assignment = TaskAssignment(
+            task_id=task.id, user_id=kid.id, scheduled_date=date.today(),
+            status=TaskStatus.COMPLETED, completed_at=datetime.utcnow()
+        )
+        session.add(assignment)
+        session.commit()
+        session.refresh(assignment)
+        return assignment
+
+
+def _credits(user_id: int) -> int:
+    with Session(database.engine) as session:
+        return session.get(User, user_id).credits
+
+
+@pytest.fixture
+def trusted_etags(monkeypatch):
+    monkeypatch.setattr(settings, "resource_version_cache_seconds", 3600)
+
+
+@pytest.fixture
+def untrusted_etags(monkeypatch):
+    monkeypatch.setattr(settings, "resource_version_cache_seconds", 0)
+
+
+@pytest.mark.usefixtures("trusted_etags")
+def test_approve_awards_credits_of_task_missing_from_catalog(client, admin_headers, kid_headers):
+    assignment = _unseen_completed_assignment(client, kid_headers, credits=7)
+    before = _credits(assignment.user_id)
+
+    response = client.patch(f"/api/tasks/approve/{assignment.id}", headers=admin_headers)
+    assert response.status_code == 200, response.text
+    assert _credits(assignment.user_id) == before + 7
+
+
+@pytest.mark.usefixtures("trusted_etags")
+def test_bulk_approve_awards_credits_of_task_missing_from_catalog(client, admin_headers, kid_headers):
+    assignment = _unseen_completed_assignment(client, kid_headers, credits=9)
+
+    response = client.patch(
+        "/api/tasks/assignments/approve", json={"assignment_ids": [assignment.id]}, headers=admin_headers
+    )
+    assert response.status_code == 200, response.text
+    assert response.json()["credits_by_user"] == {str(assignment.user_id): 9}
+
+
+@pytest.mark.usefixtures("untrusted_etags")
+def test_tasks_written_without_version_bump_are_listed(client, kid_headers):
+    before = client.get("/api/tasks/", headers=kid_headers)
+    # As seed_data.py did: a plain insert, resource_version untouched
+    with Session(database.engine) as session:
+        task = Task(name="inserted by hand", credits=3)
+        session.add(task)
+        session.commit()
+        task_id = task.id
+
+    after = client.get("/api/tasks/", headers=kid_headers)
+    assert after.headers["ETag"] != before.headers["ETag"]
+    assert task_id in [row["id"] for row in after.json()]
+
+    request = {"task_ids": [task_id], "from_date": str(date.today() + timedelta(days=20))}
+    body = client.post("/api/tasks/assign", json=request, headers=kid_headers).json()
+    assert body["assigned"] == 1, body
@@ -0,0 +1,78 @@
+from datetime import timedelta
+import time
+import pytest
+from sqlmodel import Session, select
+from app.api.events import _stream
+from app.core import database
+from app.core.auth_cache import forget_epoch
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.security import create_access_token
+from app.models.user import User, UserRole
+from app.schemas.auth import AuthenticatedUser
+
+
+@pytest.fixture(autouse=True)
+def fast_heartbeat(monkeypatch):
+    monkeypatch.setattr(settings, "events_heartbeat_seconds", 0.05)
+
+
+def _user(username: str) -> User:
+    with Session(database.engine) as session:
+        return session.exec(select(User).where(User.username == username)).one()
+
+
+def _identity(user: User, expires_in: float = 60) -> AuthenticatedUser:
+    return AuthenticatedUser(
+        id=user.id, username=user.username, role=user.role,
+        auth_epoch=user.auth_epoch, expires_at=int(time.time() + expires_in)
+    )
+
+
+def _read(client, identity: AuthenticatedUser) -> list:
+    """Every frame of a stream, which must end on its own."""
+    async def read():
+        return [frame async for frame in _stream(identity)]
+    return client.portal.call(read)
+
+
+def test_stream_closes_when_token_expires(client):
+    started = time.monotonic()
+    frames = _read(client, _identity(_user("kid1"), expires_in=1))
+    assert frames[0].startswith("retry:")
+    assert ": keepalive\n\n" in frames
+    assert time.monotonic() - started < 3
+
+
+def test_stream_closes_when_token_is_revoked(client):
+    user = _user("kid2")
+    identity = _identity(user)
+    with Session(database.engine) as session:
+        session.get(User, user.id).auth_epoch += 1
+        session.commit()
+    forget_epoch(user.id)
+
+    assert _read(client, identity) == ["retry: 3000\n: connected\n\n"]
+
+
+def test_stream_closes_when_user_is_deactivated(client, admin_headers):
+    user = _user("kid3")
+    identity = _identity(user)
+    response = client.patch(f"/api/users/{user.id}", json={"is_active": False}, headers=admin_headers)
+    assert response.status_code == 200, response.text
+
+    assert _read(client, identity) == ["retry: 3000\n: connected\n\n"]
+
+
+def test_stream_is_left_out_of_request_metrics(client):
+    user = _user("kid1")
+    token = create_access_token(
+        data={"sub": user.username, "uid": user.id, "role": UserRole(user.role).value, "epoch": user.auth_epoch},
+        expires_delta=timedelta(seconds=2)
+    )
+    response = client.get("/api/events", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+    assert response.text.startswith("retry: 3000\n: connected\n\n")
+
+    assert "/api/events" not in metrics.queries_per_request
+    assert not [key for key in metrics.in_progress if key[1] == "/api/events"]
@@ -0,0 +1,32 @@
+import pytest
+from app.core.config import settings
+from app.core.metrics import _resolve_route, match_route
+from app.main import app
+
+MONITORING = ["/metrics", "/health/db-pool"]
+
+
+@pytest.mark.parametrize("url", MONITORING)
+def test_monitoring_is_for_administrators(client, admin_headers, kid_headers, url):
+    assert client.get(url).status_code == 401
+    assert client.get(url, headers=kid_headers).status_code == 403
+    assert client.get(url, headers=admin_headers).status_code == 200
+
+
+@pytest.mark.parametrize("url", MONITORING)
+def test_monitoring_accepts_the_metrics_token(client, monkeypatch, url):
+    monkeypatch.setattr(settings, "metrics_token", "scraper-token")
+    assert client.get(url, headers={"Authorization": "Bearer scraper-token"}).status_code == 200
+    assert client.get(url, headers={"Authorization": "Bearer other-token"}).status_code == 401
+
+
+def test_route_is_resolved_once_per_url(client, kid_headers):
+    scope = {"type": "http", "method": "GET", "path": "/api/tasks/1"}
+    assert match_route(app, scope) == "/api/tasks/{task_id}"
+    assert match_route(app, {**scope, "path": "/nowhere"}) == "<unmatched>"
+
+    # The metrics and the access log middlewares share the cached lookup
+    client.get("/api/tasks/1", headers=kid_headers)
+    hits = _resolve_route.cache_info().hits
+    client.get("/api/tasks/1", headers=kid_headers)
+    assert _resolve_route.cache_info().hits == hits + 2
@@ -0,0 +1,91 @@
+from datetime import date, timedelta
+import pytest
+from app.core.metrics import match_route
+from app.core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.main import app
+
+TODAY = date.today()
+# Far enough back that the listings read the archive as well
+HISTORY = f"from_date={TODAY - timedelta(days=365)}&to_date={TODAY}"
+
+# (method, url, role) for every budgeted listing
+LISTINGS = [
+    ("GET", "/api/tasks/", "kid"),
+    ("GET", "/api/tasks/assignments", "kid"),
+    ("GET", f"/api/tasks/assignments?{HISTORY}", "kid"),
+    ("GET", "/api/tasks/assignments/all", "admin"),
+    ("GET", f"/api/tasks/assignments/all?{HISTORY}", "admin"),
+    ("GET", "/api/tasks/pending-approvals", "admin"),
+    ("GET", f"/api/tasks/stats/daily?{HISTORY}", "admin"),
+    ("GET", f"/api/tasks/stats/daily?{HISTORY}&group_by=user", "admin"),
+    ("GET", f"/api/tasks/stats/daily?{HISTORY}&group_by=task", "admin"),
+    ("GET", "/api/rewards/", "kid"),
+    ("GET", "/api/rewards/admin/all", "admin"),
+    ("GET", "/api/rewards/redemptions", "kid"),
+]
+
+
+@pytest.fixture
+def headers_for(admin_headers, kid_headers):
+    return {"admin": admin_headers, "kid": kid_headers}.__getitem__
+
+
+@pytest.mark.parametrize("method,url,role", LISTINGS)
+def test_listing_within_budget(within_query_budget, headers_for, method, url, role):
+    response = within_query_budget(method, url, headers=headers_for(role))
+    assert response.json()
+
+
+def test_paging_does_not_add_queries(within_query_budget, admin_headers):
+    url = "/api/tasks/assignments/all?limit=5"
+    first = within_query_budget("GET", url, headers=admin_headers)
+    cursor = first.headers["X-Next-Cursor"]
+    second = within_query_budget("GET", f"{url}&cursor={cursor}", headers=admin_headers)
+    assert {row["id"] for row in first.json()}.isdisjoint(row["id"] for row in second.json())
+
+
+def test_bulk_assign_within_budget(within_query_budget, kid_headers):
+    task_ids = [task["id"] for task in within_query_budget("GET", "/api/tasks/", headers=kid_headers).json()]
+    request = {
+        "task_ids": task_ids,
+        "from_date": str(TODAY + timedelta(days=1)),
+        "to_date": str(TODAY + timedelta(days=3)),
+    }
+    body = within_query_budget("POST", "/api/tasks/assign", json=request, headers=kid_headers).json()
+    assert body["assigned"] == len(task_ids) * 3
+
+    # Every day is taken now: all items fail, still within the budget
+    body = within_query_budget("POST", "/api/tasks/assign", json=request, headers=kid_headers).json()
+    assert body["assigned"] == 0
+
+
+def test_every_budgeted_endpoint_is_tested():
+    budgeted = {
+        (method, route.path)
+        for route in app.router.routes
+        if hasattr(getattr(route, "endpoint", None), "__query_budget__")
+        for method in route.methods
+    }
+    tested = {
+        (method, match_route(app, {"type": "http", "method": method, "path": url.partition("?")[0]}))
+        for method, url, _ in LISTINGS
+    }
+    tested.add(("POST", "/api/tasks/assign"))
+    assert budgeted == tested
+
+
+def test_listing_defaults_to_a_page(client, admin_headers):
+    everything = client.get(f"/api/tasks/assignments/all?{HISTORY}&limit={MAX_PAGE_SIZE}", headers=admin_headers)
+    assert len(everything.json()) > DEFAULT_PAGE_SIZE
+
+    first = client.get(f"/api/tasks/assignments/all?{HISTORY}", headers=admin_headers)
+    assert len(first.json()) == DEFAULT_PAGE_SIZE
+    assert "X-Next-Cursor" in first.headers
+    assert client.get(f"/api/tasks/assignments/all?limit={MAX_PAGE_SIZE + 1}", headers=admin_headers).status_code == 422
+
+
+def test_cursor_is_exposed_to_credentialed_cors_requests(client, admin_headers):
+    origin = {"Origin": "http://localhost:5173"}
+    response = client.get("/api/tasks/assignments/all?limit=1", headers={**admin_headers, **origin})
+    exposed = {name.strip().lower() for name in response.headers["Access-Control-Expose-Headers"].split(",")}
+    assert {"x-next-cursor", "etag"} <= exposed
@@ -0,0 +1,109 @@
+import json
+from contextlib import contextmanager
+from datetime import date, timedelta
+import pytest
+from sqlalchemy import event, inspect, text
+from app.core import database
+
+TODAY = date.today()
+
+
+@contextmanager
+def captured_statements():
+    """Collect (sql, parameters) for every statement the app runs inside the block."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    engine = database.async_engine.sync_engine
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def _pg_indexes(node: dict, found: set) -> None:
+    if "Index Name" in node:
+        found.add(node["Index Name"])
+    for child in node.get("Plans", []):
+        _pg_indexes(child, found)
+
+
+def indexes_used(sql: str, parameters) -> set:
+    """Index names in the database's plan for one statement, as the app ran it."""
+    with database.engine.connect() as connection:
+        if connection.dialect.name == "postgresql":
+            plan = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}", parameters).scalar()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            found = set()
+            _pg_indexes(plan[0]["Plan"], found)
+            return found
+
+        found = set()
+        for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}", parameters):
+            words = row[-1].split()
+            if "INDEX" in words:
+                found.add(words[words.index("INDEX") + 1])
+        return found
+
+
+@pytest.fixture(scope="module")
+def plan(client, admin_headers, kid_headers):
+    """plan(url, role, table) -> indexes the endpoint's query on ``table`` uses."""
+    with database.engine.begin() as connection:
+        # Fresh statistics, so the plans match what a warmed-up server sees
+        connection.execute(text("ANALYZE"))
+    headers = {"admin": admin_headers, "kid": kid_headers}
+
+    def run(url: str, role: str, table: str) -> set:
+        with captured_statements() as statements:
+            response = client.get(url, headers=headers[role])
+        assert response.status_code == 200, response.text
+        queries = [(sql, parameters) for sql, parameters in statements if f"FROM {table}" in sql]
+        assert queries, f"GET {url} ran no query on {table}"
+        found = set()
+        for sql, parameters in queries:
+            found |= indexes_used(sql, parameters)
+        return found
+    return run
+
+
+@pytest.mark.parametrize("url,role,table,expected", [
+    (
+        f"/api/tasks/assignments?from_date={TODAY - timedelta(days=30)}&to_date={TODAY}",
+        "kid", "taskassignment", {"ix_taskassignment_user_id_scheduled_date"},
+    ),
+    (
+        f"/api/tasks/assignments?from_date={TODAY - timedelta(days=365)}&to_date={TODAY}",
+        "kid", "taskassignment",
+        {"ix_taskassignment_user_id_scheduled_date", "ix_taskassignment_archive_user_id_scheduled_date"},
+    ),
+    (
+        "/api/tasks/pending-approvals",
+        "admin", "taskassignment", {"ix_taskassignment_status_scheduled_date"},
+    ),
+    (
+        "/api/rewards/redemptions",
+        "kid", "rewardredemption", {"ix_rewardredemption_user_id_redeemed_at"},
+    ),
+])
+def test_listing_uses_its_index(plan, url, role, table, expected):
+    used = plan(url, role, table)
+    assert expected <= used, f"GET {url} used {sorted(used) or 'no index'}"
+
+
+def test_open_assignments_are_unique_per_day(client, kid_headers):
+    """Assigning relies on the partial unique indexes, not on a lookup first."""
+    indexes = {index["name"] for index in inspect(database.engine).get_indexes("taskassignment")}
+    assert {"uq_taskassignment_open_individual", "uq_taskassignment_open_collective"} <= indexes
+
+    request = {"task_ids": [1], "from_date": str(TODAY + timedelta(days=10))}
+    with captured_statements() as statements:
+        first = client.post("/api/tasks/assign", json=request, headers=kid_headers).json()
+        second = client.post("/api/tasks/assign", json=request, headers=kid_headers).json()
+    assert first["assigned"] == 1
+    assert second["assigned"] == 0
+    assert not [sql for sql, _ in statements if sql.lstrip().upper().startswith("SELECT") and "FROM taskassignment" in sql]
@@ -0,0 +1,56 @@
+from datetime import date
+from sqlmodel import Session, select
+from app.core import database
+from app.core.rollup import rebuild_rollup, record_transition
+from app.models.rollup import DailyAssignmentRollup
+from app.models.task import TaskAssignment, TaskStatus
+
+
+def _rollup() -> dict:
+    with Session(database.engine) as session:
+        return {
+            (row.scheduled_date, row.user_id, row.task_id):
+                (row.pending, row.completed, row.approved, row.rejected, row.credits)
+            for row in session.exec(select(DailyAssignmentRollup))
+        }
+
+
+def _rebuild(client, between_windows=None) -> None:
+    """Run ``rebuild_rollup`` in the app's loop, calling ``between_windows`` after its first commit."""
+    async def run():
+        async with database.async_session_maker() as session:
+            if between_windows is not None:
+                commit = session.commit
+                pending = [between_windows]
+
+                async def commit_then_interleave():
+                    await commit()
+                    if pending:
+                        await pending.pop()()
+                session.commit = commit_then_interleave
+            await rebuild_rollup(session, batch_days=1)
+    client.portal.call(run)
+
+
+def test_rebuild_survives_transition_recorded_between_windows(client):
+    with Session(database.engine) as session:
+        # Open today, so in the last window, which is rebuilt after the first commit
+        assignment = session.exec(
+            select(TaskAssignment).where(
+                TaskAssignment.scheduled_date == date.today(), TaskAssignment.status == TaskStatus.COMPLETED
+            )
+        ).first()
+        session.expunge(assignment)
+
+    async def live_transition():
+        # What the API does while the rebuild runs, in its own transaction
+        async with database.async_session_maker() as other:
+            await record_transition(other, assignment, TaskStatus.COMPLETED, TaskStatus.REJECTED)
+            await other.commit()
+
+    _rebuild(client, live_transition)
+    interleaved = _rollup()
+
+    _rebuild(client)
+    assert interleaved == _rollup()
+    assert interleaved[(assignment.scheduled_date, assignment.user_id, assignment.task_id)][1] >= 1
@@ -0,0 +1,55 @@
+import os
+import tempfile
+from datetime import datetime
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, text
+from app.core.config import settings
+from app.core.database import BACKEND_DIR
+
+
+def _create_user(client, admin_headers, username: str, credits: int = 0) -> int:
+    response = client.post(
+        "/api/users/", json={"username": username, "password": "secret", "credits": credits}, headers=admin_headers
+    )
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+def test_delete_user_without_history(client, admin_headers):
+    user_id = _create_user(client, admin_headers, "short-lived")
+
+    assert client.delete(f"/api/users/{user_id}", headers=admin_headers).status_code == 204
+    assert client.get(f"/api/users/{user_id}/stats", headers=admin_headers).status_code == 404
+
+
+def test_delete_user_with_history_is_a_conflict(client, admin_headers):
+    # The initial credits are recorded in the ledger
+    user_id = _create_user(client, admin_headers, "with-ledger", credits=5)
+
+    response = client.delete(f"/api/users/{user_id}", headers=admin_headers)
+    assert response.status_code == 409, response.text
+
+
+def test_migration_records_opening_balances(monkeypatch):
+    url = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'legacy.db')}"
+    monkeypatch.setattr(settings, "database_url", url)
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(BACKEND_DIR / "alembic"))
+    config.attributes["configure_logger"] = False
+
+    # Users with credits from before the ledger existed
+    command.upgrade(config, "0004_resource_version")
+    engine = create_engine(url)
+    with engine.begin() as connection:
+        connection.execute(text(
+            "INSERT INTO user (username, password_hash, role, credits, is_active, auth_epoch, created_at) "
+            "VALUES ('rich', '', 'USER', 40, 1, 0, :now), ('broke', '', 'USER', 0, 1, 0, :now)"
+        ), {"now": datetime.utcnow()})
+
+    command.upgrade(config, "head")
+    with engine.connect() as connection:
+        rows = connection.execute(text(
+            "SELECT user.username, amount, reason FROM credit_ledger JOIN user ON user.id = credit_ledger.user_id"
+        )).all()
+    assert [tuple(row) for row in rows] == [("rich", 40, "OPENING_BALANCE")]
@@ -1,7 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { useAuth } from '../contexts/AuthContext';
 import { User, Task, Reward } from '../types';
-import api from '../utils/api';
+import api, { getAllPages } from '../utils/api';
 import UserManagement from '../components/admin/UserManagement';
 import TaskManagement from '../components/admin/TaskManagement';
 import RewardManagement from '../components/admin/RewardManagement';
@@ -26,9 +26,9 @@ const AdminPanel: React.FC = () => {
     try {
       setIsLoading(true);
       const [usersResponse, tasksResponse, rewardsResponse] = await Promise.all([
-        api.get('/api/users/'),
+        getAllPages('/api/users/'),
         api.get('/api/tasks/'),
-        api.get('/api/rewards/admin/all')
+        getAllPages('/api/rewards/admin/all')
       ]);
 
       setAllUsers(usersResponse.data);
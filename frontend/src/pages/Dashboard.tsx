@@ -2,7 +2,7 @@ import React, { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { useAuth } from '../contexts/AuthContext';
 import { UserStats, TaskAssignment } from '../types';
-import api from '../utils/api';
+import api, { getAllPages } from '../utils/api';
 import { BarChart3, CheckCircle, Clock, XCircle, Coins, TrendingUp } from 'lucide-react';
 
 const Dashboard: React.FC = () => {
@@ -17,7 +17,7 @@ const Dashboard: React.FC = () => {
       try {
         const [statsResponse, assignmentsResponse] = await Promise.all([
           api.get(`/api/users/${user?.id}/stats`),
-          api.get('/api/tasks/assignments')
+          getAllPages('/api/tasks/assignments')
         ]);
 
         setStats(statsResponse.data);
@@ -2,7 +2,7 @@ import React, { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { useAuth } from '../contexts/AuthContext';
 import { UserStats, RewardRedemption } from '../types';
-import api from '../utils/api';
+import api, { getAllPages } from '../utils/api';
 // Reemplazando iconos de Lucide con iconos infantiles de react-icons
 import { FaChild, FaMedal, FaChartBar, FaGift, FaKey } from 'react-icons/fa';
 import { RiMoneyDollarCircleFill } from 'react-icons/ri';
@@ -25,7 +25,7 @@ const Profile: React.FC = () => {
       try {
         const [statsResponse, redemptionsResponse] = await Promise.all([
           api.get(`/api/users/${user?.id}/stats`),
-          api.get('/api/rewards/redemptions')
+          getAllPages('/api/rewards/redemptions')
         ]);
 
         setStats(statsResponse.data);
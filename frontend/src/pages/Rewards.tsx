@@ -2,7 +2,7 @@ import React, { useState, useEffect } from 'react';
 import { useLocation } from 'react-router-dom';
 import { useAuth } from '../contexts/AuthContext';
 import { Reward, RewardRedemption } from '../types';
-import api from '../utils/api';
+import api, { getAllPages } from '../utils/api';
 // Reemplazando iconos de Lucide con iconos infantiles de react-icons
 import { GiPresent, GiSandsOfTime } from 'react-icons/gi';
 import { RiMoneyDollarCircleFill, RiShoppingCart2Fill } from 'react-icons/ri';
@@ -28,7 +28,7 @@ const Rewards: React.FC = () => {
     try {
       const [rewardsResponse, redemptionsResponse] = await Promise.all([
         api.get('/api/rewards/'),
-        api.get('/api/rewards/redemptions')
+        getAllPages('/api/rewards/redemptions')
       ]);
 
       setRewards(rewardsResponse.data);
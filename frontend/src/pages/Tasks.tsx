@@ -3,7 +3,7 @@ import { useLocation } from 'react-router-dom';
 import { useAuth } from '../contexts/AuthContext';
 import { Task, TaskAssignment } from '../types';
 import TaskCard from '../components/TaskCard';
-import api from '../utils/api';
+import api, { getAllPages } from '../utils/api';
 import { FaSearch, FaFilter, FaPlus } from 'react-icons/fa';
 import { MdOutlineRestartAlt, MdDoneOutline } from 'react-icons/md';
 import { GiSandsOfTime } from 'react-icons/gi';
@@ -37,7 +37,7 @@ const Tasks: React.FC = () => {
       const params = { from_date: selectedDate, to_date: selectedDate } as any;
       const [tasksResponse, assignmentsResponse] = await Promise.all([
         api.get('/api/tasks/'),
-        api.get(assignmentsEndpoint, { params })
+        getAllPages(assignmentsEndpoint, { params })
       ]);
 
       setTasks(tasksResponse.data);
@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { FaUsers, FaTasks, FaGift, FaCheckCircle, FaExclamationTriangle } from 'react-icons/fa';
-import api from '../../utils/api';
+import api, { getAllPages } from '../../utils/api';
 
 // Definición de tipos
 interface DashboardStats {
@@ -39,8 +39,8 @@ const AdminDashboard: React.FC = () => {
       const params = { from_date: fromDate, to_date: toDate } as any;
       // Obtener datos base
       const [usersResponse, rewardsResponse, statsResponse] = await Promise.all([
-        api.get('/api/users/'),
-        api.get('/api/rewards/admin/all'),
+        getAllPages('/api/users/'),
+        getAllPages('/api/rewards/admin/all'),
         api.get('/api/tasks/stats/daily', { params })
       ]);
 
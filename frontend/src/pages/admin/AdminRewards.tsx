@@ -1,7 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { FaPlus, FaSearch, FaFilter, FaExclamationTriangle } from 'react-icons/fa';
 import RewardManagement from '../../components/admin/RewardManagement';
-import api from '../../utils/api';
+import { getAllPages } from '../../utils/api';
 import { Reward } from '../../types';
 
 // Extendemos la interfaz Reward para incluir la categoría
@@ -32,7 +32,7 @@ const AdminRewards: React.FC = () => {
     try {
       setIsLoading(true);
       setError(null);
-      const response = await api.get('/api/rewards/admin/all');
+      const response = await getAllPages('/api/rewards/admin/all');
       setRewards(response.data);
       setFilteredRewards(response.data);
 
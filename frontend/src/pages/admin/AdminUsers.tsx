@@ -1,7 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { FaUserPlus, FaSearch, FaFilter, FaExclamationTriangle } from 'react-icons/fa';
 import UserManagement from '../../components/admin/UserManagement';
-import api from '../../utils/api';
+import { getAllPages } from '../../utils/api';
 import { User } from '../../types';
 
 const AdminUsers: React.FC = () => {
@@ -26,7 +26,7 @@ const AdminUsers: React.FC = () => {
     try {
       setIsLoading(true);
       setError(null);
-      const response = await api.get('/api/users/');
+      const response = await getAllPages('/api/users/');
       setUsers(response.data);
       setFilteredUsers(response.data);
     } catch (err) {
@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { FaCheckCircle, FaTimesCircle, FaExclamationTriangle, FaSearch, FaUser } from 'react-icons/fa';
-import api from '../../utils/api';
+import api, { getAllPages } from '../../utils/api';
 
 interface TaskSubmission {
   id: number;
@@ -51,7 +51,7 @@ const TaskApprovals: React.FC = () => {
 
       const params = { from_date: selectedDate, to_date: selectedDate } as any;
       // Get all assignments to include approved, pending and rejected tasks
-      const allAssignmentsResponse = await api.get('/api/tasks/assignments/all', { params });
+      const allAssignmentsResponse = await getAllPages('/api/tasks/assignments/all', { params });
 
       // Combine and map the data to our TaskSubmission interface
       const mappedSubmissions: TaskSubmission[] = allAssignmentsResponse.data.map((assignment: any) => {
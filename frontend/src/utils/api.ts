@@ -1,4 +1,4 @@
-import axios from 'axios';
+import axios, { AxiosRequestConfig } from 'axios';
 
 const API_URL = (import.meta as any).env.VITE_API_URL || 'http://localhost:3110';
 
@@ -29,4 +29,18 @@ api.interceptors.response.use(
   }
 );
 
+// List endpoints return one page at a time and put the cursor for the next
+// one in the X-Next-Cursor header; follow it, in the largest pages allowed,
+// to get the whole list.
+export const getAllPages = async <T = any>(url: string, config: AxiosRequestConfig = {}): Promise<{ data: T[] }> => {
+  const data: T[] = [];
+  let cursor: string | undefined;
+  do {
+    const response = await api.get<T[]>(url, { ...config, params: { limit: 500, ...config.params, cursor } });
+    data.push(...response.data);
+    cursor = response.headers['x-next-cursor'];
+  } while (cursor);
+  return { data };
+};
+
 export default api;